@@ -0,0 +1,94 @@
+import sys
+import os
+import argparse
+import multiprocessing
+import tempfile
+import time
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base, create_db_engine
+from backend import models
+
+# SQLite defaults before the tuning layer: rollback journal, FULL sync, 5 s lock wait
+BASELINE = {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout_ms": 5000,
+            "cache_size_mb": 2, "mmap_size_mb": 0}
+TUNED = {}  # config defaults (WAL, NORMAL, busy_timeout, cache/mmap)
+
+
+def _setup(url: str, settings: dict):
+    engine = create_db_engine(url, **settings)
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        user = models.User(username="bench", hashed_password="x", role=models.UserRole.ADMIN, is_active=True)
+        db.add(user)
+        db.flush()
+        db.add_all(models.AuditLog(user_id=user.id, action="SEED", details=f"row {i}") for i in range(5000))
+        db.commit()
+    engine.dispose()
+
+
+def _worker(url: str, settings: dict, role: str, seconds: float, results):
+    """One app process: writers append audit rows one commit each (as routers do),
+    readers run the audit-log listing query."""
+    engine = create_db_engine(url, **settings)
+    Session = sessionmaker(bind=engine)
+    done = errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        try:
+            with Session() as db:
+                if role == "write":
+                    db.add(models.AuditLog(user_id=1, action="BENCH_WRITE", details="audit burst"))
+                    db.commit()
+                else:
+                    db.query(models.AuditLog).order_by(models.AuditLog.id.desc()).limit(50).all()
+                    db.query(func.count(models.AuditLog.id)).scalar()
+            done += 1
+        except OperationalError:
+            # "database is locked": the request would have failed with a 500
+            errors += 1
+    engine.dispose()
+    results.put((role, done, errors))
+
+
+def run(label: str, settings: dict, writers: int, readers: int, seconds: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        _setup(url, settings)
+        ctx = multiprocessing.get_context("spawn")
+        results = ctx.Queue()
+        procs = [ctx.Process(target=_worker, args=(url, settings, "write", seconds, results)) for _ in range(writers)]
+        procs += [ctx.Process(target=_worker, args=(url, settings, "read", seconds, results)) for _ in range(readers)]
+        for p in procs:
+            p.start()
+        totals = {"write": [0, 0], "read": [0, 0]}
+        for _ in procs:
+            role, done, errors = results.get()
+            totals[role][0] += done
+            totals[role][1] += errors
+        for p in procs:
+            p.join()
+    print(f"{label:<9} writes/s {totals['write'][0] / seconds:>9.1f}   reads/s {totals['read'][0] / seconds:>9.1f}"
+          f"   locked errors {totals['write'][1] + totals['read'][1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent SQLite read/write throughput: default vs tuned engine")
+    parser.add_argument("--writers", type=int, default=4, help="writer processes (audit-log inserts)")
+    parser.add_argument("--readers", type=int, default=4, help="reader processes")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+    print(f"{args.writers} writer and {args.readers} reader processes, {args.seconds:g} s each")
+    run("baseline", BASELINE, args.writers, args.readers, args.seconds)
+    run("tuned", TUNED, args.writers, args.readers, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import sys
+import os
+import argparse
+import random
+import tempfile
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Query, Session
+
+from backend.database import Base, create_db_engine
+from backend import models
+from backend.utils import case_scope
+
+# Hierarchy columns a case list can be scoped by (one per RBAC level)
+SCOPE_COLUMNS = ["police_station", "sub_division", "district_name", "range_name", "zone_name"]
+
+
+def hot_queries(db: Session) -> List[Tuple[str, Query, str]]:
+    """(endpoint, query as the router builds it, index the plan must use)."""
+    Case = models.Case
+    station_user = models.User(role=models.UserRole.SUB_INSPECTOR, station_name="S1")
+    state_user = models.User(role=models.UserRole.DGP)
+    checks = []
+    for column in SCOPE_COLUMNS:
+        checks.append((
+            f"GET /cases/ ({column} scope)",
+            db.query(Case).filter(getattr(Case, column) == "S1").order_by(Case.created_at.desc()).limit(100),
+            f"ix_cases_{column}_created_at",
+        ))
+    checks += [
+        ("GET /cases/ (state scope)",
+         case_scope.scope_cases(db.query(Case), state_user).order_by(Case.created_at.desc()).limit(100),
+         "ix_cases_created_at"),
+        ("GET /analytics/financial-dashboard (station scope)",
+         case_scope.scope_cases(db.query(Case).filter(Case.case_category == models.CaseCategory.FINANCIAL),
+                                station_user),
+         "ix_cases_police_station_created_at"),
+    ]
+    for path, model in (("/bank/requests/", models.BankRequest), ("/npci/requests/", models.NPCIRequest),
+                        ("/freeze/requests/", models.FreezeRequest)):
+        table = model.__tablename__
+        for scope, user, index in (("station", station_user, f"ix_{table}_case_id_created_at"),
+                                   ("state", state_user, f"ix_{table}_created_at")):
+            checks.append((
+                f"GET {path} ({scope} scope)",
+                case_scope.scope_by_case(db.query(model), model.case_id, user)
+                .order_by(model.created_at.desc()).limit(100),
+                index,
+            ))
+    checks += [
+        ("GET /requests/?case_id=",
+         case_scope.scope_by_case(db.query(models.TelecomRequest), models.TelecomRequest.case_id, station_user)
+         .filter(models.TelecomRequest.case_id == 1).limit(100),
+         "ix_telecom_requests_case_id"),
+        ("GET /files/case/{case_id}",
+         db.query(models.Evidence).filter(models.Evidence.case_id == 1), "ix_evidence_case_id"),
+        ("POST /files/upload/{case_id} (other copies)",
+         db.query(models.Evidence).filter(models.Evidence.file_hash == "0" * 64), "ix_evidence_file_hash"),
+        ("GET /financial-entities/{case_id}",
+         db.query(models.FinancialEntity).filter(models.FinancialEntity.case_id == 1),
+         "ix_financial_entities_case_id"),
+        ("GET /analytics/timeline/{case_id}",
+         db.query(models.TransactionTimeline).filter(models.TransactionTimeline.case_id == 1)
+         .order_by(models.TransactionTimeline.event_timestamp.asc()),
+         "ix_transaction_timeline_case_id_event_timestamp"),
+        ("GET /analytics/mule-indicators/{account_number}",
+         db.query(models.TransactionTimeline).filter(models.TransactionTimeline.financial_entity_id == 1),
+         "ix_transaction_timeline_financial_entity_id"),
+        ("GET /admin/logs",
+         db.query(models.AuditLog).order_by(models.AuditLog.timestamp.desc()).limit(100), "ix_audit_logs_timestamp"),
+    ]
+    return checks
+
+
+def query_plan(db: Session, query: Query) -> List[str]:
+    bind = db.get_bind()
+    sql = str(query.statement.compile(bind, compile_kwargs={"literal_binds": True}))
+    if bind.dialect.name == "sqlite":
+        return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+    return [row[0] for row in db.execute(text(f"EXPLAIN {sql}"))]
+
+
+def full_scans(plan: List[str]) -> List[str]:
+    """Plan lines that read a whole table (index-ordered scans are allowed)."""
+    return [line for line in plan
+            if (line.startswith("SCAN ") and " USING " not in line) or "Seq Scan" in line]
+
+
+def problem(plan: List[str], index: str) -> Optional[str]:
+    """Why a plan fails its check (a full scan, or the expected index unused); None if it passes."""
+    scans = full_scans(plan)
+    if scans:
+        return f"full scan: {scans[0].strip()}"
+    if not any(index in line for line in plan):
+        return f"{index} not used"
+    return None
+
+
+def check(db: Session) -> bool:
+    ok = True
+    for label, query, index in hot_queries(db):
+        plan = query_plan(db, query)
+        reason = problem(plan, index)
+        if reason:
+            ok = False
+            print(f"FAIL  {label:<52} {reason}")
+            for line in plan:
+                print(f"        {line}")
+        else:
+            print(f"ok    {label:<52} {index}")
+    return ok
+
+
+def seed(db: Session, cases: int) -> None:
+    """Synthetic volume so the planner sees realistic table sizes (ANALYZEd afterwards)."""
+    rnd = random.Random(0)
+    now = datetime(2024, 1, 1)
+    db.execute(insert(models.User), [{"id": 1, "username": "plan", "hashed_password": "x",
+                                      "role": models.UserRole.ADMIN, "is_active": True}])
+    rows = []
+    for i in range(1, cases + 1):
+        station = rnd.randrange(400)
+        rows.append({
+            "id": i, "fir_number": f"FIR/{i}", "police_station": f"S{station}",
+            "sub_division": f"SD{station // 5}", "district_name": f"D{station // 20}",
+            "range_name": f"R{station // 80}", "zone_name": f"Z{station // 200}",
+            "case_type": models.CaseType.OTHER,
+            "case_category": models.CaseCategory.FINANCIAL if i % 2 else models.CaseCategory.NON_FINANCIAL,
+            "created_at": now + timedelta(minutes=i), "owner_id": 1,
+        })
+    db.execute(insert(models.Case), rows)
+    db.execute(insert(models.TelecomRequest), [
+        {"case_id": c, "mobile_number": f"98{c:08d}", "request_type": "CDR", "created_at": now} for c in range(1, cases + 1)])
+    db.execute(insert(models.Evidence), [
+        {"case_id": c, "file_type": "OTHER", "file_hash": f"{c:064x}", "uploaded_by_id": 1} for c in range(1, cases + 1)])
+    db.execute(insert(models.FinancialEntity), [
+        {"id": c, "case_id": c, "entity_type": models.FinancialEntityType.BANK_ACCOUNT,
+         "account_number": f"00{c:010d}", "added_by_id": 1} for c in range(1, cases + 1)])
+    db.execute(insert(models.TransactionTimeline), [
+        {"case_id": c, "financial_entity_id": c, "event_type": models.TransactionEventType.PAYMENT,
+         "event_timestamp": now + timedelta(minutes=c * 3 + k), "narrative": "event"}
+        for c in range(1, cases + 1) for k in range(3)])
+    for model in (models.BankRequest, models.NPCIRequest, models.FreezeRequest):
+        db.execute(insert(model), [{"case_id": c, "financial_entity_id": c, "created_at": now + timedelta(minutes=c)}
+                                   for c in range(1, cases + 1)])
+    db.execute(insert(models.AuditLog), [
+        {"user_id": 1, "action": "SEED", "timestamp": now + timedelta(seconds=i)} for i in range(cases)])
+    db.commit()
+    db.execute(text("ANALYZE"))
+    db.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Fail if a hot list endpoint's query plan does a full table scan")
+    parser.add_argument("--url", help="check this database as it is (default: a seeded temporary SQLite file)")
+    parser.add_argument("--cases", type=int, default=20000, help="cases to seed in the temporary database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.url or f"sqlite:///{os.path.join(tmp, 'plans.db')}"
+        engine = create_db_engine(url)
+        with Session(engine) as db:
+            if not args.url:
+                Base.metadata.create_all(bind=engine)
+                seed(db, args.cases)
+            ok = check(db)
+        engine.dispose()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
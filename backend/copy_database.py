@@ -0,0 +1,145 @@
+import sys
+import os
+import argparse
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from sqlalchemy import Enum, String, func, inspect, select, text, type_coerce
+from sqlalchemy.engine import Connection
+
+from backend.database import Base, create_db_engine
+from backend import models  # noqa: F401  (registers the tables on Base.metadata)
+
+BATCH_SIZE = 5000
+
+
+def _source_columns(source: Connection) -> dict:
+    """table name -> column names present in the source (older databases lack newer tables/columns)."""
+    inspector = inspect(source)
+    return {
+        table.name: {c["name"] for c in inspector.get_columns(table.name)}
+        for table in Base.metadata.sorted_tables if inspector.has_table(table.name)
+    }
+
+
+def _orphans(source: Connection, table, present: dict) -> list:
+    """Foreign keys pointing at missing rows (SQLite does not enforce them; PostgreSQL will)."""
+    problems = []
+    for fk in table.foreign_keys:
+        column, parent = fk.parent, fk.column
+        if column.name not in present.get(table.name, ()) or parent.table.name not in present:
+            continue
+        count = source.execute(
+            select(func.count()).select_from(table).where(
+                column.isnot(None),
+                ~column.in_(select(parent))
+            )
+        ).scalar()
+        if count:
+            problems.append(f"{table.name}.{column.name}: {count} row(s) reference missing {parent.table.name} rows")
+    return problems
+
+
+def _enum_name(column, raw):
+    """Stored enum name for a raw SQLite value. Older rows may hold the enum's
+    value (e.g. "financial_fraud") where the ORM writes the name ("FINANCIAL_FRAUD");
+    PostgreSQL enum types only accept the names."""
+    if raw is None or raw in column.type.enums:
+        return raw
+    for member in column.type.enum_class or ():
+        if raw == member.value:
+            return member.name
+    raise ValueError(f"{column.table.name}.{column.name}: {raw!r} is not a {column.type.name} value")
+
+
+def _reset_sequences(target: Connection):
+    """Move PostgreSQL id sequences past the copied ids."""
+    for table in Base.metadata.sorted_tables:
+        if "id" not in table.c:
+            continue
+        target.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE(MAX(id), 1), MAX(id) IS NOT NULL) FROM {table.name}"
+        ))
+
+
+def copy_database(source_url: str, target_url: str, allow_nonempty: bool = False) -> bool:
+    """Copy every table from the source database (e.g. police_caf.db) into an
+    already migrated target (``alembic upgrade head`` with DATABASE_URL set to
+    it). Rows are streamed in batches, parents before children, in a single
+    target transaction: on any error nothing is written. Returns success.
+
+    SQLite-only search tables (FTS5) are not copied; on PostgreSQL text search
+    uses the trigram indexes instead.
+    """
+    source_engine = create_db_engine(source_url)
+    target_engine = create_db_engine(target_url)
+    tables = Base.metadata.sorted_tables
+    try:
+        missing = [t.name for t in tables if not inspect(target_engine).has_table(t.name)]
+        if missing:
+            print(f"Target schema is missing {', '.join(missing)}; run `alembic upgrade head` against it first.")
+            return False
+
+        with source_engine.connect() as source, target_engine.begin() as target:
+            present = _source_columns(source)
+            problems = [p for table in tables if table.name in present for p in _orphans(source, table, present)]
+            if problems:
+                print("Source has dangling references; fix or delete these rows before copying:")
+                for problem in problems:
+                    print(f"  {problem}")
+                return False
+            if not allow_nonempty:
+                filled = [t.name for t in tables if target.execute(select(func.count()).select_from(t)).scalar()]
+                if filled:
+                    print(f"Target tables already hold rows: {', '.join(filled)} (use --allow-nonempty to add to them).")
+                    return False
+
+            for table in tables:
+                columns = [c for c in table.columns if c.name in present.get(table.name, ())]
+                if not columns:
+                    print(f"{table.name:<24} not in source, skipped")
+                    continue
+                enums = [c for c in columns if isinstance(c.type, Enum)]
+                # Enum columns are read as stored text so legacy values can be mapped
+                query = select(*[type_coerce(c, String).label(c.name) if c in enums else c for c in columns])
+                result = source.execution_options(yield_per=BATCH_SIZE).execute(
+                    query.order_by(*table.primary_key.columns)
+                )
+                copied = converted = 0
+                for batch in result.partitions():
+                    rows = [dict(row._mapping) for row in batch]
+                    for row in rows:
+                        for column in enums:
+                            name = _enum_name(column, row[column.name])
+                            converted += name != row[column.name]
+                            row[column.name] = name
+                    target.execute(table.insert(), rows)
+                    copied += len(batch)
+                expected = source.execute(select(func.count()).select_from(table)).scalar()
+                if copied != expected:
+                    raise RuntimeError(f"{table.name}: copied {copied} of {expected} rows")
+                print(f"{table.name:<24} {copied} rows" + (f" ({converted} legacy enum values mapped)" if converted else ""))
+
+            if target.dialect.name == "postgresql":
+                _reset_sequences(target)
+        return True
+    finally:
+        source_engine.dispose()
+        target_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy the N.E.T.R.A database into another (e.g. SQLite -> PostgreSQL)")
+    parser.add_argument("--source", default="sqlite:///./police_caf.db", help="source database URL")
+    parser.add_argument("--target", required=True, help="target database URL (schema already at alembic head)")
+    parser.add_argument("--allow-nonempty", action="store_true", help="copy even if target tables already hold rows")
+    args = parser.parse_args()
+    ok = copy_database(args.source, args.target, args.allow_nonempty)
+    print("Copy complete" if ok else "Nothing was copied")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,90 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./police_caf.db"
+from backend import config
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+SQLALCHEMY_DATABASE_URL = config.DATABASE_URL
+
+SQLITE_JOURNAL_MODES = {"WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"}
+SQLITE_SYNCHRONOUS_LEVELS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+
+
+def _sqlite_pragmas(journal_mode: str, synchronous: str, busy_timeout_ms: int,
+                    cache_size_mb: int, mmap_size_mb: int):
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"Invalid SQLITE_JOURNAL_MODE: {journal_mode}")
+    if synchronous not in SQLITE_SYNCHRONOUS_LEVELS:
+        raise ValueError(f"Invalid SQLITE_SYNCHRONOUS: {synchronous}")
+    return [
+        # Wait for locks instead of failing with "database is locked" at once
+        f"PRAGMA busy_timeout = {int(busy_timeout_ms)}",
+        # WAL: readers never block the writer and vice versa (persists in the file)
+        f"PRAGMA journal_mode = {journal_mode}",
+        # NORMAL is durable against crashes of the app in WAL mode; fsync only at checkpoints
+        f"PRAGMA synchronous = {synchronous}",
+        # Negative cache_size is in KiB
+        f"PRAGMA cache_size = {-int(cache_size_mb) * 1024}",
+        f"PRAGMA mmap_size = {int(mmap_size_mb) * 1024 * 1024}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+
+
+def create_db_engine(
+    url: str = SQLALCHEMY_DATABASE_URL,
+    pool_size: int = config.DB_POOL_SIZE,
+    max_overflow: int = config.DB_MAX_OVERFLOW,
+    pool_timeout: int = config.DB_POOL_TIMEOUT,
+    journal_mode: str = config.SQLITE_JOURNAL_MODE,
+    synchronous: str = config.SQLITE_SYNCHRONOUS,
+    busy_timeout_ms: int = config.SQLITE_BUSY_TIMEOUT_MS,
+    cache_size_mb: int = config.SQLITE_CACHE_SIZE_MB,
+    mmap_size_mb: int = config.SQLITE_MMAP_SIZE_MB,
+) -> Engine:
+    """Engine with a sized connection pool; SQLite connections get the tuning
+    PRAGMAs applied as they are opened. Defaults come from config (env)."""
+    if not url.startswith("sqlite"):
+        connect_args = {}
+        if url.startswith("postgresql"):
+            # Naive datetimes are UTC throughout the app (as SQLite's CURRENT_TIMESTAMP)
+            connect_args["options"] = "-c timezone=utc"
+        return create_engine(url, connect_args=connect_args, pool_size=pool_size,
+                             max_overflow=max_overflow, pool_timeout=pool_timeout, pool_pre_ping=True)
+
+    connect_args = {"check_same_thread": False, "timeout": busy_timeout_ms / 1000}
+    if ":memory:" in url or url.rstrip("/") == "sqlite:":
+        # Private in-memory database: one connection per thread, nothing to pool or journal
+        pragmas = _sqlite_pragmas("MEMORY", synchronous, busy_timeout_ms, cache_size_mb, mmap_size_mb)
+        engine = create_engine(url, connect_args=connect_args)
+    else:
+        pragmas = _sqlite_pragmas(journal_mode, synchronous, busy_timeout_ms, cache_size_mb, mmap_size_mb)
+        engine = create_engine(url, connect_args=connect_args, pool_size=pool_size,
+                               max_overflow=max_overflow, pool_timeout=pool_timeout)
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return engine
+
+
+engine = create_db_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def ensure_indexes(bind) -> None:
+    """Create model indexes missing from existing tables (create_all only adds whole tables)."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -4,7 +4,7 @@ from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
 
-from backend.database import engine, Base
+from backend.database import engine, Base, SessionLocal, ensure_indexes
 # Import models to creating tables
 from backend import models
 from backend import config
@@ -12,12 +12,24 @@ from backend import config
 # Import middleware
 from backend.middleware.security import SecurityHeadersMiddleware, RequestLoggingMiddleware
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables (SQLite default; otherwise run `alembic upgrade head`)
+if config.DB_AUTO_CREATE:
+    Base.metadata.create_all(bind=engine)
+    # Indexes added to tables that an older version already created
+    ensure_indexes(engine)
+
+# Full-text search tables (FTS5) over case descriptions / timeline narratives
+from backend.utils import fulltext
+fulltext.init_fulltext(engine)
+
+# Backfill the identifier search index for databases created before it existed
+from backend.utils import identifier_index
+with SessionLocal() as _db:
+    identifier_index.ensure_index(_db)
 
 app = FastAPI(title="Police Case Management System")
 
-from backend.routers import auth, cases, requests, files, analysis, admin, evidence, tools
+from backend.routers import auth, cases, requests, files, analysis, admin, evidence, tools, jobs
 from backend.routers import bank_requests, npci_requests  # Financial Fraud Module
 from backend.routers import freeze_requests, financial_analytics  # Phase 4 & 5
 from backend.routers import financial_entities  # Entity management
@@ -30,6 +42,7 @@ app.include_router(analysis.router)
 app.include_router(admin.router)
 app.include_router(evidence.router)
 app.include_router(tools.router) # Cyber Tools
+app.include_router(jobs.router)  # Background extraction/analysis jobs
 app.include_router(bank_requests.router)  # Bank data requests
 app.include_router(npci_requests.router)  # NPCI/UPI requests
 app.include_router(freeze_requests.router)  # Account freeze (Section 102)
@@ -37,6 +50,18 @@ app.include_router(financial_analytics.router)  # Fraud intelligence
 app.include_router(financial_entities.router)  # Financial entity management
 
 
+# Background job queue (process pool) for evidence extraction
+from backend.utils import job_queue
+
+@app.on_event("startup")
+def start_job_runner():
+    job_queue.runner.start()
+
+@app.on_event("shutdown")
+def stop_job_runner():
+    job_queue.runner.stop()
+
+
 # HTTPS Redirect in Production
 if config.ENVIRONMENT == "production":
     app.add_middleware(HTTPSRedirectMiddleware)
@@ -0,0 +1,57 @@
+import sys
+import os
+
+# Add backend to path
+sys.path.append(os.getcwd())
+
+from backend.database import SessionLocal
+from backend import models
+from backend.utils import secure_storage, blob_store, evidence_analysis, job_queue
+
+
+def migrate_evidence():
+    """Convert legacy whole-file Fernet evidence to the segmented format and
+    move per-upload copies into the content-addressed blob store.
+
+    Legacy files stay readable without this; converting them lets downloads
+    and views stream them with bounded memory, and adopting them removes
+    duplicate copies of the same content. Content not yet extracted and
+    indexed for search is queued for processing (run by the app's job
+    runner on its next start). Safe to re-run.
+    """
+    db = SessionLocal()
+    converted = skipped = adopted = queued = failed = 0
+    try:
+        for evidence in db.query(models.Evidence).order_by(models.Evidence.id).all():
+            if not os.path.exists(evidence.file_path):
+                continue
+            try:
+                if secure_storage.migrate(evidence.file_path):
+                    converted += 1
+                else:
+                    skipped += 1
+                if blob_store.adopt(db, evidence):
+                    adopted += 1
+                if evidence.file_hash and evidence_analysis.needs_processing(
+                        evidence.file_hash, evidence.file_type, evidence.original_filename or ""):
+                    job_queue.enqueue(
+                        db, "process_evidence",
+                        {"file_path": evidence.file_path, "file_hash": evidence.file_hash,
+                         "filename": evidence.original_filename or "", "file_type": evidence.file_type},
+                        dedup_key=f"process_evidence:{evidence.file_hash}",
+                        evidence_id=evidence.id, case_id=evidence.case_id
+                    )
+                    queued += 1
+                db.commit()
+            except (secure_storage.EvidenceIntegrityError, OSError) as e:
+                db.rollback()
+                failed += 1
+                print(f"Evidence #{evidence.id} ({evidence.file_path}): {e}")
+    finally:
+        db.close()
+    print(f"Converted {converted}, already segmented {skipped}, moved to blob store {adopted}, "
+          f"queued for extraction {queued}, failed {failed}")
+
+
+if __name__ == "__main__":
+    migrate_evidence()
@@ -0,0 +1,354 @@
+"""Initial schema (tables as of the move to Alembic)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Databases previously created by ``Base.metadata.create_all`` already match
+this revision: mark them with ``alembic stamp 0001`` instead of upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _enum(name, values):
+    # On PostgreSQL the named type is created once in upgrade(); several tables share requeststatus
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), "postgresql"
+    )
+
+
+USERROLE = _enum("userrole", ["CONSTABLE", "HEAD_CONSTABLE", "SUB_INSPECTOR", "INSPECTOR", "DY_SP", "SP", "DIG", "IGP", "DGP", "ADMIN", "OFFICER"])
+CASETYPE = _enum("casetype", ["UPI_FRAUD", "BANK_TRANSFER_FRAUD", "WALLET_FRAUD", "LOAN_APP_SCAM", "INVESTMENT_FRAUD", "CRYPTO_FRAUD", "HARASSMENT", "SEXTORTION", "FAKE_PROFILE", "EMAIL_HACK", "IMPERSONATION", "PHISHING", "FRAUD", "FINANCIAL_FRAUD", "OTHER"])
+CASECATEGORY = _enum("casecategory", ["FINANCIAL", "NON_FINANCIAL"])
+FINANCIALENTITYTYPE = _enum("financialentitytype", ["BANK_ACCOUNT", "UPI_ID", "WALLET", "CRYPTO_WALLET", "PAYMENT_GATEWAY"])
+REQUESTSTATUS = _enum("requeststatus", ["PENDING", "APPROVED", "REJECTED", "DISPATCHED", "COMPLETED"])
+TRANSACTIONEVENTTYPE = _enum("transactioneventtype", ["CALL_RECEIVED", "MESSAGE_RECEIVED", "PAYMENT", "WITHDRAWAL", "TRANSFER", "ACCOUNT_OPENED", "CONTACT_BLOCKED", "COMPLAINT_FILED"])
+
+ENUMS = (USERROLE, CASETYPE, CASECATEGORY, FINANCIALENTITYTYPE, REQUESTSTATUS, TRANSACTIONEVENTTYPE)
+
+# Byte-order collation on PostgreSQL so prefix range scans (value < prefix || U+FFFF) behave as on SQLite
+IDENTIFIER_VALUE = sa.String().with_variant(sa.String(collation="C"), "postgresql")
+
+
+def _postgres_enums():
+    return [postgresql.ENUM(*enum.enums, name=enum.name) for enum in ENUMS]
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for enum in _postgres_enums():
+            enum.create(bind, checkfirst=True)
+
+    op.create_table(
+        "cdr_schema_profiles",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("operator", sa.String(), nullable=True),
+        sa.Column("mapping", sa.Text(), nullable=False),
+        sa.Column("headers", sa.Text(), nullable=True),
+        sa.Column("target_relative", sa.Boolean(), nullable=True),
+        sa.Column("source", sa.String(), nullable=True),
+        sa.Column("hits", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_cdr_schema_profiles_fingerprint", "cdr_schema_profiles", ["fingerprint"], unique=True)
+    op.create_index("ix_cdr_schema_profiles_id", "cdr_schema_profiles", ["id"], unique=False)
+
+    op.create_table(
+        "evidence_blobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("sha256", sa.String(), nullable=False),
+        sa.Column("file_path", sa.String(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=True),
+        sa.Column("ref_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_evidence_blobs_id", "evidence_blobs", ["id"], unique=False)
+    op.create_index("ix_evidence_blobs_sha256", "evidence_blobs", ["sha256"], unique=True)
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("hashed_password", sa.String(), nullable=True),
+        sa.Column("role", USERROLE, nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.Column("is_first_login", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("rank", sa.String(), nullable=True),
+        sa.Column("station_name", sa.String(), nullable=True),
+        sa.Column("sub_division", sa.String(), nullable=True),
+        sa.Column("district_name", sa.String(), nullable=True),
+        sa.Column("range_name", sa.String(), nullable=True),
+        sa.Column("zone_name", sa.String(), nullable=True),
+        sa.Column("state_name", sa.String(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_id", "users", ["id"], unique=False)
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+
+    op.create_table(
+        "audit_logs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("action", sa.String(), nullable=True),
+        sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("details", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_audit_logs_id", "audit_logs", ["id"], unique=False)
+
+    op.create_table(
+        "cases",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("fir_number", sa.String(), nullable=True),
+        sa.Column("police_station", sa.String(), nullable=True),
+        sa.Column("case_type", CASETYPE, nullable=True),
+        sa.Column("case_category", CASECATEGORY, nullable=True),
+        sa.Column("amount_involved", sa.String(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("owner_id", sa.Integer(), nullable=True),
+        sa.Column("sub_division", sa.String(), nullable=True),
+        sa.Column("district_name", sa.String(), nullable=True),
+        sa.Column("range_name", sa.String(), nullable=True),
+        sa.Column("zone_name", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["owner_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_cases_fir_number", "cases", ["fir_number"], unique=True)
+    op.create_index("ix_cases_id", "cases", ["id"], unique=False)
+
+    op.create_table(
+        "evidence",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("case_id", sa.Integer(), nullable=True),
+        sa.Column("file_type", sa.String(), nullable=True),
+        sa.Column("file_path", sa.String(), nullable=True),
+        sa.Column("file_hash", sa.String(), nullable=True),
+        sa.Column("original_filename", sa.String(), nullable=True),
+        sa.Column("uploaded_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("uploaded_by_id", sa.Integer(), nullable=True),
+        sa.Column("uploaded_by_rank", sa.String(), nullable=True),
+        sa.Column("verification_status", sa.String(), nullable=True),
+        sa.Column("verified_by_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["case_id"], ["cases.id"]),
+        sa.ForeignKeyConstraint(["uploaded_by_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["verified_by_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_evidence_id", "evidence", ["id"], unique=False)
+
+    op.create_table(
+        "financial_entities",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("case_id", sa.Integer(), nullable=True),
+        sa.Column("entity_type", FINANCIALENTITYTYPE, nullable=True),
+        sa.Column("bank_name", sa.String(), nullable=True),
+        sa.Column("account_number", sa.String(), nullable=True),
+        sa.Column("ifsc_code", sa.String(), nullable=True),
+        sa.Column("account_holder_name", sa.String(), nullable=True),
+        sa.Column("upi_id", sa.String(), nullable=True),
+        sa.Column("wallet_provider", sa.String(), nullable=True),
+        sa.Column("transaction_id", sa.String(), nullable=True),
+        sa.Column("transaction_date", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("transaction_amount", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("added_by_id", sa.Integer(), nullable=True),
+        sa.Column("verification_status", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["added_by_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["case_id"], ["cases.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_financial_entities_account_number", "financial_entities", ["account_number"], unique=False)
+    op.create_index("ix_financial_entities_id", "financial_entities", ["id"], unique=False)
+    op.create_index("ix_financial_entities_transaction_id", "financial_entities", ["transaction_id"], unique=False)
+    op.create_index("ix_financial_entities_upi_id", "financial_entities", ["upi_id"], unique=False)
+
+    op.create_table(
+        "identifier_index",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("value", IDENTIFIER_VALUE, nullable=False),
+        sa.Column("source_type", sa.String(), nullable=False),
+        sa.Column("source_id", sa.Integer(), nullable=False),
+        sa.Column("case_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["case_id"], ["cases.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_identifier_index_case_id", "identifier_index", ["case_id"], unique=False)
+    op.create_index("ix_identifier_index_id", "identifier_index", ["id"], unique=False)
+    op.create_index("ix_identifier_index_kind_value", "identifier_index", ["kind", "value"], unique=False)
+    op.create_index("ix_identifier_index_source", "identifier_index", ["source_type", "source_id"], unique=False)
+
+    op.create_table(
+        "telecom_requests",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("case_id", sa.Integer(), nullable=True),
+        sa.Column("mobile_number", sa.String(), nullable=True),
+        sa.Column("request_type", sa.String(), nullable=True),
+        sa.Column("status", REQUESTSTATUS, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("reason", sa.Text(), nullable=True),
+        sa.Column("reviewer_id", sa.Integer(), nullable=True),
+        sa.Column("reviewed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("rejection_reason", sa.Text(), nullable=True),
+        sa.Column("request_file_path", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["case_id"], ["cases.id"]),
+        sa.ForeignKeyConstraint(["reviewer_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_telecom_requests_id", "telecom_requests", ["id"], unique=False)
+    op.create_index("ix_telecom_requests_mobile_number", "telecom_requests", ["mobile_number"], unique=False)
+
+    op.create_table(
+        "bank_requests",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("case_id", sa.Integer(), nullable=True),
+        sa.Column("financial_entity_id", sa.Integer(), nullable=True),
+        sa.Column("bank_name", sa.String(), nullable=True),
+        sa.Column("account_number", sa.String(), nullable=True),
+        sa.Column("request_type", sa.String(), nullable=True),
+        sa.Column("status", REQUESTSTATUS, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("reason", sa.Text(), nullable=True),
+        sa.Column("period_from", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("period_to", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("reviewer_id", sa.Integer(), nullable=True),
+        sa.Column("reviewed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("rejection_reason", sa.Text(), nullable=True),
+        sa.Column("request_file_path", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["case_id"], ["cases.id"]),
+        sa.ForeignKeyConstraint(["financial_entity_id"], ["financial_entities.id"]),
+        sa.ForeignKeyConstraint(["reviewer_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_bank_requests_id", "bank_requests", ["id"], unique=False)
+
+    op.create_table(
+        "freeze_requests",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("case_id", sa.Integer(), nullable=True),
+        sa.Column("financial_entity_id", sa.Integer(), nullable=True),
+        sa.Column("bank_name", sa.String(), nullable=True),
+        sa.Column("account_number", sa.String(), nullable=True),
+        sa.Column("urgency_level", sa.String(), nullable=True),
+        sa.Column("justification", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("freeze_initiated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("freeze_confirmed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("bank_reference_number", sa.String(), nullable=True),
+        sa.Column("request_file_path", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["case_id"], ["cases.id"]),
+        sa.ForeignKeyConstraint(["financial_entity_id"], ["financial_entities.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_freeze_requests_id", "freeze_requests", ["id"], unique=False)
+
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("status", sa.String(), nullable=True),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("result", sa.Text(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("dedup_key", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=True),
+        sa.Column("max_attempts", sa.Integer(), nullable=True),
+        sa.Column("cancel_requested", sa.Boolean(), nullable=True),
+        sa.Column("worker", sa.String(), nullable=True),
+        sa.Column("run_after", sa.DateTime(), nullable=True),
+        sa.Column("evidence_id", sa.Integer(), nullable=True),
+        sa.Column("case_id", sa.Integer(), nullable=True),
+        sa.Column("created_by_id", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["case_id"], ["cases.id"]),
+        sa.ForeignKeyConstraint(["created_by_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["evidence_id"], ["evidence.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_jobs_dedup_key", "jobs", ["dedup_key"], unique=False)
+    op.create_index("ix_jobs_evidence_id", "jobs", ["evidence_id"], unique=False)
+    op.create_index("ix_jobs_id", "jobs", ["id"], unique=False)
+    op.create_index("ix_jobs_status", "jobs", ["status"], unique=False)
+
+    op.create_table(
+        "npci_requests",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("case_id", sa.Integer(), nullable=True),
+        sa.Column("financial_entity_id", sa.Integer(), nullable=True),
+        sa.Column("upi_id", sa.String(), nullable=True),
+        sa.Column("transaction_reference", sa.String(), nullable=True),
+        sa.Column("request_type", sa.String(), nullable=True),
+        sa.Column("status", REQUESTSTATUS, nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("reason", sa.Text(), nullable=True),
+        sa.Column("reviewer_id", sa.Integer(), nullable=True),
+        sa.Column("reviewed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("rejection_reason", sa.Text(), nullable=True),
+        sa.Column("request_file_path", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["case_id"], ["cases.id"]),
+        sa.ForeignKeyConstraint(["financial_entity_id"], ["financial_entities.id"]),
+        sa.ForeignKeyConstraint(["reviewer_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_npci_requests_id", "npci_requests", ["id"], unique=False)
+
+    op.create_table(
+        "transaction_timeline",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("case_id", sa.Integer(), nullable=True),
+        sa.Column("financial_entity_id", sa.Integer(), nullable=True),
+        sa.Column("event_type", TRANSACTIONEVENTTYPE, nullable=True),
+        sa.Column("event_timestamp", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("amount", sa.String(), nullable=True),
+        sa.Column("narrative", sa.Text(), nullable=True),
+        sa.Column("source_identifier", sa.String(), nullable=True),
+        sa.Column("destination_identifier", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["case_id"], ["cases.id"]),
+        sa.ForeignKeyConstraint(["financial_entity_id"], ["financial_entities.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_transaction_timeline_id", "transaction_timeline", ["id"], unique=False)
+
+
+def downgrade():
+    op.drop_table("transaction_timeline")
+    op.drop_table("npci_requests")
+    op.drop_table("jobs")
+    op.drop_table("freeze_requests")
+    op.drop_table("bank_requests")
+    op.drop_table("telecom_requests")
+    op.drop_table("identifier_index")
+    op.drop_table("financial_entities")
+    op.drop_table("evidence")
+    op.drop_table("cases")
+    op.drop_table("audit_logs")
+    op.drop_table("users")
+    op.drop_table("evidence_blobs")
+    op.drop_table("cdr_schema_profiles")
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for enum in _postgres_enums():
+            enum.drop(bind, checkfirst=True)
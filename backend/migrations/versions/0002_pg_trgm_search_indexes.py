@@ -0,0 +1,47 @@
+"""Trigram indexes for substring (ILIKE) search on PostgreSQL
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+SQLite serves case-description and timeline-narrative text search from FTS5
+tables (utils/fulltext.py). On PostgreSQL the same searches fall back to
+``ILIKE '%q%'``, which GIN trigram indexes turn into index scans. No-op on
+SQLite.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# index name -> (table, column)
+TRIGRAM_INDEXES = {
+    "ix_cases_description_trgm": ("cases", "description"),
+    "ix_transaction_timeline_narrative_trgm": ("transaction_timeline", "narrative"),
+}
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    available = bind.execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first()
+    if available is None:
+        # Search still works (sequential ILIKE scans). After installing postgresql-contrib:
+        # alembic downgrade 0001 && alembic upgrade head
+        print("WARNING: pg_trgm is not available on this server; trigram search indexes were not created.")
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, (table, column) in TRIGRAM_INDEXES.items():
+        op.create_index(name, table, [column], postgresql_using="gin",
+                        postgresql_ops={column: "gin_trgm_ops"})
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,51 @@
+"""Indexes for hierarchy-scoped listings and per-case lookups
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+Case lists filter on one hierarchy column (the caller's RBAC scope) and
+order by ``created_at``; request lists and the financial dashboard select by
+``case_id`` and show newest first; timelines are read per case in event
+order. Foreign keys used for per-case lookups get plain indexes.
+
+Indexes are created with IF NOT EXISTS: a database that the app created with
+``create_all`` after this change already has them when it is stamped 0001
+and upgraded.
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# index name -> (table, columns)
+INDEXES = {
+    "ix_cases_police_station_created_at": ("cases", ["police_station", "created_at"]),
+    "ix_cases_sub_division_created_at": ("cases", ["sub_division", "created_at"]),
+    "ix_cases_district_name_created_at": ("cases", ["district_name", "created_at"]),
+    "ix_cases_range_name_created_at": ("cases", ["range_name", "created_at"]),
+    "ix_cases_zone_name_created_at": ("cases", ["zone_name", "created_at"]),
+    "ix_cases_created_at": ("cases", ["created_at"]),
+    "ix_telecom_requests_case_id": ("telecom_requests", ["case_id"]),
+    "ix_evidence_case_id": ("evidence", ["case_id"]),
+    "ix_evidence_file_hash": ("evidence", ["file_hash"]),
+    "ix_audit_logs_timestamp": ("audit_logs", ["timestamp"]),
+    "ix_financial_entities_case_id": ("financial_entities", ["case_id"]),
+    "ix_transaction_timeline_case_id_event_timestamp": ("transaction_timeline", ["case_id", "event_timestamp"]),
+    "ix_transaction_timeline_financial_entity_id": ("transaction_timeline", ["financial_entity_id"]),
+    "ix_bank_requests_case_id_created_at": ("bank_requests", ["case_id", "created_at"]),
+    "ix_npci_requests_case_id_created_at": ("npci_requests", ["case_id", "created_at"]),
+    "ix_freeze_requests_case_id_created_at": ("freeze_requests", ["case_id", "created_at"]),
+}
+
+
+def upgrade():
+    for name, (table, columns) in INDEXES.items():
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, (table, _) in INDEXES.items():
+        op.drop_index(name, table_name=table, if_exists=True)
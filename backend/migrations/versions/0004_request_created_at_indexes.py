@@ -0,0 +1,34 @@
+"""created_at indexes for unscoped request listings
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+Request lists are restricted with an ``IN (SELECT cases.id ...)`` subquery
+for scoped users (utils/case_scope.py) and not restricted at all for
+state-level users; the latter read the newest rows straight from these
+indexes instead of sorting the whole table.
+"""
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+# index name -> (table, columns)
+INDEXES = {
+    "ix_bank_requests_created_at": ("bank_requests", ["created_at"]),
+    "ix_npci_requests_created_at": ("npci_requests", ["created_at"]),
+    "ix_freeze_requests_created_at": ("freeze_requests", ["created_at"]),
+}
+
+
+def upgrade():
+    for name, (table, columns) in INDEXES.items():
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade():
+    for name, (table, _) in INDEXES.items():
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,23 @@
+"""Index evidence by uploader
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+Job visibility (routers/jobs.py) looks up the content hashes a user has
+uploaded, so identical uploads can follow the job queued for that content.
+"""
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index("ix_evidence_uploaded_by_id", "evidence", ["uploaded_by_id"], if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index("ix_evidence_uploaded_by_id", table_name="evidence", if_exists=True)
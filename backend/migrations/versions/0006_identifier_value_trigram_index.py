@@ -0,0 +1,41 @@
+"""Trigram index for substring search on identifier values (PostgreSQL)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+
+Universal search retries a query as a substring of the indexed identifiers
+when nothing starts with it (utils/identifier_index.py). A GIN trigram index
+on ``identifier_index.value`` keeps that ``LIKE '%q%'`` off a sequential
+scan. No-op on SQLite, where the lookup reads the kind's range of
+ix_identifier_index_kind_value.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_identifier_index_value_trgm"
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    available = bind.execute(sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first()
+    if available is None:
+        # As in 0002: substring search still works, by sequential scan
+        print("WARNING: pg_trgm is not available on this server; the identifier trigram index was not created.")
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(INDEX_NAME, "identifier_index", ["value"], postgresql_using="gin",
+                    postgresql_ops={"value": "gin_trgm_ops"}, if_not_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
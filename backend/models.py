@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -95,6 +95,14 @@ class User(Base):
 
 class Case(Base):
     __tablename__ = "cases"
+    # Case lists filter on one hierarchy level (RBAC scope) and show newest first
+    __table_args__ = (
+        Index("ix_cases_police_station_created_at", "police_station", "created_at"),
+        Index("ix_cases_sub_division_created_at", "sub_division", "created_at"),
+        Index("ix_cases_district_name_created_at", "district_name", "created_at"),
+        Index("ix_cases_range_name_created_at", "range_name", "created_at"),
+        Index("ix_cases_zone_name_created_at", "zone_name", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     fir_number = Column(String, unique=True, index=True)
@@ -103,7 +111,7 @@ class Case(Base):
     case_category = Column(Enum(CaseCategory), nullable=True)  # FINANCIAL or NON_FINANCIAL
     amount_involved = Column(String, default="0")  # Store total victim loss/fraud amount
     description = Column(Text, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     status = Column(String, default="active")
     owner_id = Column(Integer, ForeignKey("users.id"))
 
@@ -128,7 +136,7 @@ class TelecomRequest(Base):
     __tablename__ = "telecom_requests"
 
     id = Column(Integer, primary_key=True, index=True)
-    case_id = Column(Integer, ForeignKey("cases.id"))
+    case_id = Column(Integer, ForeignKey("cases.id"), index=True)
     mobile_number = Column(String, index=True)
     request_type = Column(String) # CAF, CDR, IP_LOGS
     status = Column(Enum(RequestStatus), default=RequestStatus.PENDING)
@@ -150,13 +158,13 @@ class Evidence(Base):
     __tablename__ = "evidence"
 
     id = Column(Integer, primary_key=True, index=True)
-    case_id = Column(Integer, ForeignKey("cases.id"))
+    case_id = Column(Integer, ForeignKey("cases.id"), index=True)
     file_type = Column(String) # CDR_CSV, CAF_PDF
     file_path = Column(String) # Path to encrypted file
-    file_hash = Column(String) # SHA-256
+    file_hash = Column(String, index=True) # SHA-256 (copies of the same content, blob references)
     original_filename = Column(String)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now())
-    uploaded_by_id = Column(Integer, ForeignKey("users.id"))
+    uploaded_by_id = Column(Integer, ForeignKey("users.id"), index=True)
     
     # Hierarchy & Approval
     uploaded_by_rank = Column(String, nullable=True) # e.g. "constable"
@@ -172,7 +180,7 @@ class AuditLog(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     action = Column(String)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     details = Column(Text, nullable=True)
 
     user = relationship("User", back_populates="audit_logs")
@@ -184,7 +192,7 @@ class FinancialEntity(Base):
     __tablename__ = "financial_entities"
     
     id = Column(Integer, primary_key=True, index=True)
-    case_id = Column(Integer, ForeignKey("cases.id"))
+    case_id = Column(Integer, ForeignKey("cases.id"), index=True)
     
     # Entity Classification
     entity_type = Column(Enum(FinancialEntityType))
@@ -216,10 +224,14 @@ class FinancialEntity(Base):
 class TransactionTimeline(Base):
     """Chronological sequence of events in financial fraud cases"""
     __tablename__ = "transaction_timeline"
+    # A case's timeline is read in event order
+    __table_args__ = (
+        Index("ix_transaction_timeline_case_id_event_timestamp", "case_id", "event_timestamp"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(Integer, ForeignKey("cases.id"))
-    financial_entity_id = Column(Integer, ForeignKey("financial_entities.id"), nullable=True)
+    financial_entity_id = Column(Integer, ForeignKey("financial_entities.id"), nullable=True, index=True)
     
     event_type = Column(Enum(TransactionEventType))
     event_timestamp = Column(DateTime(timezone=True))
@@ -237,6 +249,10 @@ class TransactionTimeline(Base):
 class BankRequest(Base):
     """Manages requests to banks for KYC and account statements"""
     __tablename__ = "bank_requests"
+    # Listed per accessible case, newest first
+    __table_args__ = (
+        Index("ix_bank_requests_case_id_created_at", "case_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(Integer, ForeignKey("cases.id"))
@@ -248,7 +264,7 @@ class BankRequest(Base):
     
     # Request Workflow
     status = Column(Enum(RequestStatus), default=RequestStatus.PENDING)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     reason = Column(Text)
     period_from = Column(DateTime(timezone=True), nullable=True)  # For statement requests
     period_to = Column(DateTime(timezone=True), nullable=True)
@@ -269,6 +285,9 @@ class BankRequest(Base):
 class NPCIRequest(Base):
     """Manages requests to NPCI for UPI transaction details"""
     __tablename__ = "npci_requests"
+    __table_args__ = (
+        Index("ix_npci_requests_case_id_created_at", "case_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(Integer, ForeignKey("cases.id"))
@@ -280,7 +299,7 @@ class NPCIRequest(Base):
     
     # Request Workflow
     status = Column(Enum(RequestStatus), default=RequestStatus.PENDING)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     reason = Column(Text)
     
     # Approval Workflow
@@ -299,6 +318,9 @@ class NPCIRequest(Base):
 class FreezeRequest(Base):
     """Urgent account freeze requests (Section 102 CrPC)"""
     __tablename__ = "freeze_requests"
+    __table_args__ = (
+        Index("ix_freeze_requests_case_id_created_at", "case_id", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     case_id = Column(Integer, ForeignKey("cases.id"))
@@ -310,7 +332,7 @@ class FreezeRequest(Base):
     justification = Column(Text)
     
     # Timestamps
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     freeze_initiated_at = Column(DateTime(timezone=True), nullable=True)
     freeze_confirmed_at = Column(DateTime(timezone=True), nullable=True)
     
@@ -324,3 +346,87 @@ class FreezeRequest(Base):
     # Relationships
     case = relationship("Case", back_populates="freeze_requests")
     financial_entity = relationship("FinancialEntity")
+
+class IdentifierIndex(Base):
+    """Normalized identifier -> source row lookup used by universal search.
+
+    Every searchable identifier (mobile, UPI, account, IFSC, FIR, email,
+    name tokens) is stored once per source row in canonical form so that
+    searches become b-tree lookups instead of leading-wildcard scans.
+    """
+    __tablename__ = "identifier_index"
+    __table_args__ = (
+        Index("ix_identifier_index_kind_value", "kind", "value"),
+        Index("ix_identifier_index_source", "source_type", "source_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # mobile, upi, account, ifsc, fir, email, name, file
+    # Normalized form (see utils/identifier_index.py); byte-order collation on PostgreSQL keeps
+    # the prefix range scans equivalent to SQLite's
+    value = Column(String().with_variant(String(collation="C"), "postgresql"), nullable=False)
+    source_type = Column(String, nullable=False)  # case, telecom_request, financial_entity, timeline, evidence
+    source_id = Column(Integer, nullable=False)
+    case_id = Column(Integer, ForeignKey("cases.id"), index=True)
+
+class CdrSchemaProfile(Base):
+    """Detected (or analyst-corrected) CDR column layout, keyed by header fingerprint.
+
+    Uploads whose header row hashes to a known fingerprint reuse the stored
+    mapping instead of running schema detection (see utils/cdr_schema.py).
+    """
+    __tablename__ = "cdr_schema_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fingerprint = Column(String, unique=True, index=True, nullable=False)  # SHA-256 of normalized headers
+    operator = Column(String)  # Airtel, Jio, Vi, BSNL, Generic, Manual
+    mapping = Column(Text, nullable=False)  # JSON: field -> column position
+    headers = Column(Text, nullable=True)  # JSON: header row as uploaded
+    target_relative = Column(Boolean, default=False)  # Number columns are target/other party
+    source = Column(String, default="detected")  # detected, manual
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+class EvidenceBlob(Base):
+    """One encrypted copy of a file's content, shared by every Evidence row with that hash.
+
+    ``ref_count`` is the number of Evidence rows whose ``file_path`` points at the
+    blob; unreferenced blobs are removed by garbage collection (see utils/blob_store.py).
+    """
+    __tablename__ = "evidence_blobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String, unique=True, index=True, nullable=False)
+    file_path = Column(String, nullable=False)  # Encrypted blob under secure_uploads/blobs
+    size = Column(Integer)  # Plaintext bytes
+    ref_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class Job(Base):
+    """Background job run by the local job queue (see utils/job_queue.py).
+
+    Status moves queued -> running -> done / failed / cancelled; failed
+    attempts are re-queued with backoff until ``max_attempts``.
+    """
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # process_evidence, ...
+    status = Column(String, default="queued", index=True)  # queued, running, done, failed, cancelled
+    payload = Column(Text, nullable=False)  # JSON keyword arguments for the handler
+    result = Column(Text, nullable=True)  # JSON returned by the handler
+    error = Column(Text, nullable=True)
+    dedup_key = Column(String, nullable=True, index=True)  # Same work already queued/running is not queued twice
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    cancel_requested = Column(Boolean, default=False)
+    worker = Column(String, nullable=True)  # host:pid of the process running it
+    run_after = Column(DateTime, nullable=True)  # Retry backoff (UTC)
+    evidence_id = Column(Integer, ForeignKey("evidence.id"), nullable=True, index=True)
+    case_id = Column(Integer, ForeignKey("cases.id"), nullable=True)
+    created_by_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
@@ -6,6 +6,7 @@ from datetime import datetime
 from backend.database import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_active_user
+from backend.utils import blob_store
 
 router = APIRouter(
     prefix="/admin",
@@ -46,3 +47,23 @@ def get_audit_logs(
             "timestamp": log.timestamp
         })
     return results
+
+@router.post("/evidence/gc")
+def collect_evidence_garbage(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Remove encrypted evidence blobs no evidence row references any more."""
+    if current_user.role != models.UserRole.ADMIN:
+        raise HTTPException(status_code=403, detail="Only administrators can run evidence cleanup")
+
+    result = blob_store.collect_garbage(db)
+
+    log = models.AuditLog(
+        user_id=current_user.id,
+        action="EVIDENCE_GC",
+        details=f"Removed {result['removed_blobs']} unreferenced blobs and {result['removed_orphans']} stray files ({result['freed_bytes']} bytes)"
+    )
+    db.add(log)
+    db.commit()
+    return result
@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from sqlalchemy.orm import Session
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 from backend.database import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_active_user
-from backend.utils import cdr_parser, risk_engine
-from backend.routers.files import cipher_suite
+from backend.utils import cdr_parser, cdr_cache, cdr_schema, cdr_analytics, risk_engine, identifier_index, fulltext
+from backend.utils.secure_storage import EvidenceIntegrityError
+from typing import Dict, Iterable, List, Optional, Tuple
 import os
 import re
 import io
@@ -31,21 +35,325 @@ def analyze_cdr(
     if not evidence:
         raise HTTPException(status_code=404, detail="Evidence not found")
     
-    # Decrypt File
+    # Normalized frame from the columnar cache (decrypts and parses only on a miss)
     try:
-        with open(evidence.file_path, "rb") as f:
-            encrypted_data = f.read()
-        decrypted_data = cipher_suite.decrypt(encrypted_data)
-    except Exception:
+        df = cdr_cache.get_frame(evidence, db)
+    except cdr_parser.CDRFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except (OSError, EvidenceIntegrityError):
         raise HTTPException(status_code=500, detail="Failed to decrypt evidence file")
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to parse file: {str(e)}")
+    db.commit()  # Schema profile detected/used on a cache miss
+
+    return cdr_parser.analyze_frame(df)
+
+
+# Upper bound on CDRs compared in one request
+MAX_COMPARE_CDRS = 50
+
+
+@router.post("/cdr/compare")
+def compare_cdrs(
+    request: schemas.CdrCompareRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    GANG ANALYSIS ACROSS CDRs
+    Input: N CDR evidence ids (any cases).
+    Output: Common B-parties, shared IMEIs and shared cell IDs across the CDRs,
+    the pairwise contact-overlap matrix, and suspects who called each other.
+    Works on the cached normalized frames (see utils/cdr_cache.py).
+    """
+    evidence_ids = list(dict.fromkeys(request.evidence_ids))
+    if not 2 <= len(evidence_ids) <= MAX_COMPARE_CDRS:
+        raise HTTPException(status_code=400, detail=f"Select between 2 and {MAX_COMPARE_CDRS} CDRs to compare.")
+    if not 2 <= request.min_cdrs <= len(evidence_ids):
+        raise HTTPException(status_code=400, detail=f"min_cdrs must be between 2 and {len(evidence_ids)}.")
+
+    found = (
+        db.query(models.Evidence)
+        .options(joinedload(models.Evidence.case))
+        .filter(models.Evidence.id.in_(evidence_ids))
+        .all()
+    )
+    by_id = {e.id: e for e in found}
+    missing = [i for i in evidence_ids if i not in by_id]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Evidence not found: {', '.join(map(str, missing))}")
+
+    frames = []
+    for evidence_id in evidence_ids:
+        evidence = by_id[evidence_id]
+        try:
+            frames.append(cdr_cache.get_frame(evidence, db))
+        except cdr_parser.CDRFormatError as e:
+            raise HTTPException(status_code=400, detail=f"{evidence.original_filename}: {e}")
+        except (OSError, EvidenceIntegrityError):
+            raise HTTPException(status_code=500, detail=f"Failed to decrypt evidence file {evidence.original_filename}")
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Failed to parse {evidence.original_filename}: {str(e)}")
+    db.commit()  # Schema profiles detected/used on cache misses
+
+    names = [f"#{i} {by_id[i].original_filename}" for i in evidence_ids]
+    result = cdr_analytics.compare(frames, names, request.min_cdrs, request.limit)
+    for summary, evidence_id in zip(result["cdrs"], evidence_ids):
+        evidence = by_id[evidence_id]
+        summary.update({
+            "evidence_id": evidence.id,
+            "case_id": evidence.case_id,
+            "fir_number": evidence.case.fir_number if evidence.case else None,
+        })
+    return result
+
 
-    # Parse
-    analysis_result = cdr_parser.parse_cdr(decrypted_data, evidence.original_filename)
+def _cdr_preview(evidence: models.Evidence):
+    try:
+        content = cdr_cache.read_evidence(evidence)
+    except (OSError, EvidenceIntegrityError):
+        raise HTTPException(status_code=500, detail="Failed to decrypt evidence file")
+    try:
+        return content, cdr_parser.read_preview(content, evidence.original_filename)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to parse file: {str(e)}")
+
+
+@router.get("/cdr/{evidence_id}/schema")
+def get_cdr_schema(
+    evidence_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Detected (or cached) column layout of a CDR, plus its raw header rows for correction."""
+    evidence = db.query(models.Evidence).filter(models.Evidence.id == evidence_id).first()
+    if not evidence:
+        raise HTTPException(status_code=404, detail="Evidence not found")
+
+    _, preview = _cdr_preview(evidence)
+    schema = cdr_schema.resolve(preview, db)
+    db.commit()
+
+    return {
+        "schema": schema.to_dict() if schema else None,
+        "fields": list(cdr_schema.FIELDS),
+        "candidate_header_rows": preview.head(cdr_schema.MAX_HEADER_ROW).fillna("").values.tolist(),
+    }
+
+
+@router.put("/cdr/{evidence_id}/schema")
+def update_cdr_schema(
+    evidence_id: int,
+    update: schemas.CdrSchemaUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Correct a misdetected CDR layout.
+    The mapping is saved for the file's header fingerprint, so every CDR with
+    the same header uses it from now on, and this evidence is re-normalized
+    without a re-upload.
+    """
+    allowed_editors = [
+        models.UserRole.SUB_INSPECTOR, models.UserRole.INSPECTOR,
+        models.UserRole.OFFICER, models.UserRole.ADMIN
+    ]
+    if current_user.role not in allowed_editors:
+        raise HTTPException(status_code=403, detail="You do not have permission to change CDR layouts.")
+
+    evidence = db.query(models.Evidence).filter(models.Evidence.id == evidence_id).first()
+    if not evidence:
+        raise HTTPException(status_code=404, detail="Evidence not found")
+
+    content, preview = _cdr_preview(evidence)
+    try:
+        schema = cdr_schema.manual_schema(preview, update.column_mapping, update.header_row, update.target_relative)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        cdr_cache.remove(evidence.file_hash)
+        df = cdr_cache.build(content, evidence.original_filename, evidence.file_hash, schema=schema)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Failed to parse file with this mapping: {str(e)}")
+
+    cdr_schema.save_profile(db, schema)
+    db.add(models.AuditLog(
+        user_id=current_user.id,
+        action="UPDATE_CDR_SCHEMA",
+        details=f"Set CDR layout {schema.column_mapping()} for Evidence #{evidence.id} ({evidence.original_filename})"
+    ))
+    db.commit()
+
+    return cdr_parser.analyze_frame(df)
+
+def _telecom_request_match(req: models.TelecomRequest) -> dict:
+    return {
+        "source": "Telecom Request",
+        "case_id": req.case_id,
+        "fir_number": req.case.fir_number,
+        "match_type": "Mobile Number",
+        "matched_value": req.mobile_number,
+        "case_type": req.case.case_type.value if req.case.case_type else "N/A",
+        "status": req.case.status,
+        "created_at": req.created_at.isoformat() if req.created_at else None
+    }
+
+
+def _financial_entity_match(entity: models.FinancialEntity, match_kind: str, query: str) -> dict:
+    match_field = "Unknown"
+    matched_value = query
     
-    if "error" in analysis_result:
-        raise HTTPException(status_code=400, detail=analysis_result["error"])
-        
-    return analysis_result
+    if match_kind == "upi":
+        match_field = "UPI ID"
+        matched_value = entity.upi_id
+    elif match_kind in ("account", "ifsc"):
+        match_field = "Bank Account"
+        matched_value = f"{entity.bank_name} - {entity.account_number}"
+    elif match_kind == "name":
+        match_field = "Account Holder Name"
+        matched_value = entity.account_holder_name
+    
+    return {
+        "source": "Financial Entity",
+        "case_id": entity.case_id,
+        "fir_number": entity.case.fir_number if entity.case else "N/A",
+        "match_type": match_field,
+        "matched_value": matched_value,
+        "entity_type": entity.entity_type.value if entity.entity_type else "N/A",
+        "transaction_amount": entity.transaction_amount,
+        "case_type": entity.case.case_type.value if entity.case and entity.case.case_type else "N/A",
+        "status": entity.case.status if entity.case else "N/A",
+        "created_at": entity.created_at.isoformat() if entity.created_at else None
+    }
+
+
+def _case_match(case: models.Case, match_kind: str = None) -> dict:
+    return {
+        "source": "Case Record",
+        "case_id": case.id,
+        "fir_number": case.fir_number,
+        "match_type": "FIR Number" if match_kind == "fir" else "Case Description",
+        "matched_value": case.fir_number,
+        "case_type": case.case_type.value if case.case_type else "N/A",
+        "status": case.status,
+        "police_station": case.police_station,
+        "created_at": case.created_at.isoformat() if case.created_at else None
+    }
+
+
+def _timeline_match(txn: models.TransactionTimeline) -> dict:
+    return {
+        "source": "Transaction Timeline",
+        "case_id": txn.case_id,
+        "fir_number": txn.case.fir_number if txn.case else "N/A",
+        "match_type": "Mentioned in Timeline",
+        "matched_value": txn.narrative[:100] + "..." if len(txn.narrative) > 100 else txn.narrative,
+        "event_type": txn.event_type.value if txn.event_type else "N/A",
+        "amount": txn.amount,
+        "case_type": txn.case.case_type.value if txn.case and txn.case.case_type else "N/A",
+        "created_at": txn.event_timestamp.isoformat() if txn.event_timestamp else None
+    }
+
+
+def _evidence_match(evidence: models.Evidence, hit_kind: Optional[str] = None, hit_value: Optional[str] = None) -> dict:
+    # Index hits other than file-name tokens come from the file's extracted contents
+    in_content = hit_kind is not None and hit_kind != "file"
+    return {
+        "source": "Evidence File",
+        "case_id": evidence.case_id,
+        "fir_number": evidence.case.fir_number if evidence.case else "N/A",
+        "match_type": "Evidence Content" if in_content else "Evidence Document",
+        "matched_value": hit_value if in_content else evidence.original_filename,
+        "file_name": evidence.original_filename,
+        "file_type": evidence.file_type,
+        "file_id": evidence.id,
+        "uploaded_at": evidence.uploaded_at.isoformat() if evidence.uploaded_at else None,
+        "case_type": evidence.case.case_type.value if evidence.case and evidence.case.case_type else "N/A",
+        "status": evidence.case.status if evidence.case else "N/A",
+        "verification_status": evidence.verification_status
+    }
+
+
+# Source row loaders for bulk lookups: source_type -> (model, result builder)
+_SOURCE_RESULT_BUILDERS = {
+    identifier_index.SOURCE_TELECOM_REQUEST: (models.TelecomRequest, lambda row, hit: _telecom_request_match(row)),
+    identifier_index.SOURCE_FINANCIAL_ENTITY: (models.FinancialEntity, lambda row, hit: _financial_entity_match(row, hit.kind, hit.value)),
+    identifier_index.SOURCE_CASE: (models.Case, lambda row, hit: _case_match(row, hit.kind)),
+    identifier_index.SOURCE_TIMELINE: (models.TransactionTimeline, lambda row, hit: _timeline_match(row)),
+    identifier_index.SOURCE_EVIDENCE: (models.Evidence, lambda row, hit: _evidence_match(row, hit.kind, hit.value)),
+}
+
+
+def _normalize_search_identifiers(identifiers: Dict[str, Iterable[str]]) -> Tuple[Dict[Tuple[str, str], List[str]], List[dict]]:
+    """
+    Normalize raw extracted values per index kind (mobile, upi, account).
+    Returns ({(kind, normalized value): raw identifiers as they appeared}, errors).
+    """
+    errors = []
+    wanted = {}  # (kind, normalized value) -> raw identifiers as they appeared in the file
+    for kind, raw_values in identifiers.items():
+        normalize = identifier_index.NORMALIZERS[kind]
+        for raw in raw_values:
+            value = normalize(raw)
+            if not value:
+                errors.append({"identifier": raw, "type": kind, "error": "Could not normalize identifier"})
+                continue
+            wanted.setdefault((kind, value), []).append(raw)
+    return wanted, errors
+
+
+def _resolve_search_identifiers(db: Session, wanted: Dict[Tuple[str, str], List[str]]) -> List[dict]:
+    """Matches for normalized identifiers; every match carries `searched_identifier`."""
+    values_by_kind = {}
+    for kind, value in wanted:
+        values_by_kind.setdefault(kind, set()).add(value)
+    
+    hits_by_source = {}
+    for hit in identifier_index.lookup_many(db, values_by_kind):
+        hits_by_source.setdefault(hit.source_type, {}).setdefault(hit.source_id, []).append(hit)
+    
+    matches = []
+    for source_type, source_hits in hits_by_source.items():
+        model, build = _SOURCE_RESULT_BUILDERS[source_type]
+        ids = list(source_hits.keys())
+        query = db.query(model)
+        if model is not models.Case:
+            query = query.options(joinedload(model.case))
+        for start in range(0, len(ids), identifier_index.LOOKUP_CHUNK_SIZE):
+            chunk = ids[start:start + identifier_index.LOOKUP_CHUNK_SIZE]
+            for row in query.filter(model.id.in_(chunk)).all():
+                for hit in source_hits[row.id]:
+                    result = build(row, hit)
+                    for raw in wanted[(hit.kind, hit.value)]:
+                        matches.append(dict(result, searched_identifier=raw))
+    
+    return matches
+
+
+def _bulk_identifier_search(db: Session, identifiers: Dict[str, Iterable[str]]) -> Tuple[List[dict], List[dict]]:
+    """
+    Resolve a whole identifier set (e.g. every number in a suspect sheet) at once.
+    `identifiers` maps index kind (mobile, upi, account) -> raw extracted values.
+    Uses set-based IN lookups on the identifier index and one query per source table,
+    instead of one universal_search per identifier.
+    Returns (matches, errors); every match carries `searched_identifier`.
+    """
+    wanted, errors = _normalize_search_identifiers(identifiers)
+    return _resolve_search_identifiers(db, wanted), errors
+
+
+def _file_search_matches(db: Session, wanted: Dict[Tuple[str, str], List[str]]) -> List[dict]:
+    """Resolved matches for a search file, one per (case, source, searched identifier)."""
+    unique_results = []
+    seen = set()
+    for result in _resolve_search_identifiers(db, wanted):
+        key = (result['case_id'], result['source'], result.get('searched_identifier'))
+        if key not in seen:
+            seen.add(key)
+            unique_results.append(result)
+    return unique_results
+
 
 @router.get("/universal-search")
 def universal_search(
@@ -63,145 +371,114 @@ def universal_search(
     - Names (suspect/victim)
     - FIR numbers
     - Email addresses
+
+    Identifiers match from the start (a number's leading digits); an identifier
+    type with no such match is searched for any part of the identifier instead.
+    Each index match carries its ``match_mode`` (``match_modes`` has it per type).
     """
     results = []
-    query_lower = query.lower().strip()
     
     # Auto-detect search type if not specified
     if search_type == "auto":
-        if query.replace("+", "").replace("-", "").isdigit() and len(query.replace("+", "").replace("-", "")) >= 10:
-            search_type = "mobile"
-        elif "@" in query and "." in query:
-            if query.count("@") == 1:
-                search_type = "email" if "." in query.split("@")[1] else "upi"
+        classified = identifier_index.classify_identifier(query)
+        if classified:
+            # mobile, upi, email, account (IFSC codes are searched with accounts)
+            search_type = "account" if classified[0] == "ifsc" else classified[0]
         elif "/" in query or query.upper().startswith("FIR"):
             search_type = "fir"
-        elif query.isdigit() and len(query) >= 9:
-            search_type = "account"
         else:
             search_type = "name"
     
+    # Resolve matching rows through the normalized identifier index
+    kinds = list(identifier_index.KINDS_BY_SEARCH_TYPE.get(search_type, ())) + ["file"]
+    hits, match_modes = identifier_index.search_matches(db, query, kinds)
+    hits = identifier_index.group_by_source(hits)
+
+    def with_mode(result: dict, hit) -> dict:
+        if hit is not None:
+            result["match_mode"] = match_modes[hit.kind]
+        return result
+    
     # 1. Search in Telecom Requests (Mobile Numbers)
-    if search_type in ["mobile", "auto"]:
-        requests = db.query(models.TelecomRequest).filter(
-            models.TelecomRequest.mobile_number.ilike(f"%{query}%")
+    request_hits = hits.get(identifier_index.SOURCE_TELECOM_REQUEST, {})
+    if request_hits:
+        requests = db.query(models.TelecomRequest).options(joinedload(models.TelecomRequest.case)).filter(
+            models.TelecomRequest.id.in_(request_hits.keys())
         ).all()
         
         for req in requests:
-            results.append({
-                "source": "Telecom Request",
-                "case_id": req.case_id,
-                "fir_number": req.case.fir_number,
-                "match_type": "Mobile Number",
-                "matched_value": req.mobile_number,
-                "case_type": req.case.case_type.value if req.case.case_type else "N/A",
-                "status": req.case.status,
-                "created_at": req.created_at.isoformat() if req.created_at else None
-            })
+            results.append(with_mode(_telecom_request_match(req), request_hits[req.id]))
     
     # 2. Search in Financial Entities (UPI IDs, Bank Accounts)
-    if search_type in ["upi", "account", "auto"]:
-        financial_entities = db.query(models.FinancialEntity).filter(
-            (models.FinancialEntity.upi_id.ilike(f"%{query}%")) |
-            (models.FinancialEntity.account_number.ilike(f"%{query}%")) |
-            (models.FinancialEntity.account_holder_name.ilike(f"%{query}%")) |
-            (models.FinancialEntity.bank_name.ilike(f"%{query}%"))
+    entity_hits = hits.get(identifier_index.SOURCE_FINANCIAL_ENTITY, {})
+    if entity_hits:
+        financial_entities = db.query(models.FinancialEntity).options(joinedload(models.FinancialEntity.case)).filter(
+            models.FinancialEntity.id.in_(entity_hits.keys())
         ).all()
         
         for entity in financial_entities:
-            match_field = "Unknown"
-            matched_value = query
-            
-            if entity.upi_id and query_lower in entity.upi_id.lower():
-                match_field = "UPI ID"
-                matched_value = entity.upi_id
-            elif entity.account_number and query_lower in entity.account_number.lower():
-                match_field = "Bank Account"
-                matched_value = f"{entity.bank_name} - {entity.account_number}"
-            elif entity.account_holder_name and query_lower in entity.account_holder_name.lower():
-                match_field = "Account Holder Name"
-                matched_value = entity.account_holder_name
-            
-            results.append({
-                "source": "Financial Entity",
-                "case_id": entity.case_id,
-                "fir_number": entity.case.fir_number if entity.case else "N/A",
-                "match_type": match_field,
-                "matched_value": matched_value,
-                "entity_type": entity.entity_type.value if entity.entity_type else "N/A",
-                "transaction_amount": entity.transaction_amount,
-                "case_type": entity.case.case_type.value if entity.case and entity.case.case_type else "N/A",
-                "status": entity.case.status if entity.case else "N/A",
-                "created_at": entity.created_at.isoformat() if entity.created_at else None
-            })
+            hit = entity_hits[entity.id]
+            results.append(with_mode(_financial_entity_match(entity, hit.kind, query), hit))
     
-    # 3. Search in Cases (FIR Number, Description)
-    if search_type in ["fir", "name", "auto"]:
+    # 3. Search in Cases (FIR Number, identifiers mentioned in Description)
+    case_hits = dict(hits.get(identifier_index.SOURCE_CASE, {}))
+    description_matches = {}
+    if search_type == "name":
+        # Free-text description match, BM25-ranked (best first)
+        description_matches = {m.row_id: m for m in fulltext.search_case_descriptions(db, query)}
+    if case_hits or description_matches:
         cases = db.query(models.Case).filter(
-            (models.Case.fir_number.ilike(f"%{query}%")) |
-            (models.Case.description.ilike(f"%{query}%"))
+            models.Case.id.in_(set(case_hits.keys()) | set(description_matches.keys()))
         ).all()
+        cases.sort(key=lambda c: description_matches[c.id].rank if c.id in description_matches else float("-inf"))
         
         for case in cases:
-            match_field = "FIR Number" if query_lower in case.fir_number.lower() else "Case Description"
-            
-            results.append({
-                "source": "Case Record",
-                "case_id": case.id,
-                "fir_number": case.fir_number,
-                "match_type": match_field,
-                "matched_value": case.fir_number,
-                "case_type": case.case_type.value if case.case_type else "N/A",
-                "status": case.status,
-                "police_station": case.police_station,
-                "created_at": case.created_at.isoformat() if case.created_at else None
-            })
+            hit = case_hits.get(case.id)
+            result = _case_match(case, hit.kind if hit is not None else None)
+            text_match = description_matches.get(case.id)
+            if result["match_type"] != "FIR Number" and text_match is not None:
+                result["matched_value"] = fulltext.strip_markers(text_match.snippet)
+                result["snippet"] = text_match.snippet
+                result["rank"] = text_match.rank
+            results.append(with_mode(result, hit))
     
-    # 4. Search in Transaction Timeline (narrative text search)
-    if search_type in ["name", "auto"]:
-        transactions = db.query(models.TransactionTimeline).filter(
-            models.TransactionTimeline.narrative.ilike(f"%{query}%")
+    # 4. Search in Transaction Timeline (identifiers + narrative text search)
+    timeline_hits = hits.get(identifier_index.SOURCE_TIMELINE, {})
+    narrative_matches = {}
+    if search_type == "name":
+        narrative_matches = {m.row_id: m for m in fulltext.search_timeline_narratives(db, query)}
+    if timeline_hits or narrative_matches:
+        transactions = db.query(models.TransactionTimeline).options(joinedload(models.TransactionTimeline.case)).filter(
+            models.TransactionTimeline.id.in_(set(timeline_hits.keys()) | set(narrative_matches.keys()))
         ).all()
+        transactions.sort(key=lambda t: narrative_matches[t.id].rank if t.id in narrative_matches else float("-inf"))
         
         for txn in transactions:
-            results.append({
-                "source": "Transaction Timeline",
-                "case_id": txn.case_id,
-                "fir_number": txn.case.fir_number if txn.case else "N/A",
-                "match_type": "Mentioned in Timeline",
-                "matched_value": txn.narrative[:100] + "..." if len(txn.narrative) > 100 else txn.narrative,
-                "event_type": txn.event_type.value if txn.event_type else "N/A",
-                "amount": txn.amount,
-                "case_type": txn.case.case_type.value if txn.case and txn.case.case_type else "N/A",
-                "created_at": txn.event_timestamp.isoformat() if txn.event_timestamp else None
-            })
+            result = with_mode(_timeline_match(txn), timeline_hits.get(txn.id))
+            text_match = narrative_matches.get(txn.id)
+            if text_match is not None:
+                result["matched_value"] = fulltext.strip_markers(text_match.snippet)
+                result["snippet"] = text_match.snippet
+                result["rank"] = text_match.rank
+            results.append(result)
     
     # 5. Search in Evidence Files (CAF, CDR metadata)
-    evidence_files = db.query(models.Evidence).filter(
-        (models.Evidence.original_filename.ilike(f"%{query}%")) |
-        (models.Evidence.file_type.ilike(f"%{query}%"))
-    ).all()
+    evidence_hits = hits.get(identifier_index.SOURCE_EVIDENCE, {})
+    evidence_files = []
+    if evidence_hits:
+        evidence_files = db.query(models.Evidence).options(joinedload(models.Evidence.case)).filter(
+            models.Evidence.id.in_(evidence_hits.keys())
+        ).all()
     
     for evidence in evidence_files:
-        results.append({
-            "source": "Evidence File",
-            "case_id": evidence.case_id,
-            "fir_number": evidence.case.fir_number if evidence.case else "N/A",
-            "match_type": "Evidence Document",
-            "matched_value": evidence.original_filename,
-            "file_type": evidence.file_type,
-            "file_id": evidence.id,
-            "uploaded_at": evidence.uploaded_at.isoformat() if evidence.uploaded_at else None,
-            "case_type": evidence.case.case_type.value if evidence.case and evidence.case.case_type else "N/A",
-            "status": evidence.case.status if evidence.case else "N/A",
-            "verification_status": evidence.verification_status
-        })
+        hit = evidence_hits[evidence.id]
+        results.append(with_mode(_evidence_match(evidence, hit.kind, hit.value), hit))
     
-    # Remove duplicates based on case_id and source
+    # Remove duplicates based on case_id and source (evidence files are listed individually)
     unique_results = []
     seen = set()
     for result in results:
-        key = (result["case_id"], result["source"], result["match_type"])
+        key = (result["case_id"], result["source"], result["match_type"], result.get("file_id"))
         if key not in seen:
             seen.add(key)
             unique_results.append(result)
@@ -209,6 +486,7 @@ def universal_search(
     return {
         "query": query,
         "search_type": search_type,
+        "match_modes": match_modes,
         "matches": unique_results,
         "count": len(unique_results),
         "summary": {
@@ -249,17 +527,26 @@ def get_comprehensive_investigation_data(
     case_ids = set()
     
     # 1. Collect all Case IDs from various matches
+    hits = identifier_index.group_by_source(identifier_index.search(
+        db, identifier, ("fir", "mobile", "upi", "account", "name", "email")
+    ))
+    
     # Match by Case Text
-    text_cases = db.query(models.Case).filter(
-        (models.Case.fir_number.ilike(f"%{identifier}%")) |
-        (models.Case.description.ilike(f"%{identifier}%"))
-    ).all()
-    for c in text_cases: case_ids.add(c.id)
+    case_ids.update(hits.get(identifier_index.SOURCE_CASE, {}).keys())
+    description_matches = {m.row_id: m for m in fulltext.search_case_descriptions(db, identifier, phrase=True)}
+    case_ids.update(description_matches.keys())
+    
+    # Match by evidence contents (identifiers found in extracted files)
+    evidence_hits = hits.get(identifier_index.SOURCE_EVIDENCE, {})
+    case_ids.update(hit.case_id for hit in evidence_hits.values() if hit.case_id)
     
     # Match by Telecom
-    telecom_requests = db.query(models.TelecomRequest).filter(
-        models.TelecomRequest.mobile_number.ilike(f"%{identifier}%")
-    ).all()
+    telecom_requests = []
+    request_hits = hits.get(identifier_index.SOURCE_TELECOM_REQUEST, {})
+    if request_hits:
+        telecom_requests = db.query(models.TelecomRequest).options(joinedload(models.TelecomRequest.case)).filter(
+            models.TelecomRequest.id.in_(request_hits.keys())
+        ).all()
     for req in telecom_requests:
         case_ids.add(req.case_id)
         investigation_data["telecom_requests"].append({
@@ -274,11 +561,12 @@ def get_comprehensive_investigation_data(
         })
     
     # Match by Financial
-    financial_entities = db.query(models.FinancialEntity).filter(
-        (models.FinancialEntity.upi_id.ilike(f"%{identifier}%")) |
-        (models.FinancialEntity.account_number.ilike(f"%{identifier}%")) |
-        (models.FinancialEntity.account_holder_name.ilike(f"%{identifier}%"))
-    ).all()
+    financial_entities = []
+    entity_hits = hits.get(identifier_index.SOURCE_FINANCIAL_ENTITY, {})
+    if entity_hits:
+        financial_entities = db.query(models.FinancialEntity).options(joinedload(models.FinancialEntity.case)).filter(
+            models.FinancialEntity.id.in_(entity_hits.keys())
+        ).all()
     for entity in financial_entities:
         case_ids.add(entity.case_id)
         investigation_data["financial_entities"].append({
@@ -309,12 +597,13 @@ def get_comprehensive_investigation_data(
                 "status": case.status,
                 "amount_involved": case.amount_involved,
                 "description": case.description,
+                "description_snippet": description_matches[case.id].snippet if case.id in description_matches else None,
                 "created_at": case.created_at.isoformat() if case.created_at else None
             })
     
     # 4. Get ALL Evidence Files for discovered cases
     if case_ids:
-        evidence_files = db.query(models.Evidence).filter(
+        evidence_files = db.query(models.Evidence).options(joinedload(models.Evidence.case)).filter(
             models.Evidence.case_id.in_(case_ids)
         ).all()
         
@@ -327,11 +616,12 @@ def get_comprehensive_investigation_data(
                 "original_filename": evidence.original_filename,
                 "uploaded_at": evidence.uploaded_at.isoformat() if evidence.uploaded_at else None,
                 "verification_status": evidence.verification_status,
-                "file_hash": evidence.file_hash
+                "file_hash": evidence.file_hash,
+                "mentions_identifier": evidence.id in evidence_hits
             })
         
         # 5. Get Transaction Timeline for discovered cases
-        timeline = db.query(models.TransactionTimeline).filter(
+        timeline = db.query(models.TransactionTimeline).options(joinedload(models.TransactionTimeline.case)).filter(
             models.TransactionTimeline.case_id.in_(case_ids)
         ).order_by(models.TransactionTimeline.event_timestamp.desc()).all()
         
@@ -474,23 +764,15 @@ def get_network_graph(
     found_case_ids = set()
     
     if identifier:
-        # 1. Search Telecom Requests
-        requests = db.query(models.TelecomRequest).filter(models.TelecomRequest.mobile_number.ilike(f"%{identifier}%")).all()
-        for r in requests:
-            found_case_ids.add(r.case_id)
-            
-        # 2. Search Financial Entities
-        financials = db.query(models.FinancialEntity).filter(
-            (models.FinancialEntity.upi_id.ilike(f"%{identifier}%")) |
-            (models.FinancialEntity.account_number.ilike(f"%{identifier}%"))
-        ).all()
-        for f in financials:
-            found_case_ids.add(f.case_id)
-            
-        # 3. Search Cases directly
-        cases = db.query(models.Case).filter(models.Case.fir_number.ilike(f"%{identifier}%")).all()
-        for c in cases:
-            found_case_ids.add(c.id)
+        # Telecom requests (mobile), financial entities (UPI/account) and cases (FIR)
+        hits = identifier_index.search(db, identifier, ("mobile", "upi", "account", "fir"))
+        for hit in hits:
+            if hit.source_type in (
+                identifier_index.SOURCE_TELECOM_REQUEST,
+                identifier_index.SOURCE_FINANCIAL_ENTITY,
+                identifier_index.SOURCE_CASE,
+            ):
+                found_case_ids.add(hit.case_id)
 
     # If no identifier or no matches, return empty or default view
     if not found_case_ids:
@@ -503,13 +785,20 @@ def get_network_graph(
     # Fetch all confirmed cases
     all_cases = db.query(models.Case).filter(models.Case.id.in_(found_case_ids)).all()
     
+    # Load linked mobiles / financials for all cases at once instead of per case
+    reqs_by_case = {}
+    for r in db.query(models.TelecomRequest).filter(models.TelecomRequest.case_id.in_(found_case_ids)).all():
+        reqs_by_case.setdefault(r.case_id, []).append(r)
+    fins_by_case = {}
+    for f in db.query(models.FinancialEntity).filter(models.FinancialEntity.case_id.in_(found_case_ids)).all():
+        fins_by_case.setdefault(f.case_id, []).append(f)
+    
     for case in all_cases:
         cid = f"CASE_{case.id}"
         add_node(cid, f"FIR: {case.fir_number}", "case", "#4CAF50", 40) # Larger node for Case
         
         # Add Mobiles linked to this Case
-        case_reqs = db.query(models.TelecomRequest).filter(models.TelecomRequest.case_id == case.id).all()
-        for r in case_reqs:
+        for r in reqs_by_case.get(case.id, []):
             mid = f"MOB_{r.mobile_number}"
             color = "#FF9800" # Orange for mobile
             if identifier and str(identifier) in r.mobile_number: color = "#d32f2f" # Red if it matches search
@@ -518,8 +807,7 @@ def get_network_graph(
             add_edge(cid, mid, "suspect")
             
         # Add Financials linked to this Case
-        case_fins = db.query(models.FinancialEntity).filter(models.FinancialEntity.case_id == case.id).all()
-        for f in case_fins:
+        for f in fins_by_case.get(case.id, []):
             val = f.upi_id or f.account_number
             fid = f"FIN_{val}"
             color = "#2196F3" # Blue for finance
@@ -546,6 +834,69 @@ def multi_case_search(
     return universal_search(mobile_number, "mobile", db, current_user)
 
 
+def _file_search_identifiers(content: bytes, file_extension: str) -> Dict[str, set]:
+    """Identifiers in an uploaded Excel/CSV/PDF by category (CPU-bound; run off the event loop)."""
+    identifiers = []
+    
+    # Process based on file type
+    if file_extension in ['xlsx', 'xls', 'csv']:
+        # Excel/CSV Processing
+        try:
+            import pandas as pd
+            
+            if file_extension == 'csv':
+                df = pd.read_csv(io.BytesIO(content))
+            else:
+                df = pd.read_excel(io.BytesIO(content))
+            
+            # Extract all data as strings
+            for col in df.columns:
+                for value in df[col].dropna():
+                    if value:
+                        identifiers.append(str(value).strip())
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error processing Excel/CSV: {str(e)}")
+    
+    elif file_extension == 'pdf':
+        # PDF Processing
+        try:
+            import PyPDF2
+            pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
+            text = ""
+            for page in pdf_reader.pages:
+                text += page.extract_text()
+            
+            # Extract identifiers from text
+            identifiers = text.split()
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Error processing PDF: {str(e)}")
+    else:
+        raise HTTPException(status_code=400, detail="Unsupported file format. Use Excel, CSV, or PDF")
+    
+    # Extract phone numbers, UPI IDs, account numbers using regex
+    extracted_data = {
+        'mobile_numbers': set(),
+        'upi_ids': set(),
+        'account_numbers': set(),
+        'other_identifiers': set()
+    }
+    
+    for identifier in identifiers:
+        # Mobile number pattern (Indian)
+        if re.match(r'^[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}$', identifier):
+            extracted_data['mobile_numbers'].add(identifier)
+        # UPI ID pattern
+        elif '@' in identifier and '.' not in identifier.split('@')[0]:
+            extracted_data['upi_ids'].add(identifier)
+        # Account number pattern (9-18 digits)
+        elif re.match(r'^\d{9,18}$', identifier):
+            extracted_data['account_numbers'].add(identifier)
+        # Other identifiers (names, FIR numbers, etc.)
+        elif len(identifier) > 3:
+            extracted_data['other_identifiers'].add(identifier)
+    return extracted_data
+
+
 @router.post("/file-search")
 async def file_based_search(
     file: UploadFile = File(...),
@@ -555,72 +906,17 @@ async def file_based_search(
     """
     Upload and analyze files (PDF, Excel, CSV) to extract identifiers
     and perform batch intelligence search.
+
+    Parsing, the bulk lookup and response encoding all run in the threadpool,
+    so a large search file does not hold up other requests on the worker.
     """
     try:
         content = await file.read()
         file_extension = file.filename.split('.')[-1].lower()
         
-        identifiers = []
-        
-        # Process based on file type
-        if file_extension in ['xlsx', 'xls', 'csv']:
-            # Excel/CSV Processing
-            try:
-                import pandas as pd
-                
-                if file_extension == 'csv':
-                    df = pd.read_csv(io.BytesIO(content))
-                else:
-                    df = pd.read_excel(io.BytesIO(content))
-                
-                # Extract all data as strings
-                for col in df.columns:
-                    for value in df[col].dropna():
-                        if value:
-                            identifiers.append(str(value).strip())
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error processing Excel/CSV: {str(e)}")
-        
-        elif file_extension == 'pdf':
-            # PDF Processing
-            try:
-                import PyPDF2
-                pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                
-                # Extract identifiers from text
-                identifiers = text.split()
-            except Exception as e:
-                raise HTTPException(status_code=400, detail=f"Error processing PDF: {str(e)}")
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format. Use Excel, CSV, or PDF")
-        
-        # Extract phone numbers, UPI IDs, account numbers using regex
-        extracted_data = {
-            'mobile_numbers': set(),
-            'upi_ids': set(),
-            'account_numbers': set(),
-            'other_identifiers': set()
-        }
-        
-        for identifier in identifiers:
-            # Mobile number pattern (Indian)
-            if re.match(r'^[\+]?[(]?[0-9]{3}[)]?[-\s\.]?[0-9]{3}[-\s\.]?[0-9]{4,6}$', identifier):
-                extracted_data['mobile_numbers'].add(identifier)
-            # UPI ID pattern
-            elif '@' in identifier and '.' not in identifier.split('@')[0]:
-                extracted_data['upi_ids'].add(identifier)
-            # Account number pattern (9-18 digits)
-            elif re.match(r'^\d{9,18}$', identifier):
-                extracted_data['account_numbers'].add(identifier)
-            # Other identifiers (names, FIR numbers, etc.)
-            elif len(identifier) > 3:
-                extracted_data['other_identifiers'].add(identifier)
+        extracted_data = await run_in_threadpool(_file_search_identifiers, content, file_extension)
         
         # Perform batch search
-        all_results = []
         summary_stats = {
             'total_identifiers': sum(len(v) for v in extracted_data.values()),
             'mobile_numbers_found': len(extracted_data['mobile_numbers']),
@@ -629,49 +925,19 @@ async def file_based_search(
             'total_matches': 0
         }
         
-        # Search each type
-        for mobile in extracted_data['mobile_numbers']:
-            try:
-                result = universal_search(mobile, "mobile", db, current_user)
-                if result['count'] > 0:
-                    for match in result['matches']:
-                        match['searched_identifier'] = mobile
-                        all_results.append(match)
-            except:
-                pass
-        
-        for upi in extracted_data['upi_ids']:
-            try:
-                result = universal_search(upi, "upi", db, current_user)
-                if result['count'] > 0:
-                    for match in result['matches']:
-                        match['searched_identifier'] = upi
-                        all_results.append(match)
-            except:
-                pass
-        
-        for account in extracted_data['account_numbers']:
-            try:
-                result = universal_search(account, "account", db, current_user)
-                if result['count'] > 0:
-                    for match in result['matches']:
-                        match['searched_identifier'] = account
-                        all_results.append(match)
-            except:
-                pass
-        
-        # Remove duplicates
-        unique_results = []
-        seen = set()
-        for result in all_results:
-            key = (result['case_id'], result['source'], result.get('searched_identifier'))
-            if key not in seen:
-                seen.add(key)
-                unique_results.append(result)
+        # Resolve every extracted identifier in one bulk pass
+        wanted, search_errors = await run_in_threadpool(_normalize_search_identifiers, {
+            "mobile": extracted_data['mobile_numbers'],
+            "upi": extracted_data['upi_ids'],
+            "account": extracted_data['account_numbers'],
+        })
+        unique_results = await run_in_threadpool(_file_search_matches, db, wanted)
+        summary_stats['identifiers_with_errors'] = len(search_errors)
         
         summary_stats['total_matches'] = len(unique_results)
         
-        return {
+        # Encoding a large match list is CPU work too: keep it off the event loop
+        return JSONResponse(await run_in_threadpool(jsonable_encoder, {
             'filename': file.filename,
             'file_type': file_extension,
             'extracted_data': {
@@ -681,8 +947,9 @@ async def file_based_search(
             },
             'summary': summary_stats,
             'matches': unique_results,
-            'count': len(unique_results)
-        }
+            'count': len(unique_results),
+            'errors': search_errors
+        }))
         
     except HTTPException:
         raise
@@ -21,7 +21,7 @@ router = APIRouter(
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -35,6 +35,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         token_data = schemas.TokenData(username=username, role=payload.get("role"))
     except JWTError:
         raise credentials_exception
+    # Sync dependency: FastAPI runs the lookup in the threadpool, off the event loop
     user = db.query(models.User).filter(models.User.username == token_data.username).first()
     if user is None:
         raise credentials_exception
@@ -143,7 +144,7 @@ async def read_users_me(current_user: models.User = Depends(get_current_active_u
     return current_user
 
 @router.post("/change-password")
-async def change_password(
+def change_password(
     data: schemas.PasswordChange,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
@@ -6,6 +6,7 @@ from sqlalchemy.sql import func
 from backend.database import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_active_user
+from backend.utils import case_scope
 from backend.nodal_contacts import get_bank_nodal_email, get_all_banks
 
 router = APIRouter(
@@ -78,33 +79,9 @@ def get_bank_requests(
     """
     Get all bank requests (filtered by user access)
     """
-    # Get all case IDs the user can access
-    cases_query = db.query(models.Case)
-    
-    # Apply RBAC filtering (similar to cases.py)
-    role = current_user.role
-    if role in [models.UserRole.CONSTABLE, models.UserRole.HEAD_CONSTABLE, 
-                models.UserRole.SUB_INSPECTOR, models.UserRole.INSPECTOR]:
-        if current_user.station_name:
-            cases_query = cases_query.filter(models.Case.police_station == current_user.station_name)
-    elif role == models.UserRole.DY_SP:
-        if current_user.sub_division:
-            cases_query = cases_query.filter(models.Case.sub_division == current_user.sub_division)
-    elif role == models.UserRole.SP:
-        if current_user.district_name:
-            cases_query = cases_query.filter(models.Case.district_name == current_user.district_name)
-    elif role == models.UserRole.DIG:
-        if current_user.range_name:
-            cases_query = cases_query.filter(models.Case.range_name == current_user.range_name)
-    elif role == models.UserRole.IGP:
-        if current_user.zone_name:
-            cases_query = cases_query.filter(models.Case.zone_name == current_user.zone_name)
-    
-    accessible_case_ids = [c.id for c in cases_query.all()]
-    
-    # Get bank requests for accessible cases
-    requests = db.query(models.BankRequest).filter(
-        models.BankRequest.case_id.in_(accessible_case_ids)
+    # Scope is applied in SQL (IN subquery on the user's cases), not as an id list
+    requests = case_scope.scope_by_case(
+        db.query(models.BankRequest), models.BankRequest.case_id, current_user
     ).order_by(models.BankRequest.created_at.desc()).offset(skip).limit(limit).all()
     
     return requests
@@ -116,7 +93,10 @@ def get_bank_request(
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Get specific bank request"""
-    request = db.query(models.BankRequest).filter(models.BankRequest.id == request_id).first()
+    request = case_scope.scope_by_case(
+        db.query(models.BankRequest).filter(models.BankRequest.id == request_id),
+        models.BankRequest.case_id, current_user
+    ).first()
     if not request:
         raise HTTPException(status_code=404, detail="Bank request not found")
     return request
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from backend.database import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_active_user
+from backend.utils import identifier_index, case_scope
 
 router = APIRouter(
     prefix="/cases",
@@ -50,6 +51,8 @@ def create_case(
         zone_name=current_user.zone_name or "North"
     )
     db.add(new_case)
+    db.flush()
+    identifier_index.index_case(db, new_case)
     db.commit()
     db.refresh(new_case)
     return new_case
@@ -61,43 +64,9 @@ def read_cases(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    query = db.query(models.Case)
-    
-    # RBAC Filtering
-    role = current_user.role
-    
-    # Level 1: Station Level (Constable, Head Constable, SI, SHO)
-    if role in [models.UserRole.CONSTABLE, models.UserRole.HEAD_CONSTABLE, models.UserRole.SUB_INSPECTOR, models.UserRole.INSPECTOR]:
-        if current_user.station_name:
-            query = query.filter(models.Case.police_station == current_user.station_name)
-    
-    # Level 2: Sub-Division (CO / DySP)
-    elif role == models.UserRole.DY_SP:
-        if current_user.sub_division:
-            query = query.filter(models.Case.sub_division == current_user.sub_division)
-            
-    # Level 2: District (SP)
-    elif role == models.UserRole.SP:
-        if current_user.district_name:
-            query = query.filter(models.Case.district_name == current_user.district_name)
-
-    # Level 3: Range (DIG)
-    elif role == models.UserRole.DIG:
-        if current_user.range_name:
-            query = query.filter(models.Case.range_name == current_user.range_name)
-            
-    # Level 3: Zone (IGP)
-    elif role == models.UserRole.IGP:
-        if current_user.zone_name:
-            query = query.filter(models.Case.zone_name == current_user.zone_name)
-            
-    # Level 3: State (DGP)
-    elif role == models.UserRole.DGP:
-        pass # See all
-        
-    # Legacy/Admin
-    elif role in [models.UserRole.ADMIN, models.UserRole.OFFICER]:
-        pass # Allow visibility for now
+    # RBAC Filtering: station, sub-division, district, range or zone by role
+    # (DGP / Admin / Officer see all), see utils/case_scope.py
+    query = case_scope.scope_cases(db.query(models.Case), current_user)
         
     cases = query.order_by(models.Case.created_at.desc()).offset(skip).limit(limit).all()
     return cases
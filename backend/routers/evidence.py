@@ -1,40 +1,134 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse
-import os
-import uuid
-import shutil
+import json
 
-from backend.utils.evidence_analysis import process_file
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from backend.database import get_db
+from backend import models, schemas
+from backend.routers.auth import get_current_active_user
+from backend.routers.files import ingest_upload
+from backend.utils import case_scope, evidence_analysis, table_store
 
 router = APIRouter(prefix="/evidence", tags=["evidence"])
 
-UPLOAD_DIR = "secure_uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+@router.post("/upload", response_model=schemas.EvidenceResponse)
+async def upload_evidence(
+    file: UploadFile = File(...),
+    case_id: int = Form(...),
+    file_type: str = Form("OTHER"),
+    description: Optional[str] = Form(None),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Upload evidence for analysis.
+
+    Goes through the same ingest pipeline as /files/upload (encrypted, hashed,
+    recorded against the case). The analyzer runs as a background job
+    (``job_id``, see /jobs) and its result is served by
+    GET /evidence/{evidence_id}/extraction.
+    """
+    return await ingest_upload(db, current_user, case_id, file, file_type, note=description)
+
+
+def _get_accessible_evidence(db: Session, evidence_id: int, current_user: models.User) -> models.Evidence:
+    evidence = db.query(models.Evidence).filter(models.Evidence.id == evidence_id).first()
+    if not evidence:
+        raise HTTPException(status_code=404, detail="Evidence not found")
+    case = db.query(models.Case).filter(models.Case.id == evidence.case_id).first()
+    if not case:
+        raise HTTPException(status_code=404, detail="Associated case not found")
+
+    # Same visibility rules as evidence download
+    if not case_scope.can_access_evidence(current_user, case):
+        raise HTTPException(status_code=403, detail="Access denied: You do not have permission to access this evidence")
+    return evidence
+
+
+def _get_table(evidence: models.Evidence) -> table_store.Table:
+    table = table_store.open_table(evidence.file_hash)
+    if table is None:
+        if evidence_analysis.is_tabular(evidence.original_filename or ""):
+            raise HTTPException(status_code=409, detail="Extraction pending; rows are not available yet")
+        raise HTTPException(status_code=404, detail="No tabular data for this evidence")
+    return table
 
 
-@router.post("/upload")
-async def upload_evidence(file: UploadFile = File(...), case_id: str = Form(None), description: str = Form(None)):
-    """Accept an uploaded evidence file, save a copy, and run the analyzer.
+def _parse_columns(table: table_store.Table, columns: Optional[str]) -> Optional[List[str]]:
+    if not columns:
+        return None
+    selected = [c.strip() for c in columns.split(",") if c.strip()]
+    unknown = [c for c in selected if c not in table.columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown column(s): {', '.join(unknown)}")
+    return selected
 
-    The original uploaded stream is preserved by saving a separate copy to `secure_uploads`.
-    The analyzer will only read the saved copy and will not modify the original data.
+
+@router.get("/{evidence_id}/extraction")
+def get_extraction(
+    evidence_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Analyzer output for an evidence file (extracted once per file content).
+
+    For CSV/spreadsheet evidence ``Extracted Data`` is a preview of the first
+    rows; ``Table`` gives the row count and columns, and the full table is read
+    through /rows (paginated) or /rows.ndjson (streamed).
     """
-    filename = file.filename or "uploaded_evidence"
-    uid = uuid.uuid4().hex
-    dest_name = f"{uid}_{filename}"
-    dest_path = os.path.join(UPLOAD_DIR, dest_name)
-    try:
-        with open(dest_path, "wb") as out_f:
-            shutil.copyfileobj(file.file, out_f)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to save upload: {e}")
-
-    # Run analysis (safely handles missing optional dependencies)
-    result = process_file(dest_path)
-
-    # Attach basic metadata about storage location (relative path)
-    result.setdefault("Notes", "")
-    result["Notes"] = (result.get("Notes") + " ").strip()
-    result["Stored Copy Path"] = dest_path
-
-    return JSONResponse(content=result)
+    evidence = _get_accessible_evidence(db, evidence_id, current_user)
+    result = evidence_analysis.load_extraction(evidence.file_hash)
+    if result is None:
+        return {"evidence_id": evidence.id, "status": "pending"}
+    return {"evidence_id": evidence.id, "status": "done", "result": result}
+
+
+@router.get("/{evidence_id}/rows")
+def get_rows(
+    evidence_id: int,
+    cursor: int = Query(0, ge=0),
+    limit: int = Query(table_store.DEFAULT_PAGE_ROWS, ge=1, le=table_store.MAX_PAGE_ROWS),
+    columns: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """One page of extracted rows. ``cursor`` is the row offset (pass back
+    ``next_cursor``); ``columns`` is a comma-separated projection."""
+    evidence = _get_accessible_evidence(db, evidence_id, current_user)
+    table = _get_table(evidence)
+    selected = _parse_columns(table, columns)
+    page = table_store.read_page(table, cursor, limit, selected)
+    next_cursor = cursor + len(page)
+    return {
+        "evidence_id": evidence.id,
+        "columns": selected or table.columns,
+        "total_rows": table.rows,
+        "cursor": cursor,
+        "next_cursor": next_cursor if next_cursor < table.rows else None,
+        "rows": table_store.records(page),
+    }
+
+
+@router.get("/{evidence_id}/rows.ndjson")
+def stream_rows(
+    evidence_id: int,
+    columns: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """All extracted rows as newline-delimited JSON, one stored chunk in memory at a time."""
+    evidence = _get_accessible_evidence(db, evidence_id, current_user)
+    table = _get_table(evidence)
+    selected = _parse_columns(table, columns)
+
+    def lines():
+        for chunk in table_store.iter_chunks(table, selected):
+            yield "".join(json.dumps(row, default=str) + "\n" for row in table_store.records(chunk)).encode("utf-8")
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"X-Total-Rows": str(table.rows)}
+    )
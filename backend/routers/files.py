@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import datetime
 import os
-import hashlib
-from cryptography.fernet import Fernet
 import shutil
+import re
+import itertools
+from typing import Iterator, Optional, Tuple
 
 from backend.database import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_active_user
+from backend.utils import identifier_index, secure_storage, blob_store, evidence_analysis, job_queue, case_scope
+from starlette.concurrency import run_in_threadpool
 
 from backend import config
 
@@ -22,16 +26,209 @@ UPLOAD_DIR = "secure_uploads"
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
-cipher_suite = Fernet(config.ENCRYPTION_KEY)
+# Uploads are read, hashed and encrypted this many bytes at a time
+UPLOAD_CHUNK_SIZE = 1024 * 1024
 
-@router.post("/upload/{case_id}", response_model=schemas.EvidenceResponse)
-async def upload_evidence(
+RANGE_RE = re.compile(r'bytes=(\d*)-(\d*)$')
+
+
+def _parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Byte range [start, end) requested by a single-range ``Range`` header.
+    None means serve the whole file (no header, or a multi-range request,
+    which RFC 9110 lets us answer with 200). Unsatisfiable ranges raise 416.
+    """
+    if not range_header:
+        return None
+    match = RANGE_RE.match(range_header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+    elif last:
+        start, end = max(size - int(last), 0), size  # suffix: last N bytes
+    else:
+        start, end = size, size
+    if start >= end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def _stream_evidence(stored: secure_storage.EncryptedFile, byte_range: Optional[Tuple[int, int]],
+                     media_type: str, disposition: str, chunks: Optional[Iterator[bytes]] = None):
+    """200 or 206 streaming response over the decrypted evidence bytes."""
+    start, end = byte_range or (0, stored.size)
+    headers = {
+        "Content-Disposition": disposition,
+        "Content-Length": str(end - start),
+        "Accept-Ranges": "bytes"
+    }
+    if byte_range:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{stored.size}"
+    return StreamingResponse(
+        chunks if chunks is not None else stored.iter_range(start, end),
+        status_code=206 if byte_range else 200,
+        media_type=media_type,
+        headers=headers
+    )
+
+
+def _file_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size: {config.MAX_FILE_SIZE_MB}MB"
+    )
+
+
+async def _encrypt_upload(file: UploadFile) -> Tuple[str, str, int]:
+    """
+    Stream an upload into an encrypted temp file in the blob store, hashing as it goes
+    and aborting with 413 as soon as MAX_FILE_SIZE_BYTES is crossed.
+    Returns (temp path, sha256, size); the caller hands the temp file to the blob store.
+    """
+    if file.size is not None and file.size > config.MAX_FILE_SIZE_BYTES:
+        raise _file_too_large()
+
+    tmp_path = blob_store.upload_temp_path()
+    try:
+        with open(tmp_path, "wb") as f:
+            writer = secure_storage.SegmentWriter(f)
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                if writer.size + len(chunk) > config.MAX_FILE_SIZE_BYTES:
+                    raise _file_too_large()
+                await run_in_threadpool(writer.write, chunk)
+            sha256_hash = await run_in_threadpool(writer.close)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return tmp_path, sha256_hash, writer.size
+
+
+def _record_upload(
+    db: Session,
+    current_user: models.User,
+    case: models.Case,
+    filename: str,
+    file_type: str,
+    tmp_path: str,
+    sha256_hash: str,
+    size: int,
+    status: str,
+    note: Optional[str]
+) -> Tuple[models.Evidence, list, Optional[models.Job]]:
+    """
+    Blob reference, Evidence row, identifier index, audit entry and extraction
+    job for an encrypted upload (flushed, not committed).
+    """
+    # Content-addressed storage: one encrypted blob per hash, shared by every
+    # Evidence row with this content (a re-upload only adds a reference)
+    try:
+        blob, _ = blob_store.store(db, tmp_path, sha256_hash, size)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Create DB Entry
+    new_evidence = models.Evidence(
+        case_id=case.id,
+        file_type=file_type,
+        file_path=blob.file_path,
+        file_hash=sha256_hash,
+        original_filename=filename,
+        uploaded_by_id=current_user.id,
+        # RBAC fields
+        uploaded_by_rank=current_user.rank,
+        verification_status=status
+    )
+    db.add(new_evidence)
+    db.flush()
+    identifier_index.index_evidence(db, new_evidence)
+
+    # Same file already attached elsewhere: report it (cross-case link)
+    copies = blob_store.other_copies(db, sha256_hash, new_evidence.id)
+    details = f"Uploaded {filename} (Hash: {sha256_hash}) to Case {case.fir_number}"
+    if copies:
+        details += f"; identical file already in Case(s) {', '.join(sorted({c.fir_number or str(c.id) for _, c in copies}))}"
+    if note:
+        details += f". Note: {note}"
+    
+    # Audit Log
+    log = models.AuditLog(
+        user_id=current_user.id,
+        action="UPLOAD_EVIDENCE",
+        details=details
+    )
+    db.add(log)
+
+    # CDR normalization and content extraction run in the job queue, once per content
+    job = None
+    if evidence_analysis.needs_processing(sha256_hash, file_type, filename):
+        job = job_queue.enqueue(
+            db, "process_evidence",
+            {"file_path": blob.file_path, "file_hash": sha256_hash,
+             "filename": filename, "file_type": file_type},
+            dedup_key=f"process_evidence:{sha256_hash}",
+            evidence_id=new_evidence.id, case_id=case.id, created_by_id=current_user.id
+        )
+    return new_evidence, copies, job
+
+
+def _save_upload(db: Session, *args) -> models.Evidence:
+    """
+    ``_record_upload`` plus commit, with ``job_id`` / ``duplicate_of`` attached
+    to the returned Evidence. Blocking ORM work: called through ``run_in_threadpool``.
+    """
+    new_evidence, copies, job = _record_upload(db, *args)
+    duplicate_of = [
+        schemas.EvidenceCopy(
+            evidence_id=e.id,
+            case_id=c.id,
+            fir_number=c.fir_number,
+            police_station=c.police_station,
+            original_filename=e.original_filename,
+            uploaded_at=e.uploaded_at
+        )
+        for e, c in copies
+    ]
+    db.commit()
+    db.refresh(new_evidence)
+    if job is not None:
+        job_queue.runner.notify()
+
+    new_evidence.job_id = job.id if job is not None else None
+    new_evidence.duplicate_of = duplicate_of
+    return new_evidence
+
+
+async def ingest_upload(
+    db: Session,
+    current_user: models.User,
     case_id: int,
-    file: UploadFile = File(...),
-    file_type: str = Form(...), # CDR_CSV, CAF_PDF, etc
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_active_user)
-):
+    file: UploadFile,
+    file_type: str,
+    note: Optional[str] = None
+) -> models.Evidence:
+    """
+    The single evidence ingest pipeline behind every upload endpoint: permission
+    and case checks, one streaming pass that hashes and encrypts the upload into
+    the blob store, the Evidence row, identifier index and audit entry, and a
+    background job for the extraction stage (its id is returned as ``job_id``).
+
+    The upload is streamed on the event loop; every database step runs in the
+    threadpool, so uploads keep flowing on a worker that is also serving
+    analysis requests.
+    """
     # RBAC Upload Permission
     allowed_uploaders = [
         models.UserRole.CONSTABLE, models.UserRole.HEAD_CONSTABLE, 
@@ -58,7 +255,7 @@ async def upload_evidence(
         )
     
     # Verify Case access (scope check)
-    case = db.query(models.Case).filter(models.Case.id == case_id).first()
+    case = await run_in_threadpool(db.get, models.Case, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
         
@@ -68,63 +265,25 @@ async def upload_evidence(
     if current_user.station_name and case.police_station and current_user.station_name != case.police_station:
          raise HTTPException(status_code=403, detail="Evidence upload restricted to case's Police Station.")
 
-    # Read file content
-    content = await file.read()
-    
-    # FIX: Validate file size
-    if len(content) > config.MAX_FILE_SIZE_BYTES:
-        raise HTTPException(
-            status_code=413, 
-            detail=f"File too large. Maximum size: {config.MAX_FILE_SIZE_MB}MB"
-        )
-    
-    # Calculate SHA-256
-    sha256_hash = hashlib.sha256(content).hexdigest()
-    
-    # Check if duplicate hash exists (deduplication or integrity check)
-    # optional: if db.query(models.Evidence).filter(models.Evidence.file_hash == sha256_hash).first(): ...
+    # Stream, hash, size-check and encrypt (1 MB AES-GCM segments, see
+    # utils/secure_storage.py) in one pass with bounded memory
+    tmp_path, sha256_hash, size = await _encrypt_upload(file)
 
-    # Encrypt
-    encrypted_content = cipher_suite.encrypt(content)
-    
-    # Save to disk
-    # FIX: Use enhanced filename sanitization
-    from backend.utils.validation import sanitize_filename
-    cleaned_filename = sanitize_filename(file.filename)
-    
-    # Filename: {hash}_{original_name} to avoid collisions and obscure basic names
-    safe_filename = f"{sha256_hash}_{cleaned_filename}"
-    file_path = os.path.join(UPLOAD_DIR, safe_filename)
-    
-    with open(file_path, "wb") as f:
-        f.write(encrypted_content)
-        
-    # Create DB Entry
-    new_evidence = models.Evidence(
-        case_id=case_id,
-        file_type=file_type,
-        file_path=file_path,
-        file_hash=sha256_hash,
-        original_filename=file.filename,
-        uploaded_by_id=current_user.id,
-        # RBAC fields
-        uploaded_by_rank=current_user.rank,
-        verification_status=status
-    )
-    db.add(new_evidence)
-    
-    # Audit Log
-    log = models.AuditLog(
-        user_id=current_user.id,
-        action="UPLOAD_EVIDENCE",
-        details=f"Uploaded {file.filename} (Hash: {sha256_hash}) to Case {case.fir_number}"
+    return await run_in_threadpool(
+        _save_upload, db, current_user, case, file.filename, file_type,
+        tmp_path, sha256_hash, size, status, note
     )
-    db.add(log)
-    
-    db.commit()
-    db.refresh(new_evidence)
-    
-    return new_evidence
+
+
+@router.post("/upload/{case_id}", response_model=schemas.EvidenceResponse)
+async def upload_evidence(
+    case_id: int,
+    file: UploadFile = File(...),
+    file_type: str = Form(...), # CDR_CSV, CAF_PDF, etc
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    return await ingest_upload(db, current_user, case_id, file, file_type)
 
 @router.get("/case/{case_id}", response_model=list[schemas.EvidenceResponse])
 def get_case_evidence(
@@ -132,13 +291,17 @@ def get_case_evidence(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    evidence = db.query(models.Evidence).filter(models.Evidence.case_id == case_id).all()
+    evidence = case_scope.scope_by_case(
+        db.query(models.Evidence).filter(models.Evidence.case_id == case_id),
+        models.Evidence.case_id, current_user
+    ).all()
     return evidence
 
 # Optional: Download/Decrypt endpoint (Admin/SHO only?)
 @router.get("/download/{evidence_id}")
 def download_evidence(
     evidence_id: int,
+    range_header: Optional[str] = Header(None, alias="Range"),
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
@@ -151,47 +314,30 @@ def download_evidence(
     if not case:
         raise HTTPException(status_code=404, detail="Associated case not found")
     
-    # Apply same RBAC logic as case viewing
-    role = current_user.role
-    has_access = False
-    
-    if role in [models.UserRole.DGP, models.UserRole.ADMIN]:
-        has_access = True
-    elif role == models.UserRole.IGP and current_user.zone_name == case.zone_name:
-        has_access = True
-    elif role == models.UserRole.DIG and current_user.range_name == case.range_name:
-        has_access = True
-    elif role == models.UserRole.SP and current_user.district_name == case.district_name:
-        has_access = True
-    elif role == models.UserRole.DY_SP and current_user.sub_division == case.sub_division:
-        has_access = True
-    elif role in [models.UserRole.CONSTABLE, models.UserRole.HEAD_CONSTABLE, 
-                  models.UserRole.SUB_INSPECTOR, models.UserRole.INSPECTOR]:
-        if current_user.station_name == case.police_station:
-            has_access = True
-    
-    if not has_access:
+    # Evidence access rules, shared with /evidence
+    if not case_scope.can_access_evidence(current_user, case):
         raise HTTPException(
             status_code=403, 
             detail="Access denied: You do not have permission to access this evidence"
         )
 
-    # Decrypt
-    with open(evidence.file_path, "rb") as f:
-        encrypted_data = f.read()
-    
-    decrypted_data = cipher_suite.decrypt(encrypted_data)
+    # Decrypt segment by segment while streaming
+    try:
+        stored = secure_storage.EncryptedFile(evidence.file_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="File not found on server")
+    except secure_storage.EvidenceIntegrityError:
+        raise HTTPException(status_code=500, detail="Decryption failed")
     
-    # Return as stream/file
-    from fastapi.responses import Response
-    return Response(content=decrypted_data, media_type="application/octet-stream", headers={
-        "Content-Disposition": f"attachment; filename={evidence.original_filename}"
-    })
+    # Return as stream/file (a Range header resumes an interrupted download)
+    return _stream_evidence(stored, _parse_range(range_header, stored.size), "application/octet-stream",
+                            f"attachment; filename={evidence.original_filename}")
 
 @router.get("/view/{evidence_id}")
 def view_evidence(
     evidence_id: int,
     token: str, # Pass token as query param for src tags
+    range_header: Optional[str] = Header(None, alias="Range"), # Sent by <video>/<audio> when seeking
     db: Session = Depends(get_db)
 ):
     # Manual Auth since it's a media request (img src, video src)
@@ -218,18 +364,29 @@ def view_evidence(
     if not os.path.exists(evidence.file_path):
         raise HTTPException(status_code=404, detail="File not found on server")
 
-    # Decrypt
-    with open(evidence.file_path, "rb") as f:
-        encrypted_data = f.read()
-    
     try:
-        decrypted_data = cipher_suite.decrypt(encrypted_data)
-    except Exception:
+        stored = secure_storage.EncryptedFile(evidence.file_path)
+    except secure_storage.EvidenceIntegrityError:
         raise HTTPException(status_code=500, detail="Decryption failed")
 
+    byte_range = _parse_range(range_header, stored.size)
+
     # Integrity Check
-    current_hash = hashlib.sha256(decrypted_data).hexdigest()
-    if current_hash != evidence.file_hash:
+    # Full views re-hash every segment (bounded memory). Range requests (media
+    # seeking) check the authenticated hash trailer against the recorded hash
+    # and decrypt the first covering segment up front; later segments are
+    # still authenticated as they stream.
+    chunks = None
+    try:
+        if byte_range is None:
+            current_hash = stored.verify()
+        else:
+            current_hash = stored.sha256
+            chunks = stored.iter_range(*byte_range)
+            chunks = itertools.chain([next(chunks)], chunks)
+    except secure_storage.EvidenceIntegrityError:
+        current_hash = None
+    if current_hash != evidence.file_hash or current_hash != stored.sha256:
         # Audit Tampering
         log = models.AuditLog(
             user_id=user.id,
@@ -247,14 +404,15 @@ def view_evidence(
     if not media_type:
         media_type = "application/octet-stream"
 
-    # Audit Log - View
-    log = models.AuditLog(
-        user_id=user.id,
-        action="VIEW_EVIDENCE",
-        details=f"Viewed Evidence #{evidence.id} ({evidence.original_filename})"
-    )
-    db.add(log)
-    db.commit()
+    # Audit Log - View (once per playback, not for every seek)
+    if byte_range is None or byte_range[0] == 0:
+        log = models.AuditLog(
+            user_id=user.id,
+            action="VIEW_EVIDENCE",
+            details=f"Viewed Evidence #{evidence.id} ({evidence.original_filename})"
+        )
+        db.add(log)
+        db.commit()
     
-    from fastapi.responses import Response
-    return Response(content=decrypted_data, media_type=media_type, headers={"Content-Disposition": f"inline; filename=\"{evidence.original_filename}\""})
+    return _stream_evidence(stored, byte_range, media_type,
+                            f"inline; filename=\"{evidence.original_filename}\"", chunks)
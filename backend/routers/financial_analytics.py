@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 from backend.database import get_db
 from backend import models
 from backend.routers.auth import get_current_active_user
+from backend.utils import case_scope
 
 router = APIRouter(
     prefix="/analytics",
@@ -23,8 +24,8 @@ def get_transaction_timeline(
     Build chronological transaction timeline for a financial fraud case
     Returns ordered sequence of events with timestamps
     """
-    # Verify case exists
-    case = db.query(models.Case).filter(models.Case.id == case_id).first()
+    # Verify case exists (and is within the user's scope)
+    case = case_scope.scope_cases(db.query(models.Case).filter(models.Case.id == case_id), current_user).first()
     if not case:
         raise HTTPException(status_code=404, detail="Case not found")
     
@@ -218,60 +219,41 @@ def get_financial_fraud_dashboard(
     """
     Financial fraud-specific dashboard metrics
     """
-    # Get all financial fraud cases accessible to user
-    cases_query = db.query(models.Case).filter(
-        models.Case.case_category == models.CaseCategory.FINANCIAL
-    )
-    
-    # Apply RBAC filtering
-    role = current_user.role
-    if role in [models.UserRole.CONSTABLE, models.UserRole.HEAD_CONSTABLE, 
-                models.UserRole.SUB_INSPECTOR, models.UserRole.INSPECTOR]:
-        if current_user.station_name:
-            cases_query = cases_query.filter(models.Case.police_station == current_user.station_name)
-    elif role == models.UserRole.DY_SP:
-        if current_user.sub_division:
-            cases_query = cases_query.filter(models.Case.sub_division == current_user.sub_division)
-    elif role == models.UserRole.SP:
-        if current_user.district_name:
-            cases_query = cases_query.filter(models.Case.district_name == current_user.district_name)
-    elif role == models.UserRole.DIG:
-        if current_user.range_name:
-            cases_query = cases_query.filter(models.Case.range_name == current_user.range_name)
-    elif role == models.UserRole.IGP:
-        if current_user.zone_name:
-            cases_query = cases_query.filter(models.Case.zone_name == current_user.zone_name)
-    
-    financial_cases = cases_query.all()
-    case_ids = [c.id for c in financial_cases]
+    # Financial fraud cases accessible to the user (only the columns the metrics need)
+    financial = (models.Case.case_category == models.CaseCategory.FINANCIAL,)
+    financial_cases = case_scope.scope_cases(
+        db.query(models.Case.amount_involved, models.Case.case_type).filter(*financial),
+        current_user
+    ).all()
     
     # Calculate total amount at risk (Sum of amount_involved per case to avoid double counting entities)
     total_amount_at_risk = sum([
         float(c.amount_involved or 0) for c in financial_cases
     ])
     
-    # Get bank request stats
-    bank_requests = db.query(models.BankRequest).filter(
-        models.BankRequest.case_id.in_(case_ids)
-    ).all()
+    # Request stats are counted in SQL over the same case scope (IN subquery)
+    bank_requests_sent = case_scope.scope_by_case(
+        db.query(func.count(models.BankRequest.id)), models.BankRequest.case_id, current_user, *financial
+    ).scalar()
     
     avg_response_time = "Pending data"  # Would need response tracking
     
     # Freeze request stats
-    freeze_requests = db.query(models.FreezeRequest).filter(
-        models.FreezeRequest.case_id.in_(case_ids)
-    ).all()
-    
-    frozen_count = len([f for f in freeze_requests if f.status == "confirmed"])
+    freeze_by_status = dict(case_scope.scope_by_case(
+        db.query(models.FreezeRequest.status, func.count(models.FreezeRequest.id)),
+        models.FreezeRequest.case_id, current_user, *financial
+    ).group_by(models.FreezeRequest.status).all())
+    freeze_total = sum(freeze_by_status.values())
+    frozen_count = freeze_by_status.get("confirmed", 0)
     
     return {
         "total_financial_cases": len(financial_cases),
         "amount_at_risk": f"₹{total_amount_at_risk:,.2f}",
-        "bank_requests_sent": len(bank_requests),
+        "bank_requests_sent": bank_requests_sent,
         "freeze_requests": {
-            "total": len(freeze_requests),
+            "total": freeze_total,
             "confirmed": frozen_count,
-            "pending": len(freeze_requests) - frozen_count
+            "pending": freeze_total - frozen_count
         },
         "avg_bank_response_time": avg_response_time,
         "top_fraud_types": _get_fraud_type_breakdown(financial_cases)
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from backend.database import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_active_user
+from backend.utils import case_scope, identifier_index
 
 router = APIRouter(
     prefix="/financial-entities",
@@ -48,6 +49,8 @@ def create_financial_entity(
     )
     
     db.add(new_entity)
+    db.flush()
+    identifier_index.index_financial_entity(db, new_entity)
     db.commit()
     db.refresh(new_entity)
     
@@ -71,8 +74,9 @@ def get_case_financial_entities(
     """
     Get all financial entities linked to a case
     """
-    entities = db.query(models.FinancialEntity).filter(
-        models.FinancialEntity.case_id == case_id
+    entities = case_scope.scope_by_case(
+        db.query(models.FinancialEntity).filter(models.FinancialEntity.case_id == case_id),
+        models.FinancialEntity.case_id, current_user
     ).all()
     
     return entities
@@ -123,6 +127,7 @@ def delete_financial_entity(
     if not entity:
         raise HTTPException(status_code=404, detail="Financial entity not found")
     
+    identifier_index.remove_source(db, identifier_index.SOURCE_FINANCIAL_ENTITY, entity.id)
     db.delete(entity)
     db.commit()
     
@@ -6,6 +6,7 @@ from sqlalchemy.sql import func
 from backend.database import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_active_user
+from backend.utils import case_scope
 from backend.nodal_contacts import get_bank_nodal_email
 
 router = APIRouter(
@@ -80,32 +81,8 @@ def get_freeze_requests(
     """
     Get all freeze requests (filtered by user access)
     """
-    # Get accessible case IDs (RBAC filtering)
-    cases_query = db.query(models.Case)
-    
-    role = current_user.role
-    if role in [models.UserRole.CONSTABLE, models.UserRole.HEAD_CONSTABLE, 
-                models.UserRole.SUB_INSPECTOR, models.UserRole.INSPECTOR]:
-        if current_user.station_name:
-            cases_query = cases_query.filter(models.Case.police_station == current_user.station_name)
-    elif role == models.UserRole.DY_SP:
-        if current_user.sub_division:
-            cases_query = cases_query.filter(models.Case.sub_division == current_user.sub_division)
-    elif role == models.UserRole.SP:
-        if current_user.district_name:
-            cases_query = cases_query.filter(models.Case.district_name == current_user.district_name)
-    elif role == models.UserRole.DIG:
-        if current_user.range_name:
-            cases_query = cases_query.filter(models.Case.range_name == current_user.range_name)
-    elif role == models.UserRole.IGP:
-        if current_user.zone_name:
-            cases_query = cases_query.filter(models.Case.zone_name == current_user.zone_name)
-    
-    accessible_case_ids = [c.id for c in cases_query.all()]
-    
-    # Get freeze requests
-    requests = db.query(models.FreezeRequest).filter(
-        models.FreezeRequest.case_id.in_(accessible_case_ids)
+    requests = case_scope.scope_by_case(
+        db.query(models.FreezeRequest), models.FreezeRequest.case_id, current_user
     ).order_by(models.FreezeRequest.created_at.desc()).offset(skip).limit(limit).all()
     
     return requests
@@ -117,7 +94,10 @@ def get_freeze_request(
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Get specific freeze request"""
-    request = db.query(models.FreezeRequest).filter(models.FreezeRequest.id == request_id).first()
+    request = case_scope.scope_by_case(
+        db.query(models.FreezeRequest).filter(models.FreezeRequest.id == request_id),
+        models.FreezeRequest.case_id, current_user
+    ).first()
     if not request:
         raise HTTPException(status_code=404, detail="Freeze request not found")
     return request
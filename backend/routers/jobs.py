@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from backend.database import get_db
+from backend import models, schemas
+from backend.routers.auth import get_current_active_user
+from backend.utils import job_queue
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"]
+)
+
+# Roles that can see and manage every job (others only their own)
+JOB_ADMIN_ROLES = [models.UserRole.ADMIN, models.UserRole.DGP]
+
+
+def _visible_to(current_user: models.User):
+    """
+    Jobs a user may follow: their own, and jobs processing content they also
+    uploaded (an identical upload is handed the job already queued for it).
+    """
+    own_hashes = select(models.Evidence.file_hash).where(models.Evidence.uploaded_by_id == current_user.id)
+    same_content = select(models.Evidence.id).where(models.Evidence.file_hash.in_(own_hashes))
+    return or_(models.Job.created_by_id == current_user.id, models.Job.evidence_id.in_(same_content))
+
+
+def _get_job(db: Session, job_id: int, current_user: models.User, manage: bool = False) -> models.Job:
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if current_user.role in JOB_ADMIN_ROLES or job.created_by_id == current_user.id:
+        return job
+    # Cancelling stays with the user who queued the job
+    if not manage and db.query(models.Job.id).filter(models.Job.id == job_id, _visible_to(current_user)).first():
+        return job
+    raise HTTPException(status_code=403, detail="Access denied: job belongs to another user")
+
+
+@router.get("/", response_model=List[schemas.JobResponse])
+def list_jobs(
+    status: Optional[str] = None,
+    evidence_id: Optional[int] = None,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    query = db.query(models.Job)
+    if current_user.role not in JOB_ADMIN_ROLES:
+        query = query.filter(_visible_to(current_user))
+    if status:
+        query = query.filter(models.Job.status == status)
+    if evidence_id is not None:
+        query = query.filter(models.Job.evidence_id == evidence_id)
+    return query.order_by(models.Job.id.desc()).limit(min(limit, 500)).all()
+
+
+@router.get("/{job_id}", response_model=schemas.JobResponse)
+def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    return _get_job(db, job_id, current_user)
+
+
+@router.get("/{job_id}/result")
+def get_job_result(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    job = _get_job(db, job_id, current_user)
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}; no result available")
+    return {"job_id": job.id, "kind": job.kind, "result": job_queue.result_of(job)}
+
+
+@router.post("/{job_id}/cancel", response_model=schemas.JobResponse)
+def cancel_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    job = _get_job(db, job_id, current_user, manage=True)
+    if job.status in job_queue.FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    job_queue.cancel(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+@router.post("/{job_id}/retry", response_model=schemas.JobResponse)
+def retry_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    job = _get_job(db, job_id, current_user)
+    if job.status not in ("failed", "cancelled"):
+        raise HTTPException(status_code=409, detail=f"Only failed or cancelled jobs can be retried (job is {job.status})")
+    job_queue.retry(job)
+    db.commit()
+    db.refresh(job)
+    job_queue.runner.notify()
+    return job
@@ -1,6 +1,7 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
 from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from datetime import datetime
 import os
@@ -9,6 +10,7 @@ from backend.database import get_db
 from backend import models, schemas
 from backend.routers.auth import get_current_active_user
 from backend.utils.pdf_gen import generate_request_pdf
+from backend.utils import identifier_index, case_scope
 
 router = APIRouter(
     prefix="/requests",
@@ -40,6 +42,8 @@ def create_request(
         status=models.RequestStatus.PENDING
     )
     db.add(new_request)
+    db.flush()
+    identifier_index.index_telecom_request(db, new_request)
     db.commit()
     db.refresh(new_request)
 
@@ -109,6 +113,8 @@ def create_batch_request(
             status=models.RequestStatus.PENDING
         )
         db.add(new_request)
+        db.flush()
+        identifier_index.index_telecom_request(db, new_request)
         db.commit()
         db.refresh(new_request)
         
@@ -142,7 +148,7 @@ def read_requests(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    query = db.query(models.TelecomRequest)
+    query = case_scope.scope_by_case(db.query(models.TelecomRequest), models.TelecomRequest.case_id, current_user)
     if case_id:
         query = query.filter(models.TelecomRequest.case_id == case_id)
     
@@ -258,7 +264,7 @@ async def upload_request_file(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    req = db.query(models.TelecomRequest).filter(models.TelecomRequest.id == request_id).first()
+    req = await run_in_threadpool(db.get, models.TelecomRequest, request_id)
     if not req:
         raise HTTPException(status_code=404, detail="Request not found")
     
@@ -272,7 +278,7 @@ async def upload_request_file(
     
     # Update request file path to the new one (as it's the most recent state)
     req.request_file_path = file_path
-    db.commit()
+    await run_in_threadpool(db.commit)
     
     return {"message": "File uploaded successfully", "file_path": file_path}
 
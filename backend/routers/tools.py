@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, File, UploadFile, Form
+from typing import Optional
 from backend.routers.auth import get_current_active_user
 from backend import models
+from backend.utils import tower_dump
 
+import json
 import socket
 import requests
+import numpy as np
+import pandas as pd
 
 router = APIRouter(
     prefix="/tools",
@@ -107,101 +112,175 @@ def ip_lookup(
 
 
 @router.post("/analyze-tower-dump")
-async def analyze_tower_dump(
+def analyze_tower_dump(
     files: list[UploadFile] = File(...),
+    min_towers: Optional[int] = Form(None),  # "Present in at least K of N towers"
+    limit: int = Form(1000),  # Max identifiers listed per type in frequency mode
+    windows: Optional[str] = Form(None),  # JSON: {"<filename>": {"start": ..., "end": ...}}
+    event_time: Optional[str] = Form(None),  # Or one event timestamp applied to every file
+    delta_minutes: int = Form(30),  # +/- around event_time
+    co_window_minutes: Optional[int] = Form(None),  # Max span between the matched sightings
     current_user: models.User = Depends(get_current_active_user)
 ):
     """
     TOWER DUMP & FINANCIAL ANALYSIS
     Input: Multiple Excel/CSV files.
-    Output: Common Mobile Numbers, Bank Accounts, and UPI IDs present in ALL files.
+    Output: Common Mobile Numbers, Bank Accounts, and UPI IDs present in ALL files,
+    or, when `min_towers` is given, in at least that many files (with the towers
+    each identifier was seen in).
+    Time-window mode: pass `windows` (per file) or `event_time` +/- `delta_minutes`
+    to get mobile numbers seen at several towers inside those windows, ranked by
+    tower count and how tightly the sightings cluster (`co_window_minutes`).
+    Files are streamed in chunks (see utils/tower_dump.py), so memory depends on
+    the number of distinct identifiers rather than the size of the dumps.
     """
-    import pandas as pd
-    import io
-    import re
-    
     if len(files) < 2:
         raise HTTPException(status_code=400, detail="Please upload at least 2 files to compare.")
 
-    # Sets for intersection
-    common_mobile = set()
-    common_account = set()
-    common_upi = set()
-    
-    first_file = True
-    file_stats = []
+    if windows is not None or event_time is not None:
+        return _time_window_analysis(
+            files, windows, event_time, delta_minutes, co_window_minutes,
+            2 if min_towers is None else min_towers, limit
+        )
 
+    summaries = []
     try:
         for file in files:
-            content = await file.read()
-            filename = file.filename.lower()
-            
-            # Read Data
-            if filename.endswith('.csv'):
-                df = pd.read_csv(io.BytesIO(content), dtype=str)
-            elif filename.endswith(('.xls', '.xlsx')):
-                df = pd.read_excel(io.BytesIO(content), dtype=str)
-            else:
+            if not tower_dump.is_data_file(file.filename):
                 continue # Skip non-data files
+            summaries.append(tower_dump.summarize_file(file.file, file.filename))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Analysis Failed: {str(e)}")
+
+    if not summaries:
+        raise HTTPException(status_code=400, detail="No CSV/Excel tower dump files found in upload.")
+
+    if min_towers is not None:
+        if not 1 <= min_towers <= len(summaries):
+            raise HTTPException(status_code=400, detail=f"min_towers must be between 1 and {len(summaries)}.")
+        if len(summaries) > tower_dump.MAX_FREQUENCY_FILES:
+            raise HTTPException(status_code=400, detail=f"Frequency mode supports at most {tower_dump.MAX_FREQUENCY_FILES} files.")
+
+        ranked = tower_dump.frequency(summaries, min_towers, limit)
+        return {
+            "mode": "frequency",
+            "min_towers": min_towers,
+            "total_towers": len(summaries),
+            "common_numbers": [row["identifier"] for row in ranked["mobiles"]],
+            "common_accounts": [row["identifier"] for row in ranked["accounts"]],
+            "common_upis": [row["identifier"] for row in ranked["upis"]],
+            "counts": ranked["totals"],
+            "frequency": {
+                "mobiles": ranked["mobiles"],
+                "accounts": ranked["accounts"],
+                "upis": ranked["upis"]
+            },
+            "file_stats": [summary.stats() for summary in summaries],
+            "message": "Analysis Complete"
+        }
+
+    common = tower_dump.intersect(summaries)
+
+    return {
+        "mode": "intersection",
+        "common_numbers": common["mobiles"],
+        "common_accounts": common["accounts"],
+        "common_upis": common["upis"],
+        "counts": {
+            "mobile": len(common["mobiles"]),
+            "account": len(common["accounts"]),
+            "upi": len(common["upis"])
+        },
+        "file_stats": [summary.stats() for summary in summaries],
+        "message": "Analysis Complete"
+    }
+
+
+def _parse_time(value: str, field: str) -> pd.Timestamp:
+    try:
+        parsed = pd.Timestamp(value)
+    except (ValueError, TypeError):
+        parsed = pd.NaT
+    if pd.isna(parsed):
+        raise HTTPException(status_code=400, detail=f"Invalid {field}: {value!r}")
+    # Dumps carry local wall-clock times; compare naively
+    return parsed.tz_localize(None) if parsed.tzinfo else parsed
+
+
+def _time_window_analysis(files, windows, event_time, delta_minutes, co_window_minutes, min_towers, limit):
+    """Numbers seen at several towers inside each file's time window."""
+    if min_towers < 2:
+        raise HTTPException(status_code=400, detail="min_towers must be at least 2.")
+    if delta_minutes < 0 or (co_window_minutes is not None and co_window_minutes < 0):
+        raise HTTPException(status_code=400, detail="Time deltas cannot be negative.")
+
+    data_files = [f for f in files if tower_dump.is_data_file(f.filename)]
+    if len(data_files) < 2:
+        raise HTTPException(status_code=400, detail="Please upload at least 2 tower dump files to compare.")
+    if min_towers > len(data_files):
+        raise HTTPException(status_code=400, detail=f"min_towers must be between 2 and {len(data_files)}.")
+
+    file_windows = {}
+    if windows is not None:
+        try:
+            spec = json.loads(windows)
+        except json.JSONDecodeError:
+            raise HTTPException(status_code=400, detail="windows must be a JSON object keyed by filename.")
+        if not isinstance(spec, dict):
+            raise HTTPException(status_code=400, detail="windows must be a JSON object keyed by filename.")
+        for name, bounds in spec.items():
+            if not isinstance(bounds, dict) or "start" not in bounds or "end" not in bounds:
+                raise HTTPException(status_code=400, detail=f"Window for {name} needs 'start' and 'end'.")
+            try:
+                file_windows[name] = tower_dump.TimeWindow(
+                    _parse_time(bounds["start"], f"start for {name}"),
+                    _parse_time(bounds["end"], f"end for {name}"),
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Window for {name}: {e}")
+
+    default_window = None
+    if event_time is not None:
+        default_window = tower_dump.TimeWindow.around(
+            _parse_time(event_time, "event_time"), pd.Timedelta(minutes=delta_minutes)
+        )
 
-            # Local sets for this file
-            file_mobile = set()
-            file_account = set()
-            file_upi = set()
-            
-            for col in df.columns:
-                for val in df[col].dropna():
-                    val_str = str(val).strip()
-                    
-                    # 1. Mobile Number (10 digits)
-                    # Remove non-digits for mobile check
-                    clean_mobile = re.sub(r'\D', '', val_str)
-                    if len(clean_mobile) >= 10:
-                        potential_mobile = clean_mobile[-10:]
-                        if potential_mobile.startswith(('6','7','8','9')):
-                            file_mobile.add(potential_mobile)
-                    
-                    # 2. UPI ID (contains @, no spaces)
-                    if '@' in val_str and ' ' not in val_str and len(val_str) > 5:
-                        file_upi.add(val_str.lower())
-                        
-                    # 3. Bank Account (9-18 digits, strictly numeric)
-                    # We use strict regex to avoid confusing with other numeric IDs
-                    if re.match(r'^\d{9,18}$', val_str):
-                        # Simple heuristic: Accounts usually don't start with 6-9 if they are 10 digits (conflict with mobile)
-                        # But to be safe, we add it. Overlap is handled by context usually.
-                        file_account.add(val_str)
-            
+    missing = [f.filename for f in data_files if f.filename not in file_windows and default_window is None]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"No time window given for: {', '.join(missing)}")
+
+    events = []
+    file_stats = []
+    try:
+        for file in data_files:
+            numbers, times = tower_dump.collect_events(
+                file.file, file.filename, file_windows.get(file.filename, default_window)
+            )
+            events.append((numbers, times))
             file_stats.append({
                 "filename": file.filename,
-                "mobiles": len(file_mobile),
-                "accounts": len(file_account),
-                "upis": len(file_upi)
+                "sightings_in_window": int(numbers.size),
+                "unique_mobiles_in_window": int(np.unique(numbers).size),
             })
-            
-            # Intersection Logic
-            if first_file:
-                common_mobile = file_mobile
-                common_account = file_account
-                common_upi = file_upi
-                first_file = False
-            else:
-                common_mobile = common_mobile.intersection(file_mobile)
-                common_account = common_account.intersection(file_account)
-                common_upi = common_upi.intersection(file_upi)
-                
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"{file.filename}: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Analysis Failed: {str(e)}")
 
+    max_span = co_window_minutes * 60 if co_window_minutes is not None else None
+    ranked = tower_dump.colocate(events, [f.filename for f in data_files], min_towers, max_span, limit)
+
     return {
-        "common_numbers": list(common_mobile),
-        "common_accounts": list(common_account),
-        "common_upis": list(common_upi),
-        "counts": {
-            "mobile": len(common_mobile),
-            "account": len(common_account),
-            "upi": len(common_upi)
-        },
+        "mode": "time_window",
+        "min_towers": min_towers,
+        "total_towers": len(data_files),
+        "co_window_minutes": co_window_minutes,
+        "common_numbers": [c["identifier"] for c in ranked["candidates"]],
+        "common_accounts": [],
+        "common_upis": [],
+        "counts": {"mobile": ranked["total"], "account": 0, "upi": 0},
+        "candidates": ranked["candidates"],
+        "total_candidates": ranked["total"],
         "file_stats": file_stats,
         "message": "Analysis Complete"
     }
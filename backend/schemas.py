@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 from backend.models import (
     UserRole, RequestStatus, CaseType, CaseCategory,
@@ -97,16 +97,39 @@ class RequestResponse(RequestBase):
         from_attributes = True
 
 # Evidence Schemas
+class EvidenceCopy(BaseModel):
+    """Another evidence item with identical content (same SHA-256)."""
+    evidence_id: int
+    case_id: int
+    fir_number: Optional[str] = None
+    police_station: Optional[str] = None
+    original_filename: Optional[str] = None
+    uploaded_at: Optional[datetime] = None
+
 class EvidenceResponse(BaseModel):
     id: int
     file_type: str
     original_filename: str
     uploaded_at: datetime
     file_hash: str
+    # Set on upload: cases that already hold this exact file
+    duplicate_of: List[EvidenceCopy] = []
+    # Set on upload: background extraction job (None if already processed)
+    job_id: Optional[int] = None
 
     class Config:
         from_attributes = True
 
+class CdrSchemaUpdate(BaseModel):
+    column_mapping: Dict[str, str]  # field (source, destination, date, ...) -> header
+    header_row: int = 0
+    target_relative: bool = False
+
+class CdrCompareRequest(BaseModel):
+    evidence_ids: List[int]
+    min_cdrs: int = 2  # Report identifiers present in at least this many CDRs
+    limit: int = 500  # Max identifiers listed per category
+
 # ========== FINANCIAL FRAUD MODULE SCHEMAS ==========
 
 # Financial Entity Schemas
@@ -222,3 +245,20 @@ class FreezeRequestResponse(FreezeRequestBase):
     
     class Config:
         from_attributes = True
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str  # queued, running, done, failed, cancelled
+    attempts: int
+    max_attempts: int
+    cancel_requested: bool = False
+    error: Optional[str] = None
+    evidence_id: Optional[int] = None
+    case_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
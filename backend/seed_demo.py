@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from backend.database import SessionLocal, engine
 from backend import models, schemas
 from backend.utils.security import get_password_hash
+from backend.utils import identifier_index
 
 def seed_data():
     models.Base.metadata.create_all(bind=engine)
@@ -151,6 +152,9 @@ def seed_data():
         db.add(tt2)
 
         db.commit()
+
+        # Refresh the identifier search index for the seeded rows
+        identifier_index.rebuild(db)
         print("Database seeded successfully!")
 
         # 7. Generate Dummy Files for Testing
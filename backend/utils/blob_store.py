@@ -0,0 +1,203 @@
+"""Content-addressed store for encrypted evidence.
+
+Each distinct file (by plaintext SHA-256) is stored once, as a segmented
+encrypted blob under ``secure_uploads/blobs/<2 hex>/<sha256>`` (see
+secure_storage.py). Every Evidence row with that content - typically the same
+bank statement or CDR attached to several linked FIRs - points at the blob
+through ``file_path``, and ``EvidenceBlob.ref_count`` counts those rows.
+
+Garbage collection recounts references from the evidence table and removes a
+blob only when no evidence row points at it and it has been idle for a grace
+period, so an upload that is about to reference it never loses it.
+"""
+import glob
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+
+from sqlalchemy import exists, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.utils import secure_storage, cdr_cache, evidence_analysis, identifier_index, table_store
+
+BLOB_DIR = os.path.join("secure_uploads", "blobs")
+
+# Unreferenced blobs (and stray files) younger than this are left alone
+GC_GRACE_SECONDS = 24 * 3600
+
+
+def blob_path(sha256: str) -> str:
+    return os.path.join(BLOB_DIR, sha256[:2], sha256)
+
+
+def upload_temp_path() -> str:
+    """Fresh path for an upload being encrypted. It lives in BLOB_DIR, so ``store``
+    renames it into place and garbage collection removes it if the upload dies."""
+    os.makedirs(BLOB_DIR, exist_ok=True)
+    return os.path.join(BLOB_DIR, f".upload-{uuid.uuid4().hex}.tmp")
+
+
+def _add_reference(db: Session, sha256: str) -> int:
+    return db.query(models.EvidenceBlob).filter(models.EvidenceBlob.sha256 == sha256).update(
+        {models.EvidenceBlob.ref_count: models.EvidenceBlob.ref_count + 1,
+         models.EvidenceBlob.updated_at: func.now()},
+        synchronize_session=False
+    )
+
+
+def store(db: Session, tmp_path: str, sha256: str, size: int) -> Tuple[models.EvidenceBlob, bool]:
+    """
+    Take ownership of an encrypted temp file and add one reference to the blob
+    for its content. If the content is already stored the temp file is discarded.
+    Returns (blob, created). Changes are flushed, not committed.
+    """
+    if not _add_reference(db, sha256):
+        path = blob_path(sha256)
+        try:
+            with db.begin_nested():
+                db.add(models.EvidenceBlob(sha256=sha256, file_path=path, size=size, ref_count=1))
+        except IntegrityError:
+            # A concurrent upload of the same content created it first
+            _add_reference(db, sha256)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+            return lookup(db, sha256), True
+
+    blob = lookup(db, sha256)
+    db.refresh(blob)
+    if os.path.exists(blob.file_path):
+        os.remove(tmp_path)
+    else:
+        # Blob row without its file (restored DB, manual cleanup): heal it
+        os.makedirs(os.path.dirname(blob.file_path), exist_ok=True)
+        os.replace(tmp_path, blob.file_path)
+    return blob, False
+
+
+def lookup(db: Session, sha256: str):
+    return db.query(models.EvidenceBlob).filter(models.EvidenceBlob.sha256 == sha256).first()
+
+
+def other_copies(db: Session, sha256: str, exclude_evidence_id: int) -> List[Tuple[models.Evidence, models.Case]]:
+    """Other evidence rows (and their cases) with the same content."""
+    return (
+        db.query(models.Evidence, models.Case)
+        .join(models.Case, models.Case.id == models.Evidence.case_id)
+        .filter(models.Evidence.file_hash == sha256, models.Evidence.id != exclude_evidence_id)
+        .order_by(models.Evidence.uploaded_at)
+        .all()
+    )
+
+
+def recount(db: Session) -> int:
+    """Set every ref_count to the number of evidence rows pointing at the blob."""
+    references = (
+        select(func.count(models.Evidence.id))
+        .where(models.Evidence.file_path == models.EvidenceBlob.file_path)
+        .scalar_subquery()
+    )
+    return db.query(models.EvidenceBlob).filter(models.EvidenceBlob.ref_count != references).update(
+        {models.EvidenceBlob.ref_count: references}, synchronize_session=False
+    )
+
+
+def collect_garbage(db: Session, grace_seconds: int = GC_GRACE_SECONDS) -> Dict[str, int]:
+    """
+    Remove blobs no evidence points at (idle for ``grace_seconds``) and stray
+    files in BLOB_DIR that have no blob row (e.g. from a rolled-back upload).
+
+    A blob row is deleted only if no evidence row references it at delete
+    time; its file is renamed aside before the commit and unlinked after, so
+    an upload recreating the same blob concurrently keeps its own file.
+    """
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(seconds=grace_seconds)
+    recounted = recount(db)
+
+    candidates = db.query(models.EvidenceBlob).filter(
+        models.EvidenceBlob.ref_count == 0,
+        models.EvidenceBlob.updated_at < cutoff
+    ).all()
+    doomed = []
+    for blob in candidates:
+        deleted = db.query(models.EvidenceBlob).filter(
+            models.EvidenceBlob.id == blob.id,
+            models.EvidenceBlob.ref_count == 0,
+            ~exists().where(models.Evidence.file_path == blob.file_path)
+        ).delete(synchronize_session=False)
+        if deleted and os.path.exists(blob.file_path):
+            trash = f"{blob.file_path}.gc"
+            os.replace(blob.file_path, trash)
+            doomed.append((blob.file_path, trash, blob.sha256))
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        for path, trash, _ in doomed:
+            os.replace(trash, path)
+        raise
+
+    freed = 0
+    for _, trash, sha256 in doomed:
+        freed += os.path.getsize(trash)
+        os.remove(trash)
+        # Artefacts derived from the content go with it
+        cdr_cache.remove(sha256)
+        if evidence_analysis.has_extraction(sha256):
+            os.remove(evidence_analysis.extraction_path(sha256))
+        table_store.remove(sha256)
+        identifier_index.remove_content_identifiers(sha256)
+
+    # Files left behind without a row (crashed or rolled-back uploads, temp files of
+    # uploads whose worker was killed, old .gc files)
+    known = {sha for (sha,) in db.query(models.EvidenceBlob.sha256)}
+    cutoff_ts = cutoff.replace(tzinfo=timezone.utc).timestamp()
+    candidates = [os.path.join(root, name) for root, _, names in os.walk(BLOB_DIR)
+                  for name in names if name not in known]
+    # Upload temp files were written next to BLOB_DIR before they moved into it
+    candidates += glob.glob(os.path.join(os.path.dirname(BLOB_DIR), ".upload-*.tmp"))
+    orphans = 0
+    for path in candidates:
+        if os.path.getmtime(path) < cutoff_ts:
+            freed += os.path.getsize(path)
+            os.remove(path)
+            orphans += 1
+
+    return {
+        "recounted": recounted,
+        "removed_blobs": len(doomed),
+        "removed_orphans": orphans,
+        "freed_bytes": freed,
+    }
+
+
+def adopt(db: Session, evidence: models.Evidence) -> bool:
+    """
+    Move an evidence file stored before the blob store existed into it
+    (already segmented; see secure_storage.migrate). If the content is
+    already stored, the evidence row is pointed at the existing blob and its
+    own copy removed once no other row uses it. Returns False if the row
+    already points at a blob. Changes are flushed, not committed.
+    """
+    old_path = evidence.file_path
+    if old_path.startswith(BLOB_DIR):
+        return False
+    blob = lookup(db, evidence.file_hash)
+    if blob is None:
+        path = blob_path(evidence.file_hash)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(old_path, path)
+        blob = models.EvidenceBlob(sha256=evidence.file_hash, file_path=path, ref_count=0,
+                                   size=secure_storage.EncryptedFile(path).size)
+        db.add(blob)
+
+    evidence.file_path = blob.file_path
+    blob.ref_count = (blob.ref_count or 0) + 1
+    db.flush()
+    still_used = db.query(exists().where(models.Evidence.file_path == old_path)).scalar()
+    if not still_used and os.path.exists(old_path):
+        os.remove(old_path)
+    return True
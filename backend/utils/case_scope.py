@@ -0,0 +1,89 @@
+"""Case visibility by police hierarchy (RBAC scope), expressed in SQL.
+
+Station-level officers see their police station's cases, a DySP their
+sub-division, an SP their district, a DIG their range and an IGP their zone;
+DGP, Admin and Officer accounts are not restricted. Listings apply the scope
+inside the query, as a filter on ``cases`` or as an
+``IN (SELECT cases.id ...)`` subquery on case-owned tables, so the database
+resolves it through the hierarchy indexes and no case ids are loaded into
+Python (for a DGP that list used to be every case in the state).
+"""
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Query
+from sqlalchemy.sql import ColumnElement, Select
+
+from backend import models
+
+STATION_ROLES = [
+    models.UserRole.CONSTABLE, models.UserRole.HEAD_CONSTABLE,
+    models.UserRole.SUB_INSPECTOR, models.UserRole.INSPECTOR,
+]
+
+# role -> (Case column, User attribute) of the hierarchy level the role is scoped to
+SCOPE_BY_ROLE = {
+    **{role: ("police_station", "station_name") for role in STATION_ROLES},
+    models.UserRole.DY_SP: ("sub_division", "sub_division"),
+    models.UserRole.SP: ("district_name", "district_name"),
+    models.UserRole.DIG: ("range_name", "range_name"),
+    models.UserRole.IGP: ("zone_name", "zone_name"),
+}
+
+# Evidence contents: every case, regardless of hierarchy
+EVIDENCE_ADMIN_ROLES = [models.UserRole.DGP, models.UserRole.ADMIN]
+
+
+def case_condition(user: models.User) -> Optional[ColumnElement]:
+    """
+    Filter on ``cases`` for the user's scope, or None when every case is
+    visible. A scoped role whose hierarchy field is not filled in (accounts
+    created without a posting) is not restricted, as in the original listings.
+    """
+    scope = SCOPE_BY_ROLE.get(user.role)
+    if scope is None:
+        return None
+    column, attribute = scope
+    value = getattr(user, attribute)
+    if not value:
+        return None
+    return getattr(models.Case, column) == value
+
+
+def case_ids(user: models.User, *criteria: ColumnElement) -> Optional[Select]:
+    """``SELECT cases.id`` of the user's cases matching ``criteria``; None if that is every case."""
+    conditions = list(criteria)
+    condition = case_condition(user)
+    if condition is not None:
+        conditions.append(condition)
+    if not conditions:
+        return None
+    return select(models.Case.id).where(*conditions)
+
+
+def scope_cases(query: Query, user: models.User) -> Query:
+    """Restrict a query over ``cases`` to the user's scope."""
+    condition = case_condition(user)
+    return query if condition is None else query.filter(condition)
+
+
+def scope_by_case(query: Query, case_id_column, user: models.User, *criteria: ColumnElement) -> Query:
+    """Restrict rows of a case-owned table (joined on ``case_id_column``) to the
+    user's cases, optionally only cases matching ``criteria``."""
+    ids = case_ids(user, *criteria)
+    return query if ids is None else query.filter(case_id_column.in_(ids))
+
+
+def can_access_evidence(user: models.User, case: models.Case) -> bool:
+    """
+    Whether the user may open evidence attached to ``case``. Stricter than
+    listing: the user's own hierarchy value must match the case's, and only
+    DGP and Admin see evidence outside their posting.
+    """
+    if user.role in EVIDENCE_ADMIN_ROLES:
+        return True
+    scope = SCOPE_BY_ROLE.get(user.role)
+    if scope is None:
+        return False
+    column, attribute = scope
+    return getattr(user, attribute) == getattr(case, column)
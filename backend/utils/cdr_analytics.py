@@ -0,0 +1,386 @@
+"""Vectorized analytics over a normalized CDR frame (see cdr_parser.normalize_cdr).
+
+Identifier columns arrive as categoricals, so every report works on integer
+codes: derived columns (counterparty, hour, weekday, night flag) are computed
+once, then each report is a groupby/agg, a bincount or a neighbour comparison
+over the time-sorted frame -- no per-row Python and no repeated
+``value_counts`` passes. Reports whose columns are missing from the CDR
+(e.g. no IMSI or cell ID) are returned empty. CDRs that only give call dates
+(``attrs["has_time"]`` False, see normalize_cdr) get no time-of-day reports:
+night calls, heatmap, bursts and first/last seen.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Calls between 22:00 and 05:59 count as night calls
+NIGHT_START_HOUR = 22
+NIGHT_END_HOUR = 6
+
+# A burst is at least BURST_MIN_CALLS calls within BURST_WINDOW_MINUTES
+BURST_MIN_CALLS = 5
+BURST_WINDOW_MINUTES = 10
+
+# Caps on list-shaped reports
+MAX_CONTACTS = 100
+MAX_MOVEMENTS = 500
+MAX_BURSTS = 100
+MAX_IMEI_CHANGES = 200
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def _iso(seconds) -> Optional[str]:
+    return None if pd.isna(seconds) else pd.Timestamp(int(seconds), unit="s").isoformat()
+
+
+def _codes(series: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    """Integer codes (-1 for missing) and their labels for an identifier column."""
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        series = series.astype("category")
+    return series.cat.codes.to_numpy().astype(np.int64), series.cat.categories
+
+
+def _number_codes(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, pd.Index]:
+    """Source and destination codes over one shared dictionary of numbers."""
+    source, destination = df["source"], df["destination"]
+    if (isinstance(source.dtype, pd.CategoricalDtype) and isinstance(destination.dtype, pd.CategoricalDtype)
+            and source.cat.categories.equals(destination.cat.categories)):
+        return (source.cat.codes.to_numpy().astype(np.int64),
+                destination.cat.codes.to_numpy().astype(np.int64), source.cat.categories)
+
+    codes, numbers = pd.factorize(pd.concat([source.astype("string"), destination.astype("string")], ignore_index=True))
+    return codes[:len(df)].astype(np.int64), codes[len(df):].astype(np.int64), numbers
+
+
+def _counterparties(df: pd.DataFrame):
+    """Direction and counterparty code of every call.
+
+    The CDR's own number (subscriber) is the most frequent calling party.
+    Returns ``(outgoing, contact_codes, numbers, subscriber_code)``.
+    """
+    source, destination, numbers = _number_codes(df)
+    known = source[source >= 0]
+    subscriber = int(np.bincount(known).argmax()) if known.size else -1
+    outgoing = source == subscriber
+    return outgoing, np.where(outgoing, destination, source), numbers, subscriber
+
+
+def has_time_of_day(df: pd.DataFrame) -> bool:
+    """Whether call timestamps carry a time of day (not just the date)."""
+    return "datetime" in df and df.attrs.get("has_time", True)
+
+
+def _prepare(df: pd.DataFrame) -> Tuple[pd.DataFrame, dict]:
+    """Derive counterparty and time features once for every report.
+
+    Returns the feature frame (integer codes) and the label index per coded column.
+    Hour, weekday and night flags are only derived when the time of day is known.
+    """
+    outgoing, contact, numbers, subscriber = _counterparties(df)
+    frame = pd.DataFrame({
+        "outgoing": outgoing,
+        "contact": contact,
+        "duration": df["duration"].to_numpy() if "duration" in df else np.nan,
+    })
+    labels = {"contact": numbers, "subscriber": numbers[subscriber] if subscriber >= 0 else None}
+
+    if "datetime" in df:
+        stamps = df["datetime"]
+        frame["seconds"] = (stamps - pd.Timestamp(0)) // pd.Timedelta(seconds=1)
+    if has_time_of_day(df):
+        frame["hour"] = stamps.dt.hour.to_numpy()
+        frame["weekday"] = stamps.dt.dayofweek.to_numpy()
+        frame["night"] = (frame["hour"] >= NIGHT_START_HOUR) | (frame["hour"] < NIGHT_END_HOUR)
+    for column in ("imei", "imsi", "cell_id"):
+        if column in df:
+            frame[column], labels[column] = _codes(df[column])
+    return frame, labels
+
+
+def contact_summary(frame: pd.DataFrame, labels: dict) -> list:
+    """Per counterparty: call counts, direction, duration, night calls, first/last seen."""
+    aggregations = {
+        "calls": ("outgoing", "size"),
+        "outgoing": ("outgoing", "sum"),
+        "total_duration": ("duration", "sum"),
+    }
+    if "night" in frame:
+        aggregations.update({
+            "night_calls": ("night", "sum"),
+            "first_seen": ("seconds", "min"),
+            "last_seen": ("seconds", "max"),
+        })
+
+    known = frame[frame["contact"] >= 0]
+    stats = known.groupby("contact", sort=False).agg(**aggregations).nlargest(MAX_CONTACTS, "calls")
+
+    contacts = []
+    for code, row in zip(stats.index.tolist(), stats.to_dict("records")):
+        entry = {
+            "contact": labels["contact"][code],
+            "calls": int(row["calls"]),
+            "outgoing": int(row["outgoing"]),
+            "incoming": int(row["calls"] - row["outgoing"]),
+            "total_duration": int(row["total_duration"]) if pd.notna(row["total_duration"]) else 0,
+        }
+        if "night" in frame:
+            entry.update({
+                "night_calls": int(row["night_calls"]),
+                "night_ratio": round(row["night_calls"] / row["calls"], 3),
+                "first_seen": _iso(row["first_seen"]),
+                "last_seen": _iso(row["last_seen"]),
+            })
+        contacts.append(entry)
+    return contacts
+
+
+def activity_heatmap(frame: pd.DataFrame) -> dict:
+    """Day-of-week x hour call counts (7 x 24, Monday first)."""
+    timed = frame[["weekday", "hour"]].dropna().astype(np.int64)
+    cells = np.bincount(timed["weekday"].to_numpy() * 24 + timed["hour"].to_numpy(), minlength=7 * 24)
+    return {"days": WEEKDAYS, "hours": list(range(24)), "counts": cells.reshape(7, 24).tolist()}
+
+
+def imei_changes(timeline: pd.DataFrame, labels: dict) -> dict:
+    """Handset (IMEI) switches per SIM (IMSI) in time order.
+
+    Without an IMSI column the whole CDR is treated as one SIM (the subscriber).
+    """
+    imei = timeline["imei"].to_numpy()
+    seconds = timeline["seconds"].to_numpy()
+    sims = timeline["imsi"].to_numpy() if "imsi" in timeline else np.zeros(imei.size, dtype=np.int64)
+    usable = (imei >= 0) & (sims >= 0)
+    imei, seconds, sims = imei[usable], seconds[usable], sims[usable]
+
+    # Group by SIM keeping time order, then compare each call with the previous one
+    order = np.argsort(sims, kind="stable")
+    imei, seconds, sims = imei[order], seconds[order], sims[order]
+    switched = np.flatnonzero((sims[1:] == sims[:-1]) & (imei[1:] != imei[:-1])) + 1
+
+    def sim_label(code):
+        return str(labels["imsi"][code]) if "imsi" in labels else labels["subscriber"]
+
+    # Distinct handsets per SIM via one combined integer key
+    base = int(imei.max()) + 1 if imei.size else 1
+    pairs = np.unique(sims * base + imei)
+    sim_codes, handset_counts = np.unique(pairs // base, return_counts=True)
+    return {
+        "imeis_per_imsi": {sim_label(sim): int(count) for sim, count in zip(sim_codes.tolist(), handset_counts.tolist())},
+        "changes": [
+            {
+                "imsi": sim_label(sims[i]),
+                "from_imei": labels["imei"][imei[i - 1]],
+                "to_imei": labels["imei"][imei[i]],
+                "at": _iso(seconds[i]),
+            }
+            for i in switched[:MAX_IMEI_CHANGES].tolist()
+        ],
+        "total_changes": int(switched.size),
+    }
+
+
+def cell_movements(timeline: pd.DataFrame, labels: dict) -> dict:
+    """Consecutive-cell runs: the sequence of cell IDs with dwell times."""
+    cells = timeline["cell_id"].to_numpy()
+    located = cells >= 0
+    cells, seconds = cells[located], timeline["seconds"].to_numpy()[located]
+    if not cells.size:
+        return {"distinct_cells": 0, "movements": 0, "sequence": []}
+
+    starts = np.flatnonzero(np.r_[True, cells[1:] != cells[:-1]])
+    ends = np.r_[starts[1:], cells.size] - 1
+    return {
+        "distinct_cells": int(np.unique(cells).size),
+        "movements": int(starts.size - 1),
+        "sequence": [
+            {
+                "cell_id": labels["cell_id"][cells[start]],
+                "from": _iso(seconds[start]),
+                "to": _iso(seconds[end]),
+                "calls": end - start + 1,
+            }
+            for start, end in zip(starts[:MAX_MOVEMENTS].tolist(), ends[:MAX_MOVEMENTS].tolist())
+        ],
+    }
+
+
+def call_bursts(timeline: pd.DataFrame, min_calls: int = BURST_MIN_CALLS,
+                window_minutes: int = BURST_WINDOW_MINUTES) -> list:
+    """Periods with at least ``min_calls`` calls inside ``window_minutes``.
+
+    ``timeline`` must be sorted by time with no missing timestamps. Each call
+    opens a window; windows holding enough calls are merged when they overlap,
+    so one busy period is reported once.
+    """
+    times = timeline["seconds"].to_numpy()
+    if times.size < min_calls:
+        return []
+
+    window_end = np.searchsorted(times, times + window_minutes * 60, side="right")
+    starts = np.flatnonzero(window_end - np.arange(times.size) >= min_calls)
+    if not starts.size:
+        return []
+
+    # Merge overlapping windows: a new burst starts past the furthest end so far
+    reach = np.maximum.accumulate(window_end[starts] - 1)
+    new_burst = np.r_[True, starts[1:] > reach[:-1]]
+    first = starts[new_burst]
+    last = np.r_[reach[np.flatnonzero(new_burst)[1:] - 1], reach[-1]]
+
+    contacts = timeline["contact"].to_numpy()
+    return [
+        {
+            "start": _iso(times[lo]),
+            "end": _iso(times[hi]),
+            "calls": hi - lo + 1,
+            "distinct_contacts": int(np.unique(contacts[lo:hi + 1]).size),
+        }
+        for lo, hi in zip(first[:MAX_BURSTS].tolist(), last[:MAX_BURSTS].tolist())
+    ]
+
+
+def analyze(df: pd.DataFrame) -> dict:
+    """All analytics for a normalized CDR frame."""
+    frame, labels = _prepare(df)
+    has_time = "night" in frame
+    contacts = frame["contact"].to_numpy()
+
+    result = {
+        "subscriber": labels["subscriber"],
+        "unique_contacts": int(np.unique(contacts[contacts >= 0]).size),
+        "contacts": contact_summary(frame, labels),
+        "night_call_ratio": round(float(frame["night"].mean()), 3) if has_time and len(frame) else None,
+        "heatmap": activity_heatmap(frame) if has_time else None,
+        "imei": None,
+        "cell_movements": None,
+        "call_bursts": [],
+    }
+    if "seconds" not in frame:
+        return result
+
+    # One stable time sort shared by the sequence-based reports
+    timeline = frame.dropna(subset=["seconds"]).sort_values("seconds", kind="stable")
+    timeline["seconds"] = timeline["seconds"].astype(np.int64)
+    if "imei" in timeline:
+        result["imei"] = imei_changes(timeline, labels)
+    if "cell_id" in timeline:
+        result["cell_movements"] = cell_movements(timeline, labels)
+    if has_time:
+        result["call_bursts"] = call_bursts(timeline)
+    return result
+
+
+# ---------- Multi-CDR comparison ----------
+
+def _distinct(codes: np.ndarray, labels: pd.Index) -> np.ndarray:
+    return np.asarray(labels[np.unique(codes[codes >= 0])], dtype=object)
+
+
+def _cdr_sets(df: pd.DataFrame) -> dict:
+    """Distinct contacts, IMEIs and cells of one CDR, plus its own number."""
+    _, contact, numbers, subscriber = _counterparties(df)
+    sets = {
+        "subscriber": numbers[subscriber] if subscriber >= 0 else None,
+        "contacts": _distinct(contact, numbers),
+    }
+    for column, key in (("imei", "imeis"), ("cell_id", "cells")):
+        if column in df:
+            codes, labels = _codes(df[column])
+            sets[key] = _distinct(codes, labels)
+        else:
+            sets[key] = np.empty(0, dtype=object)
+    return sets
+
+
+def _membership(sets: list):
+    """Long (cdr, value) table over all CDRs, as value codes plus CDR indexes."""
+    sizes = [len(v) for v in sets]
+    cdrs = np.repeat(np.arange(len(sets)), sizes)
+    values = np.concatenate(sets) if sum(sizes) else np.empty(0, dtype=object)
+    codes, uniques = pd.factorize(values)
+    return cdrs, codes, uniques
+
+
+def _shared(sets: list, names: list, min_cdrs: int, limit: int) -> dict:
+    """Values present in at least ``min_cdrs`` of the CDRs, most widely shared first."""
+    cdrs, codes, uniques = _membership(sets)
+    counts = np.bincount(codes, minlength=len(uniques))
+    shared = np.flatnonzero(counts >= min_cdrs)
+    ranked = shared[np.lexsort((shared, -counts[shared]))][:limit]
+
+    # Which CDRs hold each ranked value: sort memberships by value, then slice
+    keep = np.isin(codes, ranked)
+    order = np.argsort(codes[keep], kind="stable")
+    kept_codes, kept_cdrs = codes[keep][order], cdrs[keep][order]
+    bounds = np.searchsorted(kept_codes, ranked)
+    return {
+        "total": int(shared.size),
+        "items": [
+            {
+                "identifier": uniques[code],
+                "cdr_count": int(counts[code]),
+                "cdrs": [names[i] for i in kept_cdrs[start:start + counts[code]].tolist()],
+            }
+            for code, start in zip(ranked.tolist(), bounds.tolist())
+        ],
+    }
+
+
+def _overlap_matrix(sets: list) -> Tuple[list, list]:
+    """Pairwise shared-contact counts and Jaccard similarity.
+
+    Only values held by two or more CDRs can contribute off the diagonal, so
+    the incidence matrix is built over those alone.
+    """
+    n = len(sets)
+    sizes = np.array([len(v) for v in sets], dtype=np.int64)
+    cdrs, codes, uniques = _membership(sets)
+    counts = np.bincount(codes, minlength=len(uniques))
+    multi = counts[codes] >= 2
+    columns, column_codes = np.unique(codes[multi], return_inverse=True)
+
+    incidence = np.zeros((n, columns.size), dtype=np.int32)
+    incidence[cdrs[multi], column_codes] = 1
+    overlap = incidence @ incidence.T
+    np.fill_diagonal(overlap, sizes)
+
+    union = sizes[:, None] + sizes[None, :] - overlap
+    jaccard = np.divide(overlap, union, out=np.zeros(overlap.shape), where=union > 0)
+    return overlap.tolist(), np.round(jaccard, 3).tolist()
+
+
+def compare(frames: list, names: list, min_cdrs: int = 2, limit: int = 500) -> dict:
+    """Common contacts, shared IMEIs/cells and contact overlap across several CDRs."""
+    per_cdr = [_cdr_sets(df) for df in frames]
+    contacts = [s["contacts"] for s in per_cdr]
+    overlap, jaccard = _overlap_matrix(contacts)
+
+    # Suspects calling each other: one CDR's own number among another's contacts
+    contact_sets = [set(c.tolist()) for c in contacts]
+    links = []
+    for i, own in enumerate(per_cdr):
+        if own["subscriber"] is None:
+            continue
+        for j, other in enumerate(contact_sets):
+            if i != j and own["subscriber"] in other:
+                links.append({"number": own["subscriber"], "owner": names[i], "seen_in": names[j]})
+
+    return {
+        "cdrs": [
+            {
+                "name": name,
+                "subscriber": s["subscriber"],
+                "unique_contacts": int(len(s["contacts"])),
+                "unique_imeis": int(len(s["imeis"])),
+                "unique_cells": int(len(s["cells"])),
+            }
+            for name, s in zip(names, per_cdr)
+        ],
+        "common_contacts": _shared(contacts, names, min_cdrs, limit),
+        "shared_imeis": _shared([s["imeis"] for s in per_cdr], names, min_cdrs, limit),
+        "shared_cells": _shared([s["cells"] for s in per_cdr], names, min_cdrs, limit),
+        "contact_overlap": {"labels": names, "matrix": overlap, "jaccard": jaccard},
+        "direct_links": links,
+    }
@@ -0,0 +1,120 @@
+"""Encrypted columnar cache of normalized CDR frames.
+
+A CDR is decrypted, parsed and normalized once (at upload, or on first
+analysis for older evidence) and the resulting frame is stored next to the
+evidence as Fernet-encrypted Parquet, keyed by ``Evidence.file_hash``. Later
+analyses load the cached columns instead of re-decrypting and re-parsing the
+original CSV/XLSX. Without pyarrow the frame is stored as an encrypted pickle
+instead; both formats are read back transparently.
+"""
+import io
+import os
+from typing import Optional
+
+import pandas as pd
+from cryptography.fernet import Fernet, InvalidToken
+from sqlalchemy.orm import Session
+
+from backend import config, models
+from backend.utils import cdr_parser, cdr_schema, secure_storage
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+CACHE_DIR = os.path.join("secure_uploads", "cdr_cache")
+
+# Bump when normalize_cdr changes so stale frames are rebuilt
+CACHE_VERSION = 4
+
+CDR_EXTENSIONS = ('.csv', '.xls', '.xlsx')
+PARQUET_MAGIC = b"PAR1"
+
+_cipher = Fernet(config.ENCRYPTION_KEY)
+
+
+def is_cdr(file_type: str, filename: str) -> bool:
+    """Whether an upload should get a cached frame (tabular CDR evidence)."""
+    return "CDR" in (file_type or "").upper() and filename.lower().endswith(CDR_EXTENSIONS)
+
+
+def cache_path(file_hash: str) -> str:
+    return os.path.join(CACHE_DIR, f"{file_hash}.v{CACHE_VERSION}.cdr")
+
+
+def _serialize(df: pd.DataFrame) -> bytes:
+    buffer = io.BytesIO()
+    if HAS_PYARROW:
+        df.to_parquet(buffer, engine="pyarrow", index=False)
+    else:
+        df.to_pickle(buffer)
+    return buffer.getvalue()
+
+
+def _deserialize(data: bytes) -> pd.DataFrame:
+    if data[:4] == PARQUET_MAGIC:
+        return pd.read_parquet(io.BytesIO(data), engine="pyarrow")
+    # Only ever our own authenticated (Fernet) payload
+    return pd.read_pickle(io.BytesIO(data))
+
+
+def store(file_hash: str, df: pd.DataFrame) -> str:
+    """Encrypt and write a normalized frame; the write is atomic."""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = cache_path(file_hash)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_cipher.encrypt(_serialize(df)))
+    os.replace(tmp_path, path)
+    return path
+
+
+def load(file_hash: str) -> Optional[pd.DataFrame]:
+    """Cached frame for this evidence hash, or None if missing/unreadable."""
+    path = cache_path(file_hash)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return _deserialize(_cipher.decrypt(f.read()))
+    except (InvalidToken, ValueError, OSError, ImportError):
+        # Corrupt, written with another key, or Parquet without pyarrow: rebuild
+        return None
+
+
+def read_evidence(evidence: models.Evidence) -> bytes:
+    """Decrypted content of an evidence file."""
+    return secure_storage.read_all(evidence.file_path)
+
+
+def build(content: bytes, filename: str, file_hash: str, db: Optional[Session] = None,
+          schema: Optional[cdr_schema.CdrSchema] = None) -> pd.DataFrame:
+    """Normalize raw (decrypted) CDR bytes and cache the frame.
+
+    With ``db`` the layout comes from (and is stored in) the schema profile
+    cache; pass ``schema`` to force a specific layout.
+    """
+    df = cdr_parser.load_cdr(content, filename, db, schema)
+    store(file_hash, df)
+    return df
+
+
+def get_frame(evidence: models.Evidence, db: Optional[Session] = None) -> pd.DataFrame:
+    """
+    Normalized frame for a CDR evidence item.
+    Served from the cache when present; otherwise the evidence file is
+    decrypted and parsed once and the result cached for next time.
+    Raises cdr_parser.CDRFormatError if the file is not a usable CDR.
+    """
+    df = load(evidence.file_hash)
+    if df is not None:
+        return df
+    return build(read_evidence(evidence), evidence.original_filename, evidence.file_hash, db)
+
+
+def remove(file_hash: str) -> None:
+    path = cache_path(file_hash)
+    if os.path.exists(path):
+        os.remove(path)
@@ -1,71 +1,191 @@
 import pandas as pd
 import io
+import csv
+import itertools
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from backend.utils import cdr_analytics, cdr_schema
+
+# Canonical columns of a normalized CDR frame
+CANONICAL_COLUMNS = ("source", "destination", "datetime", "duration", "imei", "imsi", "cell_id", "call_type")
+
+
+class CDRFormatError(ValueError):
+    """The file does not look like a CDR we can map."""
+
+
+def _is_csv(file_ext: str) -> bool:
+    return "csv" in file_ext.lower()
+
+
+def read_preview(file_content: bytes, file_ext: str) -> pd.DataFrame:
+    """First rows of a CDR with no header assumed (for schema detection).
+
+    CSV rows are read with the csv module so preamble lines with fewer
+    fields than the table do not break parsing.
+    """
+    if not _is_csv(file_ext):
+        return pd.read_excel(io.BytesIO(file_content), header=None, nrows=cdr_schema.SAMPLE_ROWS, dtype=str)
+
+    text = io.TextIOWrapper(io.BytesIO(file_content), encoding="utf-8-sig", errors="replace", newline="")
+    rows = list(itertools.islice(csv.reader(text), cdr_schema.SAMPLE_ROWS))
+    width = max((len(r) for r in rows), default=0)
+    return pd.DataFrame([r + [None] * (width - len(r)) for r in rows], dtype=object)
+
+
+def read_cdr(file_content: bytes, file_ext: str, schema: cdr_schema.CdrSchema) -> pd.DataFrame:
+    """Load only the mapped columns, as text, renamed to their canonical fields."""
+    positions = sorted(schema.columns.values())
+    fields = {pos: field for field, pos in schema.columns.items()}
+    if _is_csv(file_ext):
+        df = pd.read_csv(io.BytesIO(file_content), skiprows=schema.header_row, header=0,
+                         usecols=positions, dtype=str, encoding="utf-8-sig")
+    else:
+        df = pd.read_excel(io.BytesIO(file_content), skiprows=schema.header_row, header=0,
+                           usecols=positions, dtype=str)
+    df.columns = [fields[pos] for pos in positions]
+    return df
+
+
+def _per_value(values: pd.Series, transform) -> pd.Series:
+    """Apply a string transform once per distinct value (CDR columns repeat heavily)."""
+    codes, uniques = pd.factorize(values)
+    mapped = transform(pd.Series(uniques, dtype="string").str.strip())
+    return pd.Series(mapped.to_numpy()[codes], index=values.index).where(codes >= 0)
+
+
+def _numbers(values: pd.Series) -> pd.Series:
+    """Phone numbers reduced to their last 10 digits (+91/0 prefixes dropped).
+
+    Values that are not phone-like (short codes, sender IDs) are kept as-is.
+    """
+    def last_ten(text):
+        digits = text.str.replace(r'\D', '', regex=True)
+        phone_like = text.str.fullmatch(r'[\d\s+\-()]+').fillna(False) & (digits.str.len() >= 10)
+        return text.mask(phone_like, digits.str[-10:])
+    return _per_value(values, last_ten)
+
+
+def _seconds(values: pd.Series) -> pd.Series:
+    """Durations in seconds from plain numbers or HH:MM:SS."""
+    def to_seconds(text):
+        numeric = pd.to_numeric(text, errors="coerce")
+        clock = text.where(text.str.count(":") != 1, "00:" + text)  # MM:SS
+        return numeric.fillna(pd.to_timedelta(clock, errors="coerce").dt.total_seconds())
+    return _per_value(values, to_seconds).astype(float)
+
+
+def normalize_cdr(df: pd.DataFrame, schema: cdr_schema.CdrSchema) -> pd.DataFrame:
+    """
+    Reduce a raw CDR (columns named by field, see read_cdr) to the canonical columns.
+    Numbers, IMEI/IMSI, cell IDs and call types become categoricals, the timestamp
+    is parsed once (combining separate date and time columns) and the duration is
+    in seconds. For target-relative exports, incoming rows are swapped so source is
+    always the caller. The schema is kept in ``attrs``, along with ``has_time``:
+    False when the CDR only gives call dates, so no time of day is known.
+    """
+    source, destination = _numbers(df['source']), _numbers(df['destination'])
+    if schema.target_relative and 'call_type' in df:
+        incoming = _per_value(df['call_type'], lambda t: t.str.upper().isin(cdr_schema.INCOMING_CALL_TYPES))
+        incoming = incoming.fillna(False).astype(bool)
+        source, destination = source.where(~incoming, destination), destination.where(~incoming, source)
+
+    normalized = pd.DataFrame(index=df.index)
+    # Identifiers are stored as categoricals; source and destination share one
+    # dictionary so their codes are directly comparable in analytics
+    rows = len(df)
+    codes, categories = pd.factorize(pd.concat([source, destination], ignore_index=True))
+    normalized['source'] = pd.Categorical.from_codes(codes[:rows], categories=categories)
+    normalized['destination'] = pd.Categorical.from_codes(codes[rows:], categories=categories)
+    for key in ("imei", "imsi", "cell_id", "call_type"):
+        if key in df:
+            normalized[key] = _per_value(df[key], lambda t: t).astype("category")
+
+    # Often fmt issues: unparseable values become NaT
+    has_time = False
+    if 'datetime' in df:
+        stamps = cdr_schema.parse_timestamps(df['datetime'])
+        # A "datetime" column of bare dates parses to midnight on every row
+        has_time = bool((stamps.notna() & (stamps != stamps.dt.normalize())).any())
+        normalized['datetime'] = stamps
+    elif 'date' in df:
+        normalized['datetime'] = cdr_schema.parse_timestamps(df['date']).dt.normalize()
+        if 'time' in df:
+            clock = _per_value(df['time'], lambda t: pd.to_timedelta(t, errors="coerce"))
+            has_time = bool(clock.notna().any())
+            normalized['datetime'] = normalized['datetime'] + pd.to_timedelta(clock)
+    if 'duration' in df:
+        normalized['duration'] = _seconds(df['duration'])
+
+    normalized.attrs["column_mapping"] = schema.column_mapping()
+    normalized.attrs["cdr_schema"] = schema.to_dict()
+    normalized.attrs["has_time"] = has_time
+    return normalized.reset_index(drop=True)
+
+
+def load_cdr(file_content: bytes, file_ext: str, db: Optional[Session] = None,
+             schema: Optional[cdr_schema.CdrSchema] = None) -> pd.DataFrame:
+    """
+    Detect the layout (or reuse the cached profile for its header) and return
+    the normalized frame. Raises CDRFormatError if no usable layout is found.
+    """
+    if schema is None:
+        schema = cdr_schema.resolve(read_preview(file_content, file_ext), db)
+    if schema is None:
+        raise CDRFormatError("Could not identify Source/Destination columns. Please ensure CSV has headers like 'Source Number', 'Destination Number'.")
+    return normalize_cdr(read_cdr(file_content, file_ext, schema), schema)
+
+
+def _top_values(series: pd.Series, limit: int = 10) -> dict:
+    """Most frequent values. Categories with no rows are dropped: source and
+    destination share one dictionary, so each lists the other's numbers too."""
+    counts = series.value_counts()
+    return counts[counts > 0].head(limit).to_dict()
+
+
+def analyze_frame(df: pd.DataFrame) -> dict:
+    """Analysis stats for a normalized CDR frame (see normalize_cdr)."""
+    # 1. Total Calls
+    total_calls = len(df)
+
+    # 2. Top Contacted Numbers (Outgoing)
+    top_contacts = _top_values(df['destination'])
+
+    # 3. Top Incoming Numbers (if source varies)
+    top_incoming = _top_values(df['source'])
+
+    # 4. Duration Analysis
+    total_duration = 0
+    if 'duration' in df:
+        total_duration = df['duration'].sum()
+
+    # 5. Time Analysis (Need valid datetime col with a time of day)
+    hourly_distribution = {}
+    if cdr_analytics.has_time_of_day(df):
+        hourly_distribution = df['datetime'].dropna().dt.hour.value_counts().sort_index().to_dict()
+
+    return {
+        "total_calls": int(total_calls),
+        "total_duration": int(total_duration),
+        "top_contacts_outgoing": top_contacts,
+        "top_contacts_incoming": top_incoming,
+        "hourly_stats": hourly_distribution,
+        "column_mapping_used": df.attrs.get("column_mapping", {}),
+        "schema": df.attrs.get("cdr_schema"),
+        "analytics": cdr_analytics.analyze(df)
+    }
+
 
 def parse_cdr(file_content: bytes, file_ext: str):
     """
     Parses CDR file (CSV/Excel) and returns analysis stats.
-    Assumes standard columns often found in CDRs (Source, Destination, Duration, DateTime).
-    In a real system, this would need robust column mapping logic.
+    Column layout is detected per file (see utils/cdr_schema.py).
     """
     try:
-        if "csv" in file_ext.lower():
-            df = pd.read_csv(io.BytesIO(file_content))
-        else:
-            df = pd.read_excel(io.BytesIO(file_content))
-        
-        # Normalize headers (demo: lowercase)
-        df.columns = [c.lower().strip() for c in df.columns]
-        
-        # Identify key columns (simple keyword matching)
-        col_map = {}
-        for c in df.columns:
-            if "date" in c or "time" in c:
-                col_map['datetime'] = c
-            elif "source" in c or "caller" in c or "origin" in c or "from" in c:
-                col_map['source'] = c
-            elif "dest" in c or "callee" in c or "term" in c or "to" in c:
-                col_map['destination'] = c
-            elif "dur" in c or "sec" in c:
-                col_map['duration'] = c
-            elif "imei" in c:
-                col_map['imei'] = c
-        
-        # Check if we found minimal cols
-        if 'source' not in col_map or 'destination' not in col_map:
-            return {"error": "Could not identify Source/Destination columns. Please ensure CSV has headers like 'Source Number', 'Destination Number'."}
-        
-        # 1. Total Calls
-        total_calls = len(df)
-        
-        # 2. Top Contacted Numbers (Outgoing)
-        top_contacts = df[col_map['destination']].value_counts().head(10).to_dict()
-        
-        # 3. Top Incoming Numbers (if source varies)
-        top_incoming = df[col_map['source']].value_counts().head(10).to_dict()
-        
-        # 4. Duration Analysis
-        total_duration = 0
-        if 'duration' in col_map:
-            total_duration = df[col_map['duration']].sum()
-        
-        # 5. Time Analysis (Need valid datetime col)
-        hourly_distribution = {}
-        if 'datetime' in col_map:
-            try:
-                df['dt_parsed'] = pd.to_datetime(df[col_map['datetime']])
-                hourly_distribution = df['dt_parsed'].dt.hour.value_counts().sort_index().to_dict()
-            except Exception as e:
-                # Often fmt issues
-                pass
-        
-        return {
-            "total_calls": int(total_calls),
-            "total_duration": int(total_duration),
-            "top_contacts_outgoing": top_contacts,
-            "top_contacts_incoming": top_incoming,
-            "hourly_stats": hourly_distribution,
-            "column_mapping_used": col_map
-        }
-        
+        return analyze_frame(load_cdr(file_content, file_ext))
+    except CDRFormatError as e:
+        return {"error": str(e)}
     except Exception as e:
         return {"error": f"Failed to parse file: {str(e)}"}
@@ -0,0 +1,391 @@
+"""CDR schema detection with per-operator profiles and a header-fingerprint cache.
+
+Operator CDR exports differ in header names, may carry preamble lines above
+the header row, and often split the call timestamp into date and time
+columns. Detection works on a preview of the file (no header assumed):
+
+1. Every early row is tried as the header row; headers are matched against
+   per-TSP profiles (Airtel, Jio, Vi, BSNL) and then against generic
+   synonyms, matching whole words only (so "to" never matches "total").
+2. Candidate columns are checked against a sample of the rows below the
+   header (phone numbers, IMEI/IMSI lengths, parseable dates...), so a
+   header that looks right but holds the wrong data is rejected.
+
+The result is cached in ``cdr_schema_profiles`` keyed by a fingerprint of
+the header row, so later uploads with the same layout skip detection. An
+analyst can also save a corrected mapping for a fingerprint (source
+"manual"), which is then used for every file with that header.
+"""
+import hashlib
+import json
+import re
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend import models
+
+# Rows read for detection, and how far down the header row may be
+SAMPLE_ROWS = 2000
+MAX_HEADER_ROW = 20
+
+# Minimum share of sampled values that must look right for a column
+MIN_VALUE_SHARE = 0.5
+
+REQUIRED_FIELDS = ("source", "destination")
+FIELDS = ("source", "destination", "datetime", "date", "time", "duration",
+          "imei", "imsi", "cell_id", "call_type")
+
+# Generic header synonyms per canonical field (normalized: lowercase words)
+SYNONYMS = {
+    "source": ("calling number", "calling party number", "calling party", "calling no", "a party number",
+               "a party", "target number", "target no", "source number", "source", "originating number",
+               "caller", "from number", "msisdn"),
+    "destination": ("called number", "called party number", "called party", "called no", "b party number",
+                    "b party no", "b party", "destination number", "destination", "terminating number",
+                    "callee", "to number", "other party number", "other party"),
+    "datetime": ("call date time", "call datetime", "date time", "datetime", "start date time",
+                 "call start time", "start time", "timestamp", "event time"),
+    "date": ("call date", "date", "start date"),
+    "time": ("call time", "time"),
+    "duration": ("call duration", "duration", "dur", "duration sec", "call duration sec", "dur s"),
+    "imei": ("imei",),
+    "imsi": ("imsi",),
+    "cell_id": ("first cell id", "first cell global id", "first cgi", "cell id", "cell global id",
+                "cgi", "lac cell id", "cell"),
+    "call_type": ("call type", "call direction", "service type", "direction", "type"),
+}
+
+# Known operator exports: normalized header -> field. ``target_relative``
+# means the number columns are "target" / "other party" rather than
+# caller / callee, so incoming rows are swapped using the call type.
+TSP_PROFILES = {
+    "Airtel": {
+        "target_relative": True,
+        "headers": {
+            "target no": "source", "b party no": "destination", "call date": "date", "call time": "time",
+            "dur s": "duration", "first cell id": "cell_id", "imei": "imei", "imsi": "imsi",
+            "call type": "call_type",
+        },
+    },
+    "Jio": {
+        "target_relative": False,
+        "headers": {
+            "calling party telephone number": "source", "called party telephone number": "destination",
+            "call date": "date", "call time": "time", "call duration": "duration",
+            "first cell global id": "cell_id", "imei": "imei", "imsi": "imsi", "call type": "call_type",
+        },
+    },
+    "Vi": {
+        "target_relative": True,
+        "headers": {
+            "target a party number": "source", "b party number": "destination", "date": "date",
+            "time": "time", "duration": "duration", "first cgi": "cell_id", "imei": "imei", "imsi": "imsi",
+            "call type": "call_type",
+        },
+    },
+    "BSNL": {
+        "target_relative": False,
+        "headers": {
+            "calling no": "source", "called no": "destination", "date": "date", "time": "time",
+            "duration": "duration", "cell id": "cell_id", "imei": "imei", "imsi": "imsi",
+            "call type": "call_type",
+        },
+    },
+}
+
+# Share of a profile's headers that must be present for it to apply
+PROFILE_MIN_COVERAGE = 0.6
+
+# Call types that mean the target received the call/SMS
+INCOMING_CALL_TYPES = {"MTC", "IN", "INCOMING", "SMT", "SMS IN", "SMS-IN", "SMSMT", "MT", "TERMINATING"}
+
+# Header words that make the number columns target-relative in generic detection
+TARGET_RELATIVE_WORDS = ("target", "a party")
+
+PHONE_RE = re.compile(r'^\+?\d{10,13}$')
+DATE_RE = re.compile(r'\d[/\-.]\d{1,2}[/\-.]\d|\d{1,2}[/\-.\s][A-Za-z]{3}[/\-.\s]\d')
+TIME_RE = re.compile(r'^\d{1,2}:\d{2}(:\d{2})?$')
+DURATION_RE = re.compile(r'^(\d+(\.\d+)?|\d{1,2}:\d{2}(:\d{2})?)$')
+
+
+def normalize_header(value) -> str:
+    """Lowercase words only: 'B-Party No.' -> 'b party no'."""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return " ".join(re.sub(r'[^0-9a-z]+', ' ', str(value).lower()).split())
+
+
+def fingerprint(headers: List[str]) -> str:
+    normalized = [normalize_header(h) for h in headers]
+    return hashlib.sha256("\x1f".join(normalized).encode()).hexdigest()
+
+
+def parse_timestamps(values: pd.Series) -> pd.Series:
+    """Parse dates; operator DD/MM/YYYY is day-first, ISO dates are not."""
+    text = values.astype("string").str.strip()
+    sample = text.dropna()
+    iso = sample.empty or bool(sample.iloc[0][:4].isdigit())
+    return pd.to_datetime(text, errors="coerce", dayfirst=not iso)
+
+
+class CdrSchema:
+    """Where each canonical field lives in a CDR layout."""
+
+    def __init__(self, columns: Dict[str, int], headers: List[str], header_row: int = 0,
+                 operator: str = "Generic", target_relative: bool = False, source: str = "detected"):
+        self.columns = columns  # field -> column position
+        self.headers = headers  # raw header row
+        self.header_row = header_row  # rows above the header are skipped
+        self.operator = operator
+        self.target_relative = target_relative
+        self.source = source  # detected, manual
+
+    @property
+    def fingerprint(self) -> str:
+        return fingerprint(self.headers)
+
+    def column_mapping(self) -> Dict[str, str]:
+        return {field: str(self.headers[pos]) for field, pos in self.columns.items()}
+
+    def to_dict(self) -> dict:
+        return {
+            "operator": self.operator,
+            "header_row": self.header_row,
+            "target_relative": self.target_relative,
+            "source": self.source,
+            "fingerprint": self.fingerprint,
+            "column_mapping": self.column_mapping(),
+        }
+
+    @classmethod
+    def from_profile(cls, profile: models.CdrSchemaProfile, headers: List[str], header_row: int) -> "CdrSchema":
+        return cls(
+            {field: int(pos) for field, pos in json.loads(profile.mapping).items()},
+            headers, header_row, profile.operator, profile.target_relative, profile.source,
+        )
+
+
+# ---------- Value checks on the sample ----------
+
+def _share(values: pd.Series, predicate) -> float:
+    values = values.dropna().astype(str).str.strip()
+    values = values[values != ""]
+    if values.empty:
+        return 0.0
+    return float(predicate(values).mean())
+
+
+def _digits(values: pd.Series) -> pd.Series:
+    return values.str.replace(r'[\s\-]', '', regex=True)
+
+
+def _only_digits(values: pd.Series) -> pd.Series:
+    # Handset/SIM ids are often exported with a label ("IMEI3569...")
+    return values.str.replace(r'\D', '', regex=True)
+
+
+VALUE_CHECKS = {
+    "source": lambda v: _digits(v).str.match(PHONE_RE),
+    "destination": lambda v: _digits(v).str.match(PHONE_RE),
+    "imei": lambda v: _only_digits(v).str.fullmatch(r'\d{14,16}'),
+    "imsi": lambda v: _only_digits(v).str.fullmatch(r'\d{14,15}'),
+    "datetime": lambda v: v.str.contains(DATE_RE) & v.str.contains(":", regex=False) & parse_timestamps(v).notna(),
+    "date": lambda v: v.str.contains(DATE_RE) & parse_timestamps(v).notna(),
+    "time": lambda v: v.str.match(TIME_RE),
+    "duration": lambda v: v.str.match(DURATION_RE),
+}
+
+
+def value_share(field: str, values: pd.Series) -> float:
+    check = VALUE_CHECKS.get(field)
+    return _share(values, check) if check else _share(values, lambda v: v.str.len() > 0)
+
+
+# ---------- Detection ----------
+
+def _header_score(header: str, synonym: str) -> float:
+    """1.0 for an exact header, 0.8 when the synonym appears as whole words."""
+    if not header:
+        return 0.0
+    if header == synonym:
+        return 1.0
+    if f" {synonym} " in f" {header} ":
+        return 0.8
+    return 0.0
+
+
+def _assign(candidates: List[tuple]) -> Dict[str, int]:
+    """Greedy best-first assignment; each field and column is used once."""
+    columns, used = {}, set()
+    for score, field, pos in sorted(candidates, key=lambda c: (-c[0], c[2])):
+        if score <= 0 or field in columns or pos in used:
+            continue
+        columns[field] = pos
+        used.add(pos)
+    # A combined timestamp makes separate date/time columns redundant
+    if "datetime" in columns:
+        columns.pop("date", None)
+        columns.pop("time", None)
+    return columns
+
+
+def _match_profile(headers: List[str], sample: pd.DataFrame):
+    """The best operator profile covering these headers, if any."""
+    best = None
+    for operator, profile in TSP_PROFILES.items():
+        expected = profile["headers"]
+        positions = {}
+        for pos, header in enumerate(headers):
+            field = expected.get(header)
+            if field and field not in positions and value_share(field, sample.iloc[:, pos]) >= MIN_VALUE_SHARE:
+                positions[field] = pos
+        coverage = len(positions) / len(expected)
+        if coverage >= PROFILE_MIN_COVERAGE and all(f in positions for f in REQUIRED_FIELDS):
+            if best is None or coverage > best[0]:
+                best = (coverage, operator, positions, profile["target_relative"])
+    return best
+
+
+def _generic_columns(headers: List[str], sample: pd.DataFrame, headerless: bool) -> Dict[str, int]:
+    candidates = []
+    for pos, header in enumerate(headers):
+        shares = {}
+        for field, synonyms in SYNONYMS.items():
+            score = max(_header_score(header, s) for s in synonyms)
+            if not score:
+                continue
+            if field not in shares:
+                shares[field] = value_share(field, sample.iloc[:, pos])
+            # Values settle partial header matches; an exact header name is kept
+            # even when its values look unusual (ranked below matching columns)
+            if shares[field] >= MIN_VALUE_SHARE or score == 1.0:
+                candidates.append((score * (0.5 + 0.5 * shares[field]), field, pos))
+    columns = _assign(candidates)
+
+    # Header-less file: fall back to the first phone-like columns in order
+    missing = [f for f in REQUIRED_FIELDS if f not in columns]
+    if missing and headerless:
+        used = set(columns.values())
+        phone_like = [pos for pos in range(len(headers))
+                      if pos not in used and value_share("source", sample.iloc[:, pos]) >= 0.8]
+        for field, pos in zip(missing, phone_like):
+            columns[field] = pos
+    return columns
+
+
+def _detect_at(preview: pd.DataFrame, header_row: int) -> Optional[CdrSchema]:
+    raw_headers = preview.iloc[header_row].tolist()
+    headers = [normalize_header(h) for h in raw_headers]
+    sample = preview.iloc[header_row + 1:]
+    if sample.empty:
+        return None
+
+    matched = _match_profile(headers, sample)
+    if matched:
+        _, operator, columns, target_relative = matched
+        return CdrSchema(columns, raw_headers, header_row, operator, target_relative)
+
+    columns = _generic_columns(headers, sample, headerless=header_row == 0)
+    if not all(f in columns for f in REQUIRED_FIELDS):
+        return None
+    source_header = headers[columns["source"]]
+    target_relative = any(word in source_header for word in TARGET_RELATIVE_WORDS)
+    return CdrSchema(columns, raw_headers, header_row, "Generic", target_relative)
+
+
+def detect(preview: pd.DataFrame) -> Optional[CdrSchema]:
+    """Find the header row and field columns in a header-less preview.
+
+    The header row is the early row yielding the most mapped fields.
+    """
+    best = None
+    for header_row in range(min(MAX_HEADER_ROW, len(preview) - 1)):
+        schema = _detect_at(preview, header_row)
+        if schema and (best is None or len(schema.columns) > len(best.columns)):
+            best = schema
+    return best
+
+
+# ---------- Profile cache ----------
+
+def _cached(db: Session, preview: pd.DataFrame) -> Optional[CdrSchema]:
+    rows = min(MAX_HEADER_ROW, len(preview))
+    prints = {fingerprint(preview.iloc[i].tolist()): i for i in range(rows)}
+    profiles = (
+        db.query(models.CdrSchemaProfile)
+        .filter(models.CdrSchemaProfile.fingerprint.in_(list(prints)))
+        .all()
+    )
+    if not profiles:
+        return None
+    # Prefer an analyst correction over a detection
+    profile = min(profiles, key=lambda p: (p.source != "manual", prints[p.fingerprint]))
+    header_row = prints[profile.fingerprint]
+    profile.hits = (profile.hits or 0) + 1
+    return CdrSchema.from_profile(profile, preview.iloc[header_row].tolist(), header_row)
+
+
+def save_profile(db: Session, schema: CdrSchema) -> models.CdrSchemaProfile:
+    """Store (or replace) the profile for this schema's header fingerprint."""
+    profile = (
+        db.query(models.CdrSchemaProfile)
+        .filter(models.CdrSchemaProfile.fingerprint == schema.fingerprint)
+        .first()
+    )
+    if profile is None:
+        profile = models.CdrSchemaProfile(fingerprint=schema.fingerprint, hits=0)
+        db.add(profile)
+    profile.operator = schema.operator
+    profile.mapping = json.dumps(schema.columns)
+    profile.target_relative = schema.target_relative
+    profile.source = schema.source
+    profile.headers = json.dumps([str(h) for h in schema.headers])
+    return profile
+
+
+def resolve(preview: pd.DataFrame, db: Optional[Session] = None) -> Optional[CdrSchema]:
+    """Cached profile for this header if known, otherwise detect (and cache).
+
+    Profile changes are flushed, not committed; the caller's commit persists them.
+    """
+    if db is not None:
+        schema = _cached(db, preview)
+        if schema is not None:
+            return schema
+
+    schema = detect(preview)
+    if schema is not None and db is not None:
+        try:
+            with db.begin_nested():
+                save_profile(db, schema)
+        except IntegrityError:
+            # A concurrent upload cached the same header first
+            pass
+    return schema
+
+
+def manual_schema(preview: pd.DataFrame, mapping: Dict[str, str], header_row: int,
+                  target_relative: bool = False) -> CdrSchema:
+    """Schema from an analyst's field -> header mapping. Raises ValueError."""
+    if not 0 <= header_row < len(preview):
+        raise ValueError("header_row is outside the file")
+    raw_headers = preview.iloc[header_row].tolist()
+    positions = {normalize_header(h): pos for pos, h in reversed(list(enumerate(raw_headers)))}
+
+    columns = {}
+    for field, header in mapping.items():
+        if field not in FIELDS:
+            raise ValueError(f"Unknown field '{field}'. Expected one of: {', '.join(FIELDS)}")
+        pos = positions.get(normalize_header(header))
+        if pos is None:
+            raise ValueError(f"Column '{header}' not found in header row")
+        columns[field] = pos
+    if len(set(columns.values())) != len(columns):
+        raise ValueError("Each column can be mapped to one field only")
+    for field in REQUIRED_FIELDS:
+        if field not in columns:
+            raise ValueError(f"Mapping must include '{field}'")
+    return CdrSchema(columns, raw_headers, header_row, "Manual", target_relative, source="manual")
@@ -1,23 +1,170 @@
+import io
 import os
+import json
 import mimetypes
 import traceback
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Set, Tuple
+
+from backend.database import SessionLocal
+from backend.utils import cdr_cache, identifier_index, ocr, secure_storage, table_store
 
 LEGAL_NOTICE = "All extracted data is generated solely to assist investigation. Original evidence remains primary and unaltered."
 
+# Extraction results, encrypted, one per evidence content hash
+EXTRACTION_DIR = os.path.join("secure_uploads", "extractions")
 
-def process_file(path: str) -> Dict[str, Any]:
-    """Process a file and extract factual, verifiable data only.
+# Tabular evidence is kept in table_store; the extraction holds the first rows only
+TABULAR_EXTENSIONS = (".csv", ".tsv", ".xls", ".xlsx")
+PREVIEW_ROWS = 100
 
-    This function attempts safe extraction using optional libraries when available.
-    It never infers or fabricates data. If an extractor is unavailable, the
-    Notes field explains the limitation. Any recovered/corrupted data must be
-    explicitly marked by higher-level callers; here we report failures clearly.
+TEXT_EXTENSIONS = (".txt", ".log", ".md")
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tif", ".tiff")
+# Types process_file reads the content of; anything else (audio, video,
+# archives, documents) only gets metadata, so it is never decrypted for that
+CONTENT_EXTENSIONS = TEXT_EXTENSIONS + TABULAR_EXTENSIONS + (".pdf",) + IMAGE_EXTENSIONS
+
+
+def extraction_path(file_hash: str) -> str:
+    return os.path.join(EXTRACTION_DIR, f"{file_hash}.json")
+
+
+def has_extraction(file_hash: str) -> bool:
+    return os.path.exists(extraction_path(file_hash))
+
+
+def save_extraction(file_hash: str, extraction: Dict[str, Any]) -> None:
+    os.makedirs(EXTRACTION_DIR, exist_ok=True)
+    payload = json.dumps(extraction, default=str).encode("utf-8")
+    secure_storage.write_file(extraction_path(file_hash), [payload])
+
+
+def load_extraction(file_hash: str) -> Optional[Dict[str, Any]]:
+    """Stored extraction result for this content, or None if not extracted yet."""
+    if not has_extraction(file_hash):
+        return None
+    return json.loads(secure_storage.read_all(extraction_path(file_hash)))
+
+
+def is_tabular(filename: str) -> bool:
+    return os.path.splitext(filename)[1].lower() in TABULAR_EXTENSIONS
+
+
+def reads_content(filename: str) -> bool:
+    return os.path.splitext(filename)[1].lower() in CONTENT_EXTENSIONS
+
+
+def _needs_extraction(file_hash: str, filename: str) -> bool:
+    # Tables extracted before table_store existed are redone to get paginated rows
+    return not has_extraction(file_hash) or (is_tabular(filename) and not table_store.exists(file_hash))
+
+
+def needs_processing(file_hash: str, file_type: str, filename: str) -> bool:
+    """Whether stored content still lacks its extraction or (for CDRs) its frame cache."""
+    if cdr_cache.is_cdr(file_type, filename) and not os.path.exists(cdr_cache.cache_path(file_hash)):
+        return True
+    return _needs_extraction(file_hash, filename) or not identifier_index.has_content_identifiers(file_hash)
+
+
+def content_identifiers(extraction: Dict[str, Any], table_key: Optional[str] = None) -> Set[Tuple[str, str]]:
+    """Mobile/UPI/account/IFSC/email identifiers mentioned in an extraction result.
+
+    Tables stored in table_store are scanned in full, chunk by chunk; the
+    extraction itself only holds their first rows.
     """
-    ext = os.path.splitext(path)[1].lower()
-    file_type = ext.lstrip('.') or 'unknown'
+    data = extraction.get("Extracted Data")
+    if table_key and extraction.get("Table"):
+        table = table_store.open_table(table_key)
+        if table is not None:
+            found = set()
+            for chunk in table_store.iter_chunks(table):
+                found |= identifier_index.extract_identifiers(
+                    "\n".join(chunk.fillna("").astype(str).agg(" ".join, axis=1))
+                )
+            return found
+    if isinstance(data, str):
+        return identifier_index.extract_identifiers(data)
+    if isinstance(data, list):
+        # Records (dicts) or raw csv rows (lists)
+        lines = (" ".join(str(v) for v in (row.values() if isinstance(row, dict) else row) if v is not None)
+                 for row in data)
+        return identifier_index.extract_identifiers("\n".join(lines))
+    # File metadata only (audio/video/unknown types)
+    return set()
+
+
+def process_stored_evidence(file_path: str, file_hash: str, filename: str, file_type: str) -> Dict[str, Any]:
+    """
+    Post-upload stage of the ingest pipeline (run as a background job): decrypt
+    the stored blob once and derive everything from that single read - the
+    normalized CDR frame (for CDR uploads), the extraction result and the
+    identifiers it mentions, which are then indexed for every Evidence row with
+    this content. All are kept per content hash, so re-uploads of the same file
+    skip work already done. Types with no content extractor (media, archives)
+    are not decrypted: their metadata comes from the container header.
+    """
+    summary = {"file_hash": file_hash, "cdr_cache": None, "extraction": "cached"}
+    needs_cdr = cdr_cache.is_cdr(file_type, filename) and not os.path.exists(cdr_cache.cache_path(file_hash))
+    needs_extraction = _needs_extraction(file_hash, filename)
+    needs_identifiers = needs_extraction or not identifier_index.has_content_identifiers(file_hash)
+    if not (needs_cdr or needs_extraction or needs_identifiers):
+        return summary
+
+    if needs_cdr or (needs_extraction and reads_content(filename)):
+        content = secure_storage.read_all(file_path)
+    if needs_cdr:
+        db = SessionLocal()
+        try:
+            cdr_cache.build(content, filename, file_hash, db)
+            db.commit()
+            summary["cdr_cache"] = "built"
+        except Exception as e:
+            # Not fatal: the frame is built on first analysis instead
+            summary["cdr_cache"] = f"failed: {e}"
+        finally:
+            db.close()
+    if needs_extraction:
+        if reads_content(filename):
+            extraction = process_file(filename, content, table_key=file_hash)
+        else:
+            extraction = metadata_extraction(filename, secure_storage.EncryptedFile(file_path).size)
+        summary["extraction"] = "done"
+        summary["confidence"] = extraction.get("Confidence Level")
+        summary["method"] = extraction.get("Extraction Method Used")
+    elif needs_identifiers:
+        # Extracted before identifiers were indexed: reuse the stored result
+        extraction = load_extraction(file_hash)
+    if needs_identifiers:
+        identifiers = content_identifiers(extraction, table_key=file_hash)
+        # Saved before the extraction, so a stored extraction always has its identifiers
+        identifier_index.save_content_identifiers(file_hash, identifiers)
+        summary["identifiers"] = len(identifiers)
+    if needs_extraction:
+        save_extraction(file_hash, extraction)
+    if needs_identifiers:
+        db = SessionLocal()
+        try:
+            summary["indexed_evidence"] = identifier_index.index_evidence_content(db, file_hash)
+            db.commit()
+        finally:
+            db.close()
+    return summary
+
+
+def _read_bytes(path: str, content: Optional[bytes]) -> bytes:
+    if content is not None:
+        return content
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _store_table(extraction: Dict[str, Any], table_key: str, frames) -> None:
+    table = table_store.write(table_key, frames)
+    extraction["Extracted Data"] = table_store.records(table_store.read_page(table, 0, PREVIEW_ROWS))
+    extraction["Table"] = {"rows": table.rows, "columns": table.columns, "preview_rows": min(table.rows, PREVIEW_ROWS)}
+
 
-    extraction = {
+def _new_extraction(file_type: str) -> Dict[str, Any]:
+    return {
         "Evidence File Type": file_type,
         "Extraction Method Used": None,
         "Extracted Data": None,
@@ -26,11 +173,44 @@ def process_file(path: str) -> Dict[str, Any]:
         "LEGAL_SAFETY_NOTICE": LEGAL_NOTICE,
     }
 
+
+def metadata_extraction(path: str, size: int) -> Dict[str, Any]:
+    """Extraction result for types without a content extractor: name, size and MIME type."""
+    extraction = _new_extraction(os.path.splitext(path)[1].lower().lstrip('.') or 'unknown')
+    extraction["Extraction Method Used"] = "Metadata and raw info"
+    mime = mimetypes.guess_type(path)[0]
+    extraction["Extracted Data"] = {"filename": os.path.basename(path), "size_bytes": size, "mimetype": mime}
+    extraction["Notes"] = "No specialized extractor available for this file type in current environment. Install optional dependencies to enable rich extraction."
+    return extraction
+
+
+def process_file(path: str, content: Optional[bytes] = None, table_key: Optional[str] = None) -> Dict[str, Any]:
+    """Process a file and extract factual, verifiable data only.
+
+    This function attempts safe extraction using optional libraries when available.
+    It never infers or fabricates data. If an extractor is unavailable, the
+    Notes field explains the limitation. Any recovered/corrupted data must be
+    explicitly marked by higher-level callers; here we report failures clearly.
+
+    With ``content`` the bytes are used directly (e.g. decrypted evidence) and
+    ``path`` only supplies the file name and type. With ``table_key`` CSV and
+    spreadsheet rows are written to table_store under that key and only a
+    preview of the first rows is kept in the result.
+    """
+    source = io.BytesIO(content) if content is not None else path
+    ext = os.path.splitext(path)[1].lower()
+    file_type = ext.lstrip('.') or 'unknown'
+
+    extraction = _new_extraction(file_type)
+
     try:
-        if ext in (".txt", ".log", ".md"):
+        if ext in TEXT_EXTENSIONS:
             extraction["Extraction Method Used"] = "Plain text read"
-            with open(path, "rb") as f:
-                raw = f.read()
+            if content is not None:
+                raw = content
+            else:
+                with open(path, "rb") as f:
+                    raw = f.read()
             try:
                 text = raw.decode("utf-8")
                 extraction["Extracted Data"] = text
@@ -45,16 +225,23 @@ def process_file(path: str) -> Dict[str, Any]:
             extraction["Extraction Method Used"] = "CSV parsing"
             try:
                 import pandas as pd
-                df = pd.read_csv(path, sep=None, engine="python")
-                extraction["Extracted Data"] = df.to_dict(orient="records")
+                if table_key:
+                    _store_table(extraction, table_key, table_store.csv_frames(_read_bytes(path, content)))
+                else:
+                    df = pd.read_csv(source, sep=None, engine="python")
+                    extraction["Extracted Data"] = table_store.records(df)
                 extraction["Confidence Level"] = "High"
             except Exception:
                 # Fallback to builtin csv reader
                 try:
                     import csv
-                    with open(path, newline='', encoding='utf-8', errors='replace') as f:
-                        reader = csv.reader(f)
-                        rows = [row for row in reader]
+                    if content is not None:
+                        text = io.StringIO(content.decode('utf-8', errors='replace'), newline='')
+                        rows = [row for row in csv.reader(text)]
+                    else:
+                        with open(path, newline='', encoding='utf-8', errors='replace') as f:
+                            reader = csv.reader(f)
+                            rows = [row for row in reader]
                     extraction["Extracted Data"] = rows
                     extraction["Confidence Level"] = "Medium"
                     extraction["Notes"] = "Used builtin csv fallback; install pandas for richer parsing."
@@ -67,8 +254,11 @@ def process_file(path: str) -> Dict[str, Any]:
             extraction["Extraction Method Used"] = "Spreadsheet parsing"
             try:
                 import pandas as pd
-                df = pd.read_excel(path, sheet_name=0)
-                extraction["Extracted Data"] = df.to_dict(orient="records")
+                if table_key:
+                    _store_table(extraction, table_key, table_store.excel_frames(_read_bytes(path, content)))
+                else:
+                    df = pd.read_excel(source, sheet_name=0)
+                    extraction["Extracted Data"] = table_store.records(df)
                 extraction["Confidence Level"] = "High"
             except Exception as e:
                 extraction["Notes"] = f"Spreadsheet parsing failed: {e}"
@@ -79,10 +269,29 @@ def process_file(path: str) -> Dict[str, Any]:
             extraction["Extraction Method Used"] = "PDF text extraction"
             try:
                 from PyPDF2 import PdfReader
-                reader = PdfReader(path)
+                reader = PdfReader(source)
                 pages = []
                 for p in reader.pages:
                     pages.append(p.extract_text() or "")
+
+                # Scanned pages (no text layer) are rasterized and OCRed in parallel
+                scanned = [i for i, page in enumerate(pages) if len(page.strip()) < ocr.MIN_TEXT_CHARS]
+                if scanned and ocr.can_ocr_pdf():
+                    if content is None:
+                        with open(path, "rb") as f:
+                            content = f.read()
+                    ocr_text, cached = ocr.ocr_pdf_pages(content, scanned)
+                    for i, page in ocr_text.items():
+                        if len(page.strip()) > len(pages[i].strip()):
+                            pages[i] = page
+                    extraction["Extraction Method Used"] = (
+                        f"PDF text extraction + OCR ({len(scanned)} of {len(pages)} pages, {cached} from cache)"
+                    )
+                elif scanned:
+                    extraction["Notes"] = (
+                        f"{len(scanned)} of {len(pages)} pages have no text layer; install pytesseract "
+                        "and PyMuPDF (or pdf2image) to OCR them."
+                    )
                 text = "\n".join(pages)
                 extraction["Extracted Data"] = text
                 extraction["Confidence Level"] = "Medium" if text.strip() else "Low"
@@ -91,7 +300,7 @@ def process_file(path: str) -> Dict[str, Any]:
                 extraction["Confidence Level"] = "Low"
             return extraction
 
-        if ext in (".jpg", ".jpeg", ".png", ".bmp", ".gif", ".tiff"):
+        if ext in IMAGE_EXTENSIONS:
             extraction["Extraction Method Used"] = "Image processing (OCR if available)"
             try:
                 from PIL import Image
@@ -100,10 +309,18 @@ def process_file(path: str) -> Dict[str, Any]:
                 extraction["Confidence Level"] = "Low"
                 return extraction
 
+            if not ocr.can_ocr_images():
+                extraction["Notes"] = "OCR not available: install pytesseract and the tesseract binary."
+                extraction["Confidence Level"] = "Low"
+                return extraction
+
             try:
-                import pytesseract
-                img = Image.open(path)
-                text = pytesseract.image_to_string(img)
+                if content is None:
+                    with open(path, "rb") as f:
+                        content = f.read()
+                text, frames, cached = ocr.ocr_image(content)
+                if frames > 1 or cached:
+                    extraction["Notes"] = f"OCR over {frames} frame(s), {cached} from cache."
                 extraction["Extracted Data"] = text
                 extraction["Confidence Level"] = "Medium" if text.strip() else "Low"
             except Exception as e:
@@ -112,13 +329,7 @@ def process_file(path: str) -> Dict[str, Any]:
             return extraction
 
         # Audio/video and other types: provide metadata and note missing extractors
-        extraction["Extraction Method Used"] = "Metadata and raw info"
-        size = os.path.getsize(path)
-        mime = mimetypes.guess_type(path)[0]
-        extraction["Extracted Data"] = {"filename": os.path.basename(path), "size_bytes": size, "mimetype": mime}
-        extraction["Notes"] = "No specialized extractor available for this file type in current environment. Install optional dependencies to enable rich extraction."
-        extraction["Confidence Level"] = "Low"
-        return extraction
+        return metadata_extraction(path, len(content) if content is not None else os.path.getsize(path))
 
     except Exception:
         extraction["Notes"] = traceback.format_exc()
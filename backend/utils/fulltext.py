@@ -0,0 +1,148 @@
+"""SQLite FTS5 full-text search over case descriptions and timeline narratives.
+
+The FTS tables are external-content tables over ``cases.description`` and
+``transaction_timeline.narrative``; triggers keep them in sync with the base
+tables so no router has to maintain them. Results are ranked with BM25 and
+carry a highlighted snippet of the matching text.
+"""
+from typing import List, NamedTuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.utils.identifier_index import tokenize
+
+# Markers wrapped around matched terms in snippets (the frontend turns these into <mark>)
+SNIPPET_START = "\u0002"
+SNIPPET_END = "\u0003"
+SNIPPET_TOKENS = 16
+
+# table -> (fts table, content table, text column)
+FTS_TABLES = {
+    "cases": ("cases_fts", "cases", "description"),
+    "timeline": ("timeline_fts", "transaction_timeline", "narrative"),
+}
+
+_enabled = False
+
+
+class TextMatch(NamedTuple):
+    row_id: int
+    rank: float
+    snippet: str
+
+
+def _ddl(fts: str, content: str, column: str) -> List[str]:
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{column}, content='{content}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {content} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {content} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} ON {content} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+    ]
+
+
+def init_fulltext(engine) -> bool:
+    """Create the FTS5 tables and sync triggers (SQLite only).
+
+    Newly created tables are populated from the existing rows. Returns
+    whether full-text search is available.
+    """
+    global _enabled
+    if engine.dialect.name != "sqlite":
+        _enabled = False
+        return _enabled
+
+    try:
+        with engine.begin() as conn:
+            for fts, content, column in FTS_TABLES.values():
+                exists = conn.execute(
+                    text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                    {"name": fts},
+                ).first()
+                for statement in _ddl(fts, content, column):
+                    conn.execute(text(statement))
+                if not exists:
+                    conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+        _enabled = True
+    except Exception as e:
+        # SQLite builds without FTS5 fall back to substring scans
+        print(f"Warning: FTS5 full-text search unavailable: {e}")
+        _enabled = False
+    return _enabled
+
+
+def build_match_query(query: str, phrase: bool = False) -> str:
+    """Turn free user text into a safe FTS5 query.
+
+    By default every term must appear (prefix match); with ``phrase`` the
+    terms must appear adjacent and in order (used for identifiers such as
+    ``name@bank``).
+    """
+    tokens = tokenize(query, min_length=1)
+    if not tokens:
+        return ""
+    if phrase:
+        return '"' + " ".join(tokens) + '"*'
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _highlight(value: str, query: str, width: int = 100) -> str:
+    """Snippet around the first occurrence of ``query`` (substring fallback)."""
+    pos = value.lower().find(query.lower())
+    if pos < 0:
+        return value[:width]
+    start = max(pos - width // 2, 0)
+    end = pos + len(query)
+    snippet = (
+        value[start:pos] + SNIPPET_START + value[pos:end] + SNIPPET_END
+        + value[end:end + width // 2]
+    )
+    return ("…" if start > 0 else "") + snippet + ("…" if end + width // 2 < len(value) else "")
+
+
+def _substring_search(db: Session, table: str, query: str, limit: int) -> List[TextMatch]:
+    model, column = {
+        "cases": (models.Case, models.Case.description),
+        "timeline": (models.TransactionTimeline, models.TransactionTimeline.narrative),
+    }[table]
+    rows = db.query(model.id, column).filter(column.ilike(f"%{query}%")).limit(limit).all()
+    return [TextMatch(row_id, 0.0, _highlight(value or "", query)) for row_id, value in rows]
+
+
+def _search(db: Session, table: str, query: str, limit: int, phrase: bool) -> List[TextMatch]:
+    if not _enabled:
+        return _substring_search(db, table, query, limit)
+
+    fts, _, _ = FTS_TABLES[table]
+    match = build_match_query(query, phrase)
+    if not match:
+        return []
+    rows = db.execute(
+        text(
+            f"SELECT rowid, bm25({fts}) AS rank, "
+            f"snippet({fts}, 0, :start, :end, '…', {SNIPPET_TOKENS}) "
+            f"FROM {fts} WHERE {fts} MATCH :match ORDER BY rank LIMIT :limit"
+        ),
+        {"start": SNIPPET_START, "end": SNIPPET_END, "match": match, "limit": limit},
+    ).all()
+    return [TextMatch(row[0], row[1], row[2]) for row in rows]
+
+
+def search_case_descriptions(db: Session, query: str, limit: int = 100, phrase: bool = False) -> List[TextMatch]:
+    """BM25-ranked case description matches (best first)."""
+    return _search(db, "cases", query, limit, phrase)
+
+
+def search_timeline_narratives(db: Session, query: str, limit: int = 100, phrase: bool = False) -> List[TextMatch]:
+    """BM25-ranked timeline narrative matches (best first)."""
+    return _search(db, "timeline", query, limit, phrase)
+
+
+def strip_markers(snippet: str) -> str:
+    return snippet.replace(SNIPPET_START, "").replace(SNIPPET_END, "")
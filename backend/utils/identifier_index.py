@@ -0,0 +1,455 @@
+"""Normalized identifier index used by universal search.
+
+Mobile numbers, UPI IDs, account numbers, IFSC codes, FIR numbers, emails and
+name tokens are written to the ``identifier_index`` table in canonical form
+whenever the owning row is created, updated or deleted. Searches then become
+equality / prefix lookups on ``(kind, value)`` instead of ``ILIKE '%q%'`` scans.
+A query with no prefix match for a kind is retried as a substring match over
+that kind (e.g. the last digits of a mobile number); on PostgreSQL a trigram
+index serves it, on SQLite it reads the kind's range of the index.
+
+Evidence files are also indexed by what they contain: the identifiers found in
+their extracted text or tables are computed once per content hash (by the
+extraction job), kept encrypted under ``secure_uploads/identifiers`` and
+written to the index for every Evidence row holding that content.
+"""
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, insert
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.utils import secure_storage
+
+# Source types stored in IdentifierIndex.source_type
+SOURCE_CASE = "case"
+SOURCE_TELECOM_REQUEST = "telecom_request"
+SOURCE_FINANCIAL_ENTITY = "financial_entity"
+SOURCE_TIMELINE = "timeline"
+SOURCE_EVIDENCE = "evidence"
+
+# Index kinds consulted for each universal_search search_type
+KINDS_BY_SEARCH_TYPE = {
+    "mobile": ("mobile",),
+    "upi": ("upi", "account", "name", "bank"),
+    "account": ("account", "upi", "ifsc", "name", "bank"),
+    "fir": ("fir",),
+    "name": ("name", "fir"),
+    "email": ("email",),
+}
+
+# Kinds whose values are word tokens (multi-word queries must match every token)
+TOKEN_KINDS = {"name", "bank", "file"}
+
+MOBILE_RE = re.compile(r'(?<![\d])(?:\+?91[\s-]?)?([6-9]\d{9})(?![\d])')
+EMAIL_RE = re.compile(r'[\w.+\-]+@[\w\-]+\.[\w.\-]*\w')
+UPI_RE = re.compile(r'[\w.\-]{2,}@[A-Za-z]{2,}(?![\w.@])')
+IFSC_RE = re.compile(r'\b[A-Za-z]{4}0[A-Za-z0-9]{6}\b')
+ACCOUNT_RE = re.compile(r'(?<![\d])\d{9,18}(?![\d])')
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Max bound parameters per IN (...) lookup (stays under SQLite's variable limit)
+LOOKUP_CHUNK_SIZE = 500
+
+# Identifiers found in evidence contents, one encrypted file per content hash
+CONTENT_DIR = os.path.join("secure_uploads", "identifiers")
+
+# Upper bound used for prefix range scans (value >= q AND value < q + PREFIX_END)
+PREFIX_END = "\uffff"
+
+
+def normalize_mobile(value: str) -> Optional[str]:
+    """Return the 10-digit national number, or the bare digits if not a valid Indian mobile."""
+    digits = re.sub(r'\D', '', value or "")
+    if not digits:
+        return None
+    if len(digits) >= 10 and digits[-10] in "6789":
+        return digits[-10:]
+    return digits
+
+
+def normalize_upi(value: str) -> Optional[str]:
+    value = (value or "").strip().lower()
+    return value or None
+
+
+def normalize_account(value: str) -> Optional[str]:
+    value = re.sub(r'[\s\-]', '', value or "").upper()
+    return value or None
+
+
+def normalize_ifsc(value: str) -> Optional[str]:
+    value = (value or "").strip().upper()
+    return value or None
+
+
+def normalize_fir(value: str) -> Optional[str]:
+    value = re.sub(r'\s+', '', value or "").upper()
+    return value or None
+
+
+def normalize_email(value: str) -> Optional[str]:
+    value = (value or "").strip().lower()
+    return value or None
+
+
+def tokenize(text: str, min_length: int = 2) -> List[str]:
+    """Split free text into lowercase alphanumeric tokens."""
+    return [t for t in TOKEN_RE.findall((text or "").lower()) if len(t) >= min_length]
+
+
+NORMALIZERS = {
+    "mobile": normalize_mobile,
+    "upi": normalize_upi,
+    "account": normalize_account,
+    "ifsc": normalize_ifsc,
+    "fir": normalize_fir,
+    "email": normalize_email,
+}
+
+
+def extract_identifiers(text: str) -> Set[Tuple[str, str]]:
+    """Pull mobile/UPI/email/IFSC/account identifiers out of free text."""
+    found = set()
+    if not text:
+        return found
+
+    for m in MOBILE_RE.finditer(text):
+        found.add(("mobile", m.group(1)))
+    emails = set()
+    for m in EMAIL_RE.finditer(text):
+        emails.add(m.group(0))
+        found.add(("email", normalize_email(m.group(0))))
+    for m in UPI_RE.finditer(text):
+        if m.group(0) not in emails:
+            found.add(("upi", normalize_upi(m.group(0))))
+    for m in IFSC_RE.finditer(text):
+        found.add(("ifsc", normalize_ifsc(m.group(0))))
+    for m in ACCOUNT_RE.finditer(text):
+        digits = m.group(0)
+        # 10-digit mobiles are already captured above
+        if not (len(digits) == 10 and digits[0] in "6789"):
+            found.add(("account", digits))
+    return found
+
+
+def classify_identifier(value: str) -> Optional[Tuple[str, str]]:
+    """Best-effort classification of a single identifier string."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    if "@" in value:
+        if "." in value.split("@", 1)[1]:
+            return ("email", normalize_email(value))
+        return ("upi", normalize_upi(value))
+    if IFSC_RE.fullmatch(value):
+        return ("ifsc", normalize_ifsc(value))
+    digits = re.sub(r'[\s\-\+\(\)]', '', value)
+    if digits.isdigit():
+        if MOBILE_RE.fullmatch(value.replace(" ", "").replace("-", "")):
+            return ("mobile", normalize_mobile(value))
+        if 9 <= len(digits) <= 18:
+            return ("account", digits)
+    return None
+
+
+# ---------- Entry builders (one per source table) ----------
+
+def _case_entries(case: models.Case) -> Set[Tuple[str, str]]:
+    entries = set()
+    fir = normalize_fir(case.fir_number)
+    if fir:
+        entries.add(("fir", fir))
+    entries |= extract_identifiers(case.description)
+    return entries
+
+
+def _telecom_request_entries(req: models.TelecomRequest) -> Set[Tuple[str, str]]:
+    entries = set()
+    # Batch requests store several numbers as a comma-separated string
+    for part in (req.mobile_number or "").split(","):
+        mobile = normalize_mobile(part)
+        if mobile:
+            entries.add(("mobile", mobile))
+    return entries
+
+
+def _financial_entity_entries(entity: models.FinancialEntity) -> Set[Tuple[str, str]]:
+    entries = set()
+    for kind, raw in (
+        ("upi", entity.upi_id),
+        ("account", entity.account_number),
+        ("ifsc", entity.ifsc_code),
+    ):
+        value = NORMALIZERS[kind](raw) if raw else None
+        if value:
+            entries.add((kind, value))
+    for token in tokenize(entity.account_holder_name):
+        entries.add(("name", token))
+    for token in tokenize(entity.bank_name):
+        entries.add(("bank", token))
+    return entries
+
+
+def _timeline_entries(event: models.TransactionTimeline) -> Set[Tuple[str, str]]:
+    entries = extract_identifiers(event.narrative)
+    for raw in (event.source_identifier, event.destination_identifier):
+        classified = classify_identifier(raw)
+        if classified:
+            entries.add(classified)
+    return entries
+
+
+def _evidence_entries(evidence: models.Evidence) -> Set[Tuple[str, str]]:
+    entries = set()
+    for token in tokenize(evidence.original_filename):
+        entries.add(("file", token))
+    for token in tokenize(evidence.file_type):
+        entries.add(("file", token))
+    if evidence.file_hash:
+        entries |= load_content_identifiers(evidence.file_hash)
+    return entries
+
+
+# ---------- Evidence contents ----------
+
+def content_path(file_hash: str) -> str:
+    return os.path.join(CONTENT_DIR, f"{file_hash}.json")
+
+
+def has_content_identifiers(file_hash: str) -> bool:
+    return os.path.exists(content_path(file_hash))
+
+
+def save_content_identifiers(file_hash: str, entries: Iterable[Tuple[str, str]]):
+    os.makedirs(CONTENT_DIR, exist_ok=True)
+    payload = json.dumps(sorted(entries)).encode("utf-8")
+    secure_storage.write_file(content_path(file_hash), [payload])
+
+
+def load_content_identifiers(file_hash: str) -> Set[Tuple[str, str]]:
+    """Identifiers found in this content, or an empty set if not extracted yet."""
+    if not has_content_identifiers(file_hash):
+        return set()
+    return {(kind, value) for kind, value in json.loads(secure_storage.read_all(content_path(file_hash)))}
+
+
+def remove_content_identifiers(file_hash: str):
+    if has_content_identifiers(file_hash):
+        os.remove(content_path(file_hash))
+
+
+# ---------- Maintenance ----------
+
+def remove_source(db: Session, source_type: str, source_id: int):
+    """Drop all index entries for a source row (call before deleting the row)."""
+    db.execute(
+        delete(models.IdentifierIndex).where(
+            models.IdentifierIndex.source_type == source_type,
+            models.IdentifierIndex.source_id == source_id,
+        )
+    )
+
+
+def _replace_entries(db: Session, source_type: str, source_id: int, case_id: int, entries: Iterable[Tuple[str, str]]):
+    remove_source(db, source_type, source_id)
+    rows = [
+        {"kind": kind, "value": value, "source_type": source_type, "source_id": source_id, "case_id": case_id}
+        for kind, value in entries if value
+    ]
+    if rows:
+        db.execute(insert(models.IdentifierIndex), rows)
+
+
+def index_case(db: Session, case: models.Case):
+    _replace_entries(db, SOURCE_CASE, case.id, case.id, _case_entries(case))
+
+
+def index_telecom_request(db: Session, req: models.TelecomRequest):
+    _replace_entries(db, SOURCE_TELECOM_REQUEST, req.id, req.case_id, _telecom_request_entries(req))
+
+
+def index_financial_entity(db: Session, entity: models.FinancialEntity):
+    _replace_entries(db, SOURCE_FINANCIAL_ENTITY, entity.id, entity.case_id, _financial_entity_entries(entity))
+
+
+def index_timeline_event(db: Session, event: models.TransactionTimeline):
+    _replace_entries(db, SOURCE_TIMELINE, event.id, event.case_id, _timeline_entries(event))
+
+
+def index_evidence(db: Session, evidence: models.Evidence):
+    _replace_entries(db, SOURCE_EVIDENCE, evidence.id, evidence.case_id, _evidence_entries(evidence))
+
+
+def index_evidence_content(db: Session, file_hash: str) -> int:
+    """Re-index every Evidence row holding this content (after its identifiers were saved)."""
+    rows = db.query(models.Evidence.id, models.Evidence.case_id, models.Evidence.original_filename,
+                    models.Evidence.file_type, models.Evidence.file_hash).filter(
+        models.Evidence.file_hash == file_hash
+    ).all()
+    for row in rows:
+        index_evidence(db, row)
+    return len(rows)
+
+
+def rebuild(db: Session):
+    """Rebuild the whole index from the source tables.
+
+    Only the indexed columns are loaded, so this stays cheap on large tables.
+    """
+    db.execute(delete(models.IdentifierIndex))
+    sources = (
+        (index_case, (models.Case.id, models.Case.fir_number, models.Case.description)),
+        (index_telecom_request, (models.TelecomRequest.id, models.TelecomRequest.case_id,
+                                 models.TelecomRequest.mobile_number)),
+        (index_financial_entity, (models.FinancialEntity.id, models.FinancialEntity.case_id,
+                                  models.FinancialEntity.upi_id, models.FinancialEntity.account_number,
+                                  models.FinancialEntity.ifsc_code, models.FinancialEntity.account_holder_name,
+                                  models.FinancialEntity.bank_name)),
+        (index_timeline_event, (models.TransactionTimeline.id, models.TransactionTimeline.case_id,
+                                models.TransactionTimeline.narrative, models.TransactionTimeline.source_identifier,
+                                models.TransactionTimeline.destination_identifier)),
+        (index_evidence, (models.Evidence.id, models.Evidence.case_id, models.Evidence.original_filename,
+                          models.Evidence.file_type, models.Evidence.file_hash)),
+    )
+    for index_row, columns in sources:
+        # Streamed in batches; the rows are never all in memory at once
+        for row in db.query(*columns).yield_per(1000):
+            index_row(db, row)
+    db.commit()
+
+
+def ensure_index(db: Session):
+    """Backfill the index for databases created before it existed."""
+    if db.query(models.IdentifierIndex.id).first() is not None:
+        return
+    if db.query(models.Case.id).first() is None:
+        return
+    rebuild(db)
+
+
+# ---------- Lookup ----------
+
+# How a query term is compared with indexed values
+MATCH_EXACT = "exact"
+MATCH_PREFIX = "prefix"
+MATCH_SUBSTRING = "substring"
+
+# Substring fallback: only for query terms at least this long (shorter ones
+# would match most of a kind), and at most this many entries per term
+MIN_SUBSTRING_LENGTH = 4
+SUBSTRING_MATCH_LIMIT = 200
+
+
+def _value_clause(value: str, match: str):
+    column = models.IdentifierIndex.value
+    if match == MATCH_PREFIX:
+        # Range form keeps the lookup on the (kind, value) b-tree
+        return and_(column >= value, column < value + PREFIX_END)
+    if match == MATCH_SUBSTRING:
+        return column.contains(value, autoescape=True)
+    return column == value
+
+
+def _query_terms(query: str, kind: str) -> List[str]:
+    if kind in TOKEN_KINDS:
+        return tokenize(query, min_length=1)
+    normalizer = NORMALIZERS.get(kind)
+    value = normalizer(query) if normalizer else None
+    return [value] if value else []
+
+
+def _kind_query(db: Session, kind: str, term: str, match: str, limit: Optional[int]):
+    query = db.query(models.IdentifierIndex).filter(
+        models.IdentifierIndex.kind == kind,
+        _value_clause(term, match),
+    )
+    if limit is not None:
+        # Walks the (kind, value) index in order and stops after ``limit`` matches
+        query = query.order_by(models.IdentifierIndex.value).limit(limit)
+    return query
+
+
+def _search_kind(db: Session, kind: str, terms: List[str], match: str,
+                 limit: Optional[int] = None) -> List[models.IdentifierIndex]:
+    if kind not in TOKEN_KINDS or len(terms) == 1:
+        return _kind_query(db, kind, terms[0], match, limit).all()
+
+    # Multi-token query: intersect the sources matching each token
+    matched_sources = None
+    per_source: Dict[Tuple[str, int], models.IdentifierIndex] = {}
+    for term in terms:
+        rows = _kind_query(db, kind, term, match, limit).all()
+        keys = set()
+        for row in rows:
+            key = (row.source_type, row.source_id)
+            keys.add(key)
+            per_source.setdefault(key, row)
+        matched_sources = keys if matched_sources is None else matched_sources & keys
+        if not matched_sources:
+            break
+    return [per_source[key] for key in (matched_sources or ())]
+
+
+def search_matches(db: Session, query: str, kinds: Iterable[str],
+                   prefix: bool = True) -> Tuple[List[models.IdentifierIndex], Dict[str, str]]:
+    """Index entries matching ``query`` for any of ``kinds``, and how each kind matched.
+
+    Scalar kinds (mobile, upi, ...) match the normalized query as a prefix.
+    Token kinds (name, bank, file) require every query token to match a token
+    of the same source row. A kind with no prefix match is searched again by
+    substring (terms of MIN_SUBSTRING_LENGTH or more, at most
+    SUBSTRING_MATCH_LIMIT entries per term); its mode is then ``"substring"``.
+    With ``prefix=False`` values must match exactly. Returns (hits, {kind: mode})
+    for every kind the query could be searched as.
+    """
+    hits, modes = [], {}
+    for kind in kinds:
+        terms = _query_terms(query, kind)
+        if not terms:
+            continue
+        modes[kind] = MATCH_PREFIX if prefix else MATCH_EXACT
+        found = _search_kind(db, kind, terms, modes[kind])
+        if not found and prefix and all(len(term) >= MIN_SUBSTRING_LENGTH for term in terms):
+            found = _search_kind(db, kind, terms, MATCH_SUBSTRING, SUBSTRING_MATCH_LIMIT)
+            if found:
+                modes[kind] = MATCH_SUBSTRING
+        hits.extend(found)
+    return hits, modes
+
+
+def search(db: Session, query: str, kinds: Iterable[str], prefix: bool = True) -> List[models.IdentifierIndex]:
+    """Return index entries matching ``query`` for any of ``kinds`` (see search_matches)."""
+    return search_matches(db, query, kinds, prefix)[0]
+
+
+def lookup_many(db: Session, identifiers: Dict[str, Iterable[str]]) -> List[models.IdentifierIndex]:
+    """Exact-match lookup for many already-normalized identifiers at once.
+
+    ``identifiers`` maps kind -> normalized values. Values are resolved with
+    set-based ``kind = ? AND value IN (...)`` queries, chunked to stay under
+    the driver's bound-parameter limit.
+    """
+    hits = []
+    for kind, values in identifiers.items():
+        values = sorted({v for v in values if v})
+        for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+            chunk = values[start:start + LOOKUP_CHUNK_SIZE]
+            hits.extend(
+                db.query(models.IdentifierIndex).filter(
+                    models.IdentifierIndex.kind == kind,
+                    models.IdentifierIndex.value.in_(chunk),
+                ).all()
+            )
+    return hits
+
+
+def group_by_source(hits: Iterable[models.IdentifierIndex]) -> Dict[str, Dict[int, models.IdentifierIndex]]:
+    """Group hits as {source_type: {source_id: first_hit}}."""
+    grouped: Dict[str, Dict[int, models.IdentifierIndex]] = {}
+    for hit in hits:
+        grouped.setdefault(hit.source_type, {}).setdefault(hit.source_id, hit)
+    return grouped
@@ -0,0 +1,274 @@
+"""Local background job queue: SQLite ``jobs`` table plus a process pool.
+
+Request handlers ``enqueue`` a job (a row in the jobs table) and return its id
+immediately. A dispatcher thread in each app process claims queued rows with
+a conditional UPDATE - so several app processes on one box never run the same
+job twice - and runs them in a ProcessPoolExecutor, keeping slow extraction
+(OCR, PDF text, large spreadsheets) off the request workers. No external
+broker is involved.
+
+Failed attempts are re-queued with exponential backoff until ``max_attempts``.
+Queued jobs can be cancelled outright; a running job is flagged and its result
+discarded when it finishes (pool processes cannot be interrupted safely).
+Jobs left running by a process that died are re-queued on the next start.
+"""
+import importlib
+import json
+import multiprocessing
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from backend import config, models
+from backend.database import SessionLocal
+
+# kind -> "module:function"; handlers take the payload as keyword arguments and
+# return a JSON-serializable result
+HANDLERS = {
+    "process_evidence": "backend.utils.evidence_analysis:process_stored_evidence",
+}
+
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("done", "failed", "cancelled")
+
+POLL_INTERVAL_SECONDS = 2
+RETRY_DELAY_SECONDS = 10
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue(db: Session, kind: str, payload: Dict[str, Any], dedup_key: Optional[str] = None,
+            evidence_id: Optional[int] = None, case_id: Optional[int] = None,
+            created_by_id: Optional[int] = None) -> models.Job:
+    """
+    Add a job (flushed, not committed). With ``dedup_key`` an identical job that
+    is still queued or running is returned instead of adding another.
+    Call ``runner.notify()`` after committing to start it without waiting for a poll.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    if dedup_key:
+        existing = db.query(models.Job).filter(
+            models.Job.dedup_key == dedup_key,
+            models.Job.status.in_(ACTIVE_STATUSES)
+        ).first()
+        if existing:
+            return existing
+    job = models.Job(
+        kind=kind,
+        payload=json.dumps(payload),
+        dedup_key=dedup_key,
+        status="queued",
+        max_attempts=config.JOB_MAX_ATTEMPTS,
+        evidence_id=evidence_id,
+        case_id=case_id,
+        created_by_id=created_by_id,
+    )
+    db.add(job)
+    db.flush()
+    return job
+
+
+def cancel(job: models.Job) -> None:
+    """Cancel a queued job now, or flag a running one (its result is discarded)."""
+    if job.status == "queued":
+        job.status = "cancelled"
+        job.finished_at = _utcnow()
+    elif job.status == "running":
+        job.cancel_requested = True
+
+
+def retry(job: models.Job) -> None:
+    """Re-queue a failed or cancelled job with a fresh attempt budget."""
+    job.status = "queued"
+    job.attempts = 0
+    job.error = None
+    job.result = None
+    job.cancel_requested = False
+    job.run_after = None
+    job.finished_at = None
+
+
+def result_of(job: models.Job) -> Any:
+    return json.loads(job.result) if job.result else None
+
+
+def execute(kind: str, payload: Dict[str, Any]) -> Any:
+    """Run one job in a pool process."""
+    module_name, func_name = HANDLERS[kind].split(":")
+    handler = getattr(importlib.import_module(module_name), func_name)
+    return handler(**payload)
+
+
+def _pid_alive(worker: Optional[str]) -> bool:
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def recover(db: Session) -> int:
+    """Re-queue jobs left running by an app process that no longer exists."""
+    recovered = 0
+    for job in db.query(models.Job).filter(models.Job.status == "running").all():
+        if job.worker == WORKER_ID or _pid_alive(job.worker):
+            continue
+        job.status = "queued" if job.attempts < job.max_attempts else "failed"
+        job.error = "Worker process exited while running the job"
+        recovered += 1
+    db.commit()
+    return recovered
+
+
+def claim(db: Session, limit: int) -> List[models.Job]:
+    """Atomically move up to ``limit`` due queued jobs to running for this process."""
+    now = _utcnow()
+    candidates = db.query(models.Job.id).filter(
+        models.Job.status == "queued",
+        (models.Job.run_after.is_(None)) | (models.Job.run_after <= now)
+    ).order_by(models.Job.id).limit(limit).all()
+    claimed = []
+    for (job_id,) in candidates:
+        updated = db.query(models.Job).filter(models.Job.id == job_id, models.Job.status == "queued").update(
+            {models.Job.status: "running",
+             models.Job.attempts: models.Job.attempts + 1,
+             models.Job.worker: WORKER_ID,
+             models.Job.started_at: now},
+            synchronize_session=False
+        )
+        if updated:
+            claimed.append(job_id)
+    db.commit()
+    return db.query(models.Job).filter(models.Job.id.in_(claimed)).all() if claimed else []
+
+
+def complete(db: Session, job_id: int, result: Any = None, error: Optional[str] = None) -> None:
+    """Record the outcome of an attempt (and schedule a retry on failure)."""
+    job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    if job is None or job.status != "running":
+        return
+    now = _utcnow()
+    if job.cancel_requested:
+        job.status = "cancelled"
+        job.finished_at = now
+    elif error is None:
+        job.status = "done"
+        job.result = json.dumps(result, default=str)
+        job.error = None
+        job.finished_at = now
+    elif job.attempts < job.max_attempts:
+        job.status = "queued"
+        job.error = error
+        job.run_after = now + timedelta(seconds=RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1))
+    else:
+        job.status = "failed"
+        job.error = error
+        job.finished_at = now
+    db.commit()
+
+
+class JobRunner:
+    """Dispatcher thread feeding claimed jobs to a process pool."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._running: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        if self.workers <= 0 or self._thread is not None:
+            return
+        with SessionLocal() as db:
+            recover(db)
+        self._pool = self._new_pool()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="job-dispatcher", daemon=True)
+        self._thread.start()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn: children must not inherit the parent's DB connections and threads
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        # Unfinished jobs stay "running" and are re-queued by recover() on next start
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+
+    def notify(self) -> None:
+        """Wake the dispatcher (e.g. right after a job was committed)."""
+        self._wake.set()
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._dispatch()
+            except Exception:
+                traceback.print_exc()
+            self._wake.wait(POLL_INTERVAL_SECONDS)
+            self._wake.clear()
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            free = self.workers - len(self._running)
+        if free <= 0:
+            return
+        with SessionLocal() as db:
+            jobs = claim(db, free)
+            for job in jobs:
+                payload = json.loads(job.payload)
+                try:
+                    future = self._pool.submit(execute, job.kind, payload)
+                except BrokenProcessPool:
+                    # A pool process died (e.g. a native extractor crashed); in-flight
+                    # jobs fail and are retried, new work gets a fresh pool
+                    self._pool = self._new_pool()
+                    future = self._pool.submit(execute, job.kind, payload)
+                with self._lock:
+                    self._running[job.id] = future
+                future.add_done_callback(lambda f, job_id=job.id: self._finished(job_id, f))
+
+    def _finished(self, job_id: int, future: Future) -> None:
+        with self._lock:
+            self._running.pop(job_id, None)
+        if self._stop.is_set():
+            return
+        try:
+            result, error = future.result(), None
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+        try:
+            with SessionLocal() as db:
+                complete(db, job_id, result, error)
+        except Exception:
+            traceback.print_exc()
+        self._wake.set()
+
+
+runner = JobRunner(config.JOB_WORKERS)
@@ -0,0 +1,158 @@
+"""Page-parallel OCR for scanned PDFs and image evidence.
+
+Seized-document bundles are often hundreds of scanned pages with no text
+layer. Pages are rasterized and OCRed across a process pool (``OCR_WORKERS``,
+by default this job's share of the cores); each worker opens the PDF once and renders
+only the pages it is given. OCR output is cached per page image hash
+(encrypted, under ``secure_uploads/ocr_cache``), so the same page appearing in
+another upload or a re-run is not OCRed again.
+
+All extractors are optional: pytesseract + Pillow for OCR, and PyMuPDF (or
+pdf2image with poppler) for rasterizing PDF pages. Callers check
+``can_ocr_images`` / ``can_ocr_pdf`` and report what is missing.
+"""
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from backend import config
+from backend.utils import secure_storage
+
+try:
+    import pytesseract
+    from PIL import Image
+    HAS_TESSERACT = True
+except ImportError:
+    HAS_TESSERACT = False
+
+try:
+    import fitz  # PyMuPDF
+    HAS_PYMUPDF = True
+except ImportError:
+    HAS_PYMUPDF = False
+
+try:
+    from pdf2image import convert_from_bytes
+    HAS_PDF2IMAGE = True
+except ImportError:
+    HAS_PDF2IMAGE = False
+
+OCR_CACHE_DIR = os.path.join("secure_uploads", "ocr_cache")
+OCR_DPI = 300
+
+# Pages with less embedded text than this are treated as scanned
+MIN_TEXT_CHARS = 20
+
+# Per-worker state: the PDF being rasterized (opened once per process)
+_document = None
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+def can_ocr_images() -> bool:
+    return HAS_TESSERACT
+
+
+def can_ocr_pdf() -> bool:
+    return HAS_TESSERACT and (HAS_PYMUPDF or HAS_PDF2IMAGE)
+
+
+def _cache_path(image_hash: str) -> str:
+    return os.path.join(OCR_CACHE_DIR, image_hash[:2], f"{image_hash}.{config.OCR_LANG}.txt")
+
+
+def _ocr_image_bytes(data: bytes) -> Tuple[str, bool]:
+    """OCR text of one encoded page image and whether it came from the cache."""
+    path = _cache_path(hashlib.sha256(data).hexdigest())
+    if os.path.exists(path):
+        try:
+            return secure_storage.read_all(path).decode("utf-8"), True
+        except (secure_storage.EvidenceIntegrityError, OSError):
+            pass  # Unreadable cache entry: OCR again and overwrite it
+    text = pytesseract.image_to_string(Image.open(io.BytesIO(data)), lang=config.OCR_LANG)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    secure_storage.write_file(path, [text.encode("utf-8")])
+    return text, False
+
+
+def _open_document(pdf_bytes: bytes) -> None:
+    global _document
+    _document = fitz.open(stream=pdf_bytes, filetype="pdf") if HAS_PYMUPDF else pdf_bytes
+
+
+def _render_page(index: int) -> bytes:
+    """PNG of one page of the worker's PDF, in grayscale at OCR_DPI."""
+    if HAS_PYMUPDF:
+        return _document[index].get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY).tobytes("png")
+    image = convert_from_bytes(_document, dpi=OCR_DPI, first_page=index + 1, last_page=index + 1,
+                               grayscale=True)[0]
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _ocr_page(index: int) -> Tuple[int, str, bool]:
+    text, cached = _ocr_image_bytes(_render_page(index))
+    return index, text, cached
+
+
+def _workers(tasks: int) -> int:
+    # Every job worker may be OCRing at once, each with its own pool: split the
+    # cores between them rather than giving each one all of them
+    share = max(1, available_cores() // max(1, config.JOB_WORKERS))
+    return min(tasks, config.OCR_WORKERS or share)
+
+
+def _executor(workers: int, initializer=None, initargs=()) -> ProcessPoolExecutor:
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=initializer, initargs=initargs)
+
+
+def ocr_pdf_pages(pdf_bytes: bytes, pages: List[int]) -> Tuple[Dict[int, str], int]:
+    """
+    Rasterize and OCR the given (0-based) pages in parallel.
+    Returns ({page: text}, number of pages served from the cache).
+    """
+    workers = _workers(len(pages))
+    if workers <= 1:
+        _open_document(pdf_bytes)
+        results = list(map(_ocr_page, pages))
+    else:
+        with _executor(workers, _open_document, (pdf_bytes,)) as pool:
+            # Small chunks keep all workers busy when page costs vary
+            results = list(pool.map(_ocr_page, pages, chunksize=max(1, len(pages) // (workers * 4))))
+    return {index: text for index, text, _ in results}, sum(cached for _, _, cached in results)
+
+
+def ocr_image(data: bytes) -> Tuple[str, int, int]:
+    """
+    OCR an image; multi-frame images (scanned TIFF bundles) are OCRed frame by
+    frame in parallel. Returns (text, frames, frames served from the cache).
+    """
+    image = Image.open(io.BytesIO(data))
+    frames = getattr(image, "n_frames", 1)
+    if frames == 1:
+        text, cached = _ocr_image_bytes(data)
+        return text, 1, int(cached)
+
+    encoded = []
+    for index in range(frames):
+        image.seek(index)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG")
+        encoded.append(buffer.getvalue())
+    workers = _workers(frames)
+    if workers <= 1:
+        results = list(map(_ocr_image_bytes, encoded))
+    else:
+        with _executor(workers) as pool:
+            results = list(pool.map(_ocr_image_bytes, encoded))
+    return "\n".join(text for text, _ in results), frames, sum(cached for _, cached in results)
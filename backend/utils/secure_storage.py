@@ -0,0 +1,225 @@
+"""Segmented AES-GCM container for evidence files.
+
+Evidence used to be stored as one Fernet token, so every upload, download and
+view held the whole file (plus base64 and ciphertext copies) in memory. Files
+are now written as a sequence of independently authenticated segments:
+
+    header   MAGIC | version (1) | segment size (u32) | salt (16)
+    segment  AES-GCM(segment_size plaintext bytes) + 16 byte tag, repeated
+    trailer  AES-GCM(sha256 of the plaintext) + 16 byte tag
+
+Each file gets its own key (HKDF of ``config.ENCRYPTION_KEY`` with the salt).
+Nonces are the segment counter plus a flag byte marking the final segment and
+the trailer, and the header is the associated data of every segment, so
+reordering, truncating or appending segments fails authentication. Any byte
+range can be decrypted by reading only the segments that cover it.
+
+Files without the magic are legacy Fernet tokens; they are still read (in
+memory) and can be converted with ``migrate`` / ``backend/migrate_evidence_storage.py``.
+"""
+import hashlib
+import os
+import struct
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+from backend import config
+
+MAGIC = b"NETRAE"
+VERSION = 1
+SEGMENT_SIZE = 1024 * 1024
+SALT_SIZE = 16
+TAG_SIZE = 16
+DIGEST_SIZE = 32
+
+_HEADER = struct.Struct(">6sBI")
+HEADER_SIZE = _HEADER.size + SALT_SIZE
+TRAILER_SIZE = DIGEST_SIZE + TAG_SIZE
+
+_FLAG_SEGMENT, _FLAG_FINAL, _FLAG_TRAILER = 0, 1, 2
+
+_legacy_cipher = Fernet(config.ENCRYPTION_KEY)
+
+
+class EvidenceIntegrityError(ValueError):
+    """The container is malformed or failed authentication."""
+
+
+def _file_key(salt: bytes) -> AESGCM:
+    key = HKDF(algorithm=hashes.SHA256(), length=32, salt=salt,
+               info=b"netra-evidence-v1").derive(config.ENCRYPTION_KEY)
+    return AESGCM(key)
+
+
+def _nonce(index: int, flag: int) -> bytes:
+    return index.to_bytes(11, "big") + bytes([flag])
+
+
+class SegmentWriter:
+    """Encrypts a stream of writes into ``fileobj`` with bounded memory.
+
+    ``close()`` writes the final segment and the trailer and returns the
+    hex SHA-256 of everything written.
+    """
+
+    def __init__(self, fileobj: BinaryIO, segment_size: int = SEGMENT_SIZE):
+        salt = os.urandom(SALT_SIZE)
+        self._file = fileobj
+        self._segment_size = segment_size
+        self._header = _HEADER.pack(MAGIC, VERSION, segment_size) + salt
+        self._aead = _file_key(salt)
+        self._buffer = bytearray()
+        self._index = 0
+        self._digest = hashlib.sha256()
+        self.size = 0
+        self._file.write(self._header)
+
+    def _emit(self, data: bytes, flag: int) -> None:
+        self._file.write(self._aead.encrypt(_nonce(self._index, flag), data, self._header))
+        self._index += 1
+
+    def write(self, data: bytes) -> None:
+        self._digest.update(data)
+        self.size += len(data)
+        self._buffer += data
+        # Hold back a full segment: only close() knows which one is final
+        while len(self._buffer) > self._segment_size:
+            self._emit(bytes(self._buffer[:self._segment_size]), _FLAG_SEGMENT)
+            del self._buffer[:self._segment_size]
+
+    def close(self) -> str:
+        self._emit(bytes(self._buffer), _FLAG_FINAL)
+        self._buffer.clear()
+        digest = self._digest.digest()
+        self._emit(digest, _FLAG_TRAILER)
+        return digest.hex()
+
+
+def write_file(path: str, chunks: Iterable[bytes]) -> str:
+    """Encrypt ``chunks`` to ``path`` atomically and return the plaintext SHA-256."""
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            writer = SegmentWriter(f)
+            for chunk in chunks:
+                writer.write(chunk)
+            sha256 = writer.close()
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return sha256
+
+
+class EncryptedFile:
+    """Read access to a stored evidence file, segmented or legacy Fernet.
+
+    ``size`` and ``sha256`` come from the header and the authenticated
+    trailer, without decrypting the content.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._legacy: Optional[bytes] = None
+        with open(path, "rb") as f:
+            head = f.read(HEADER_SIZE)
+            if head[:len(MAGIC)] != MAGIC:
+                self._load_legacy(head + f.read())
+                return
+            if len(head) < HEADER_SIZE:
+                raise EvidenceIntegrityError("Truncated evidence header")
+            _, version, self.segment_size = _HEADER.unpack(head[:_HEADER.size])
+            if version != VERSION or not self.segment_size:
+                raise EvidenceIntegrityError(f"Unsupported evidence container version {version}")
+            self._header = head
+            self._aead = _file_key(head[_HEADER.size:])
+
+            body = os.fstat(f.fileno()).st_size - HEADER_SIZE - TRAILER_SIZE
+            stored_segment = self.segment_size + TAG_SIZE
+            self.segments = -(-body // stored_segment)
+            if body < TAG_SIZE or body % stored_segment and body % stored_segment < TAG_SIZE:
+                raise EvidenceIntegrityError("Truncated evidence file")
+            self.size = body - self.segments * TAG_SIZE
+            self._body = body
+
+            f.seek(HEADER_SIZE + body)
+            self.sha256 = self._decrypt(f.read(TRAILER_SIZE), self.segments, _FLAG_TRAILER).hex()
+
+    def _load_legacy(self, token: bytes) -> None:
+        try:
+            self._legacy = _legacy_cipher.decrypt(token)
+        except InvalidToken:
+            raise EvidenceIntegrityError("Evidence file failed authentication")
+        self.size = len(self._legacy)
+        self.sha256 = hashlib.sha256(self._legacy).hexdigest()
+
+    @property
+    def legacy(self) -> bool:
+        return self._legacy is not None
+
+    def _decrypt(self, data: bytes, index: int, flag: int) -> bytes:
+        try:
+            return self._aead.decrypt(_nonce(index, flag), data, self._header)
+        except InvalidTag:
+            raise EvidenceIntegrityError(f"Evidence segment {index} failed authentication")
+
+    def iter_range(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Plaintext bytes ``[start, end)``, decrypting only the covering segments.
+
+        Raises EvidenceIntegrityError (possibly mid-iteration) if a segment was altered.
+        """
+        end = self.size if end is None else min(end, self.size)
+        if start >= end:
+            return
+        if self._legacy is not None:
+            yield self._legacy[start:end]
+            return
+
+        first, last = start // self.segment_size, (end - 1) // self.segment_size
+        stored_segment = self.segment_size + TAG_SIZE
+        with open(self.path, "rb") as f:
+            f.seek(HEADER_SIZE + first * stored_segment)
+            for index in range(first, last + 1):
+                flag = _FLAG_FINAL if index == self.segments - 1 else _FLAG_SEGMENT
+                length = min(stored_segment, self._body - index * stored_segment)
+                plain = self._decrypt(f.read(length), index, flag)
+                offset = index * self.segment_size
+                yield plain[max(start - offset, 0):end - offset]
+
+    def read(self) -> bytes:
+        return b"".join(self.iter_range())
+
+    def verify(self) -> str:
+        """Decrypt every segment and return the SHA-256 of the plaintext.
+
+        Compare against ``sha256`` (or the recorded hash) to detect tampering;
+        segments that fail authentication raise EvidenceIntegrityError.
+        """
+        digest = hashlib.sha256()
+        for chunk in self.iter_range():
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+def read_all(path: str) -> bytes:
+    """Whole decrypted content of an evidence file (segmented or legacy)."""
+    return EncryptedFile(path).read()
+
+
+def migrate(path: str) -> bool:
+    """Rewrite a legacy Fernet evidence file in the segmented format.
+
+    Returns False if the file is already segmented. The plaintext hash is
+    unchanged, so ``Evidence.file_hash`` stays valid.
+    """
+    stored = EncryptedFile(path)
+    if not stored.legacy:
+        return False
+    if write_file(path, [stored.read()]) != stored.sha256:
+        raise EvidenceIntegrityError(f"Re-encrypted {path} does not match its original hash")
+    return True
@@ -0,0 +1,421 @@
+"""Streaming tower dump analysis.
+
+Tower dumps are read in fixed-size row chunks (CSV via pandas ``chunksize``,
+XLSX via openpyxl read-only mode) and identifiers are pulled out with
+vectorized pandas string operations. Each file is reduced to a compact
+summary -- a sorted ``int64`` array of mobile numbers plus sets of account
+numbers and UPI IDs -- so memory is bounded by the number of distinct
+identifiers, not by the size of the upload.
+"""
+from typing import BinaryIO, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Rows per chunk while streaming a dump
+CHUNK_ROWS = 100_000
+
+DATA_EXTENSIONS = ('.csv', '.xls', '.xlsx')
+
+EMPTY_MOBILES = np.empty(0, dtype=np.int64)
+
+
+class TowerFileSummary:
+    """Distinct identifiers found in one tower dump."""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.rows = 0
+        self.mobiles = EMPTY_MOBILES  # sorted, unique
+        self.accounts = set()
+        self.upis = set()
+
+    def stats(self) -> dict:
+        return {
+            "filename": self.filename,
+            "rows": self.rows,
+            "mobiles": int(self.mobiles.size),
+            "accounts": len(self.accounts),
+            "upis": len(self.upis),
+        }
+
+
+def is_data_file(filename: str) -> bool:
+    return filename.lower().endswith(DATA_EXTENSIONS)
+
+
+def iter_chunks(fileobj: BinaryIO, filename: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Yield the dump as DataFrames of at most ``chunk_rows`` rows."""
+    name = filename.lower()
+    if name.endswith('.csv'):
+        yield from pd.read_csv(fileobj, dtype=str, chunksize=chunk_rows)
+    elif name.endswith('.xlsx'):
+        yield from _iter_xlsx_chunks(fileobj, chunk_rows)
+    elif name.endswith('.xls'):
+        # Legacy .xls has no streaming reader; these files are small by format limits
+        yield pd.read_excel(fileobj, dtype=str)
+
+
+def _iter_xlsx_chunks(fileobj: BinaryIO, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(c) if c is not None else f"column_{i}" for i, c in enumerate(header)]
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= chunk_rows:
+                yield _xlsx_frame(buffer, columns)
+                buffer = []
+        if buffer:
+            yield _xlsx_frame(buffer, columns)
+    finally:
+        workbook.close()
+
+
+def _cell_text(value) -> Optional[str]:
+    """XLSX cell as the text ``read_excel(dtype=str)`` would give (9876543210, not 9876543210.0)."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _xlsx_frame(rows: List[tuple], columns: List[str]) -> pd.DataFrame:
+    width = len(columns)
+    rows = [
+        tuple(_cell_text(value) for value in row[:width]) + (None,) * (width - len(row))
+        for row in rows
+    ]
+    # Text cells with an object dtype: a numeric column with blanks must not become float64
+    return pd.DataFrame(rows, columns=columns, dtype=object)
+
+
+def extract_chunk(df: pd.DataFrame):
+    """Vectorized identifier extraction from every cell of a chunk.
+
+    Returns ``(mobiles, accounts, upis)`` where ``mobiles`` is a sorted unique
+    int64 array of 10-digit numbers.
+    """
+    values = df.stack().dropna().astype(str).str.strip()
+    values = values[values != ""]
+    if values.empty:
+        return EMPTY_MOBILES, set(), set()
+
+    # 1. Mobile Number: last 10 digits of any value with >= 10 digits, starting 6-9
+    digits = values.str.replace(r'\D', '', regex=True)
+    last10 = digits.str[-10:]
+    mobile_mask = (digits.str.len() >= 10) & last10.str.match(r'[6-9]')
+    mobiles = np.unique(last10[mobile_mask].astype(np.int64).to_numpy())
+
+    # 2. UPI ID (contains @, no spaces)
+    upi_mask = (
+        values.str.contains('@', regex=False)
+        & ~values.str.contains(' ', regex=False)
+        & (values.str.len() > 5)
+    )
+    upis = set(values[upi_mask].str.lower())
+
+    # 3. Bank Account (9-18 digits, strictly numeric)
+    accounts = set(values[values.str.fullmatch(r'\d{9,18}')])
+
+    return mobiles, accounts, upis
+
+
+def summarize_file(fileobj: BinaryIO, filename: str, chunk_rows: int = CHUNK_ROWS) -> TowerFileSummary:
+    """Stream one dump and reduce it to its distinct identifiers."""
+    summary = TowerFileSummary(filename)
+    for chunk in iter_chunks(fileobj, filename, chunk_rows):
+        summary.rows += len(chunk)
+        mobiles, accounts, upis = extract_chunk(chunk)
+        summary.mobiles = np.union1d(summary.mobiles, mobiles)
+        summary.accounts |= accounts
+        summary.upis |= upis
+    return summary
+
+
+def intersect(summaries: List[TowerFileSummary]) -> dict:
+    """Identifiers present in every file."""
+    mobiles = summaries[0].mobiles
+    accounts = set(summaries[0].accounts)
+    upis = set(summaries[0].upis)
+    for summary in summaries[1:]:
+        mobiles = np.intersect1d(mobiles, summary.mobiles, assume_unique=True)
+        accounts &= summary.accounts
+        upis &= summary.upis
+    return {
+        "mobiles": [str(m) for m in mobiles.tolist()],
+        "accounts": sorted(accounts),
+        "upis": sorted(upis),
+    }
+
+
+# One bit per dump in the presence bitmaps
+MAX_FREQUENCY_FILES = 64
+
+
+def _mobile_presence(summaries: List[TowerFileSummary]):
+    """Merge per-file mobile arrays into (numbers, file bitmaps, file counts).
+
+    The arrays are merged one file at a time, so peak memory is proportional
+    to the number of distinct numbers across all dumps.
+    """
+    numbers = EMPTY_MOBILES
+    masks = np.empty(0, dtype=np.uint64)
+    counts = np.empty(0, dtype=np.uint16)
+    for i, summary in enumerate(summaries):
+        merged = np.union1d(numbers, summary.mobiles)
+        merged_masks = np.zeros(merged.size, dtype=np.uint64)
+        merged_counts = np.zeros(merged.size, dtype=np.uint16)
+        old_pos = np.searchsorted(merged, numbers)
+        merged_masks[old_pos] = masks
+        merged_counts[old_pos] = counts
+        new_pos = np.searchsorted(merged, summary.mobiles)
+        merged_masks[new_pos] |= np.uint64(1 << i)
+        merged_counts[new_pos] += 1
+        numbers, masks, counts = merged, merged_masks, merged_counts
+    return numbers, masks, counts
+
+
+def _set_presence(sets: List[set]) -> dict:
+    """value -> file bitmap for the (small) account / UPI sets."""
+    presence = {}
+    for i, values in enumerate(sets):
+        bit = 1 << i
+        for value in values:
+            presence[value] = presence.get(value, 0) | bit
+    return presence
+
+
+def _towers(mask: int, filenames: List[str]) -> List[str]:
+    return [name for i, name in enumerate(filenames) if mask >> i & 1]
+
+
+def frequency(summaries: List[TowerFileSummary], min_files: int, limit: int = 1000) -> dict:
+    """Identifiers present in at least ``min_files`` dumps.
+
+    Each identifier carries a bitmap of the dumps it appeared in; results are
+    ranked by how many dumps they were seen in and list those dumps. At most
+    ``limit`` entries per identifier type are returned (``totals`` has the
+    full counts).
+    """
+    filenames = [summary.filename for summary in summaries]
+
+    numbers, masks, counts = _mobile_presence(summaries)
+    keep = np.flatnonzero(counts >= min_files)
+    # Most towers first, then by number
+    keep = keep[np.argsort(-counts[keep].astype(np.int32), kind="stable")]
+    mobiles = [
+        {"identifier": str(int(numbers[i])), "tower_count": int(counts[i]),
+         "towers": _towers(int(masks[i]), filenames)}
+        for i in keep[:limit]
+    ]
+
+    def ranked(presence: dict) -> List[dict]:
+        rows = [
+            {"identifier": value, "tower_count": bin(mask).count("1"), "towers": _towers(mask, filenames)}
+            for value, mask in presence.items()
+        ]
+        rows = [row for row in rows if row["tower_count"] >= min_files]
+        rows.sort(key=lambda row: (-row["tower_count"], row["identifier"]))
+        return rows
+
+    accounts = ranked(_set_presence([summary.accounts for summary in summaries]))
+    upis = ranked(_set_presence([summary.upis for summary in summaries]))
+
+    return {
+        "mobiles": mobiles,
+        "accounts": accounts[:limit],
+        "upis": upis[:limit],
+        "totals": {"mobile": int(keep.size), "account": len(accounts), "upi": len(upis)},
+    }
+
+
+# ---------- Time-window co-location ----------
+
+EPOCH = pd.Timestamp(0)
+
+
+class TimeWindow:
+    """Closed interval [start, end] in epoch seconds."""
+
+    def __init__(self, start: pd.Timestamp, end: pd.Timestamp):
+        if end < start:
+            raise ValueError("Window end is before its start")
+        self.start = _to_epoch(start)
+        self.end = _to_epoch(end)
+
+    @classmethod
+    def around(cls, event_time: pd.Timestamp, delta: pd.Timedelta) -> "TimeWindow":
+        return cls(event_time - delta, event_time + delta)
+
+
+def _to_epoch(ts: pd.Timestamp) -> int:
+    return int((pd.Timestamp(ts) - EPOCH) // pd.Timedelta(seconds=1))
+
+
+def _from_epoch(seconds: int) -> str:
+    return (EPOCH + pd.Timedelta(seconds=int(seconds))).isoformat()
+
+
+def _timestamp_series(df: pd.DataFrame):
+    """Locate and parse the timestamp of each row.
+
+    Uses a combined datetime column, or separate date and time columns.
+    Returns ``(epoch_seconds, used_columns)`` or ``(None, [])`` when no
+    timestamp column can be found.
+    """
+    date_cols = [c for c in df.columns if "date" in str(c).lower()]
+    time_cols = [c for c in df.columns if "time" in str(c).lower() and c not in date_cols]
+
+    if date_cols and time_cols:
+        used = [date_cols[0], time_cols[0]]
+        raw = df[used[0]].astype(str) + " " + df[used[1]].astype(str)
+    elif date_cols or time_cols:
+        used = [(date_cols or time_cols)[0]]
+        raw = df[used[0]]
+    else:
+        return None, []
+
+    # Operator dumps use DD/MM/YYYY; ISO dates must not be read day-first
+    sample = raw.dropna().astype(str).str.strip()
+    iso = sample.empty or bool(sample.iloc[0][:4].isdigit())
+    parsed = pd.to_datetime(raw, errors="coerce", dayfirst=not iso)
+    seconds = (parsed - EPOCH) // pd.Timedelta(seconds=1)
+    return seconds, used
+
+
+def extract_events(df: pd.DataFrame, window: TimeWindow):
+    """Vectorized ``(mobile, epoch_seconds)`` pairs for rows inside ``window``.
+
+    Every non-timestamp column is scanned for mobile numbers, so both A and B
+    parties of a tower dump row are captured.
+    """
+    seconds, used = _timestamp_series(df)
+    if seconds is None:
+        raise ValueError("No date/time column found in tower dump")
+
+    in_window = seconds.notna() & (seconds >= window.start) & (seconds <= window.end)
+    if not in_window.any():
+        return EMPTY_MOBILES, EMPTY_MOBILES
+
+    rows = df[in_window]
+    row_seconds = seconds[in_window].astype(np.int64)
+    numbers, times = [], []
+    for column in rows.columns:
+        if column in used:
+            continue
+        values = rows[column].dropna().astype(str)
+        digits = values.str.replace(r'\D', '', regex=True)
+        last10 = digits.str[-10:]
+        mask = (digits.str.len() >= 10) & last10.str.match(r'[6-9]')
+        if mask.any():
+            numbers.append(last10[mask].astype(np.int64).to_numpy())
+            times.append(row_seconds.loc[last10[mask].index].to_numpy())
+
+    if not numbers:
+        return EMPTY_MOBILES, EMPTY_MOBILES
+    return np.concatenate(numbers), np.concatenate(times)
+
+
+def collect_events(fileobj: BinaryIO, filename: str, window: TimeWindow, chunk_rows: int = CHUNK_ROWS):
+    """Stream one dump, keeping only the sightings inside ``window``."""
+    numbers, times = [EMPTY_MOBILES], [EMPTY_MOBILES]
+    for chunk in iter_chunks(fileobj, filename, chunk_rows):
+        chunk_numbers, chunk_times = extract_events(chunk, window)
+        numbers.append(chunk_numbers)
+        times.append(chunk_times)
+    return np.concatenate(numbers), np.concatenate(times)
+
+
+def _best_window(times: list, towers: list, start: int, end: int, max_span: Optional[int]):
+    """Interval sweep over one number's time-sorted sightings ``[start, end)``.
+
+    Finds the window (no longer than ``max_span`` seconds, if given) that
+    covers the most distinct towers. Returns ``(tower_count, lo, hi)`` with
+    ``hi`` inclusive.
+    """
+    if max_span is None:
+        return len(set(towers[start:end])), start, end - 1
+
+    best = (0, start, start)
+    in_window = {}
+    lo = start
+    for hi in range(start, end):
+        tower = towers[hi]
+        in_window[tower] = in_window.get(tower, 0) + 1
+        while times[hi] - times[lo] > max_span:
+            dropped = towers[lo]
+            in_window[dropped] -= 1
+            if not in_window[dropped]:
+                del in_window[dropped]
+            lo += 1
+        if len(in_window) > best[0]:
+            best = (len(in_window), lo, hi)
+    return best
+
+
+def colocate(events: List[tuple], filenames: List[str], min_towers: int = 2,
+             max_span: Optional[int] = None, limit: int = 1000) -> dict:
+    """Rank numbers seen at several towers within their time windows.
+
+    ``events`` holds one ``(numbers, epoch_seconds)`` pair of arrays per dump.
+    Sightings are sorted into a per-number timestamp index; only numbers that
+    reach ``min_towers`` distinct dumps overall are swept for the tightest
+    window. ``max_span`` (seconds) additionally requires the matched sightings
+    to fall within that span of each other.
+    """
+    numbers = np.concatenate([e[0] for e in events])
+    times = np.concatenate([e[1] for e in events])
+    towers = np.concatenate([np.full(e[0].size, i, dtype=np.int16) for i, e in enumerate(events)])
+    if numbers.size == 0:
+        return {"candidates": [], "total": 0}
+
+    # Per-number timestamp index: sort by number, then time
+    order = np.lexsort((times, numbers))
+    numbers, times, towers = numbers[order], times[order], towers[order]
+    starts = np.flatnonzero(np.r_[True, numbers[1:] != numbers[:-1]])
+    ends = np.r_[starts[1:], numbers.size]
+
+    # Distinct towers per number (vectorized) prunes numbers before the sweep
+    by_tower = np.lexsort((towers, numbers))
+    pair_numbers, pair_towers = numbers[by_tower], towers[by_tower]
+    new_pair = np.r_[True, (pair_numbers[1:] != pair_numbers[:-1]) | (pair_towers[1:] != pair_towers[:-1])]
+    _, tower_counts = np.unique(pair_numbers[new_pair], return_counts=True)
+    keep = tower_counts >= min_towers
+    starts, ends = starts[keep], ends[keep]
+
+    time_list, tower_list = times.tolist(), towers.tolist()
+    ranked = []
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        count, lo, hi = _best_window(time_list, tower_list, start, end, max_span)
+        if count >= min_towers:
+            ranked.append((-count, time_list[hi] - time_list[lo], int(numbers[start]), lo, hi))
+
+    # More towers first, then the tightest window
+    ranked.sort()
+
+    candidates = []
+    for neg_count, span, number, lo, hi in ranked[:limit]:
+        matched = {}
+        for i in range(lo, hi + 1):
+            first, last = matched.get(tower_list[i], (time_list[i], time_list[i]))
+            matched[tower_list[i]] = (min(first, time_list[i]), max(last, time_list[i]))
+        candidates.append({
+            "identifier": str(number),
+            "tower_count": -neg_count,
+            "span_minutes": round(span / 60, 1),
+            "window_start": _from_epoch(time_list[lo]),
+            "window_end": _from_epoch(time_list[hi]),
+            "towers": [
+                {"tower": filenames[tower], "first_seen": _from_epoch(first), "last_seen": _from_epoch(last)}
+                for tower, (first, last) in sorted(matched.items(), key=lambda item: item[1][0])
+            ],
+        })
+    return {"candidates": candidates, "total": len(ranked)}
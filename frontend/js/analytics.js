@@ -214,6 +214,7 @@ document.getElementById('globalSearchForm').addEventListener('submit', async (e)
                     </div>
                     <div>
                         <span class="badge bg-white text-dark me-1">Search Type: ${data.search_type.toUpperCase()}</span>
+                        ${Object.values(data.match_modes || {}).includes('substring') ? '<span class="badge bg-warning text-dark me-1" title="Some identifier types had nothing starting with the query; their results contain it instead">Partial Match</span>' : ''}
                     </div>
                 </div>
             `;
@@ -309,8 +310,8 @@ document.getElementById('globalSearchForm').addEventListener('submit', async (e)
 
                     row.innerHTML = `
                         <td><strong>${match.fir_number || 'N/A'}</strong></td>
-                        <td><span class="badge bg-info">${match.match_type}</span></td>
-                        <td><small>${escapeHtml(match.matched_value || '')}</small></td>
+                        <td><span class="badge bg-info">${match.match_type}</span>${match.match_mode === 'substring' ? ' <span class="badge bg-warning text-dark" title="Contains the query (nothing starts with it)">Partial</span>' : ''}</td>
+                        <td><small>${match.snippet ? highlightSnippet(match.snippet) : escapeHtml(match.matched_value || '')}</small></td>
                         <td>${formatCaseType(match.case_type || 'N/A')}</td>
                         <td><span class="badge bg-${statusBadge}">${match.status || 'N/A'}</span></td>
                         <td><a href="case_detail.html?id=${match.case_id}" class="btn btn-sm btn-primary" target="_blank">View Case</a></td>
@@ -299,11 +299,17 @@ document.getElementById('uploadForm').addEventListener('submit', async (e) => {
     const formData = new FormData(e.target);
 
     try {
-        await API.uploadEvidence(token, caseId, formData);
+        const uploaded = await API.uploadEvidence(token, caseId, formData);
         const modal = bootstrap.Modal.getInstance(document.getElementById('uploadModal'));
         modal.hide();
         e.target.reset();
-        showAlert('success', 'File uploaded, hashed, and encrypted successfully.');
+        const copies = uploaded.duplicate_of || [];
+        if (copies.length) {
+            const firs = [...new Set(copies.map(c => escapeHtml(c.fir_number || `#${c.case_id}`)))].join(', ');
+            showAlert('warning', `File uploaded. An identical file already exists in case(s) ${firs} - possible link between cases.`);
+        } else {
+            showAlert('success', 'File uploaded, hashed, and encrypted successfully.');
+        }
         loadEvidence();
     } catch (err) {
         showAlert('danger', err.message);
@@ -32,6 +32,20 @@ function escapeHtml(text) {
         .replace(/'/g, "&#039;");
 }
 
+/**
+ * Escapes a search-result snippet and highlights the matched terms.
+ * The server wraps matches in \u0002 ... \u0003 markers.
+ * @param {string} snippet - The raw snippet text from the API.
+ * @returns {string} - Escaped HTML with <mark> around matched terms.
+ */
+function highlightSnippet(snippet) {
+    if (typeof snippet !== 'string') return snippet;
+    return escapeHtml(snippet)
+        .replace(/\u0002/g, '<mark>')
+        .replace(/\u0003/g, '</mark>');
+}
+
 // Expose globally
 window.safeHTML = safeHTML;
 window.escapeHtml = escapeHtml;
+window.highlightSnippet = highlightSnippet;
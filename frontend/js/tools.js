@@ -136,6 +136,14 @@ function setupTowerDump(token) {
 
         const formData = new FormData();
         selectedFiles.forEach(file => formData.append('files', file));
+        const minTowers = document.getElementById('towerMinFiles').value;
+        if (minTowers) formData.append('min_towers', minTowers);
+        const eventTime = document.getElementById('towerEventTime').value;
+        if (eventTime) {
+            // Time-window mode: numbers seen at several towers around the event
+            formData.append('event_time', eventTime);
+            formData.append('delta_minutes', document.getElementById('towerDeltaMinutes').value || 30);
+        }
 
         try {
             const response = await fetch(`${API_URL}/tools/analyze-tower-dump`, {
@@ -162,17 +170,20 @@ function setupTowerDump(token) {
             document.getElementById('countUPI').textContent = data.counts.upi;
 
             // Helper to render tables
-            const renderTable = (tbodyId, list, type) => {
+            const renderTable = (tbodyId, list, type, details) => {
                 const tbody = document.getElementById(tbodyId);
                 tbody.innerHTML = '';
                 if (list.length === 0) {
                     tbody.innerHTML = `<tr><td colspan="2" class="text-center text-muted">No common ${type}s found.</td></tr>`;
                     return;
                 }
-                list.forEach(val => {
+                list.forEach((val, i) => {
                     const tr = document.createElement('tr');
+                    const seenIn = details && details[i]
+                        ? `<div class="text-muted" style="font-size: 0.7rem;">${details[i].tower_count}/${data.total_towers} towers: ${escapeHtml(details[i].towers.join(', '))}</div>`
+                        : '';
                     tr.innerHTML = `
-                        <td class="fw-bold text-dark font-monospace">${val}</td>
+                        <td class="fw-bold text-dark font-monospace">${escapeHtml(val)}${seenIn}</td>
                         <td>
                             <a href="analytics.html?search=${val}" target="_blank" class="btn btn-xs btn-outline-primary" style="font-size: 0.7rem;">
                                 <i class="bi bi-graph-up"></i> Investigate
@@ -183,9 +194,16 @@ function setupTowerDump(token) {
                 });
             };
 
-            renderTable('commonNumbersBody', data.common_numbers, 'Mobile');
-            renderTable('commonAccountsBody', data.common_accounts, 'Account');
-            renderTable('commonUPIBody', data.common_upis, 'UPI');
+            const freq = data.frequency || {};
+            if (data.mode === 'time_window') {
+                freq.mobiles = data.candidates.map(c => ({
+                    tower_count: c.tower_count,
+                    towers: c.towers.map(t => `${t.tower} @ ${t.first_seen.replace('T', ' ')}`)
+                }));
+            }
+            renderTable('commonNumbersBody', data.common_numbers, 'Mobile', freq.mobiles);
+            renderTable('commonAccountsBody', data.common_accounts, 'Account', freq.accounts);
+            renderTable('commonUPIBody', data.common_upis, 'UPI', freq.upis);
 
             document.getElementById('towerResults').classList.remove('d-none');
 
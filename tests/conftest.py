@@ -0,0 +1,61 @@
+"""Shared fixtures: every test gets a fresh database.
+
+By default that is a SQLite file in the test's temp directory. With
+``TEST_DATABASE_URL`` set (e.g. a local PostgreSQL container) the tests run
+there instead; the schema is dropped and recreated around each test, so
+point it at a database used for nothing else.
+"""
+import os
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.database import Base, create_db_engine
+from backend.utils import fulltext
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+def create_test_engine(directory):
+    """Engine on an empty schema: TEST_DATABASE_URL if set, else a SQLite file in ``directory``."""
+    if TEST_DATABASE_URL:
+        engine = create_db_engine(TEST_DATABASE_URL)
+        Base.metadata.drop_all(bind=engine)
+    else:
+        engine = create_db_engine(f"sqlite:///{directory / 'test.db'}")
+    Base.metadata.create_all(bind=engine)
+    fulltext.init_fulltext(engine)
+    return engine
+
+
+def dispose_test_engine(engine):
+    if TEST_DATABASE_URL:
+        Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_test_engine(tmp_path)
+    yield engine
+    dispose_test_engine(engine)
+
+
+@pytest.fixture
+def db(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def statements(engine):
+    """SQL statements sent to the database while the test runs."""
+    sent = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        sent.append(statement)
+
+    event.listen(engine, "before_cursor_execute", record)
+    yield sent
+    event.remove(engine, "before_cursor_execute", record)
@@ -0,0 +1,83 @@
+"""Cross-case lookups must issue a bounded number of SQL statements.
+
+Every matching request, entity, timeline event and evidence row carries its
+case's FIR number; loading those cases lazily costs one SELECT per row, so
+the statement count of these endpoints must not grow with the matches.
+"""
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.database import Base
+from backend.routers import analysis
+from backend.utils import identifier_index
+
+MOBILE = "9876543210"
+UPI = "suspect@okaxis"
+
+
+def _seed(db, cases: int) -> models.User:
+    user = models.User(username="analyst", hashed_password="x", role=models.UserRole.DGP, is_active=True)
+    db.add(user)
+    db.flush()
+    for i in range(cases):
+        case = models.Case(fir_number=f"FIR/{i}/2026", police_station="PS1", owner_id=user.id,
+                           description=f"Calls received from {MOBILE}", amount_involved="1000")
+        db.add(case)
+        db.flush()
+        entity = models.FinancialEntity(case_id=case.id, entity_type=models.FinancialEntityType.UPI_ID,
+                                        upi_id=UPI, added_by_id=user.id)
+        db.add(entity)
+        db.flush()
+        db.add_all([
+            models.TelecomRequest(case_id=case.id, mobile_number=MOBILE, request_type="CDR", reason="r"),
+            models.TransactionTimeline(case_id=case.id, financial_entity_id=entity.id,
+                                       event_type=models.TransactionEventType.PAYMENT,
+                                       event_timestamp=datetime(2026, 1, 1, 10, i % 60),
+                                       narrative=f"Paid to {UPI}", source_identifier=MOBILE),
+            models.Evidence(case_id=case.id, file_type="CDR", file_hash=f"{i:064x}",
+                            original_filename=f"cdr_{MOBILE}.csv", uploaded_by_id=user.id),
+        ])
+    db.commit()
+    identifier_index.rebuild(db)
+    return user
+
+
+def _statement_count(db, statements, call) -> int:
+    db.expunge_all()  # nothing served from the identity map of the seeding session
+    start = len(statements)
+    call()
+    return len(statements) - start
+
+
+CALLS = {
+    "universal_search (mobile)": lambda db, user: analysis.universal_search(
+        query=MOBILE, search_type="mobile", db=db, current_user=user),
+    "universal_search (upi)": lambda db, user: analysis.universal_search(
+        query=UPI, search_type="upi", db=db, current_user=user),
+    "comprehensive_investigation_data": lambda db, user: analysis.get_comprehensive_investigation_data(
+        identifier=MOBILE, db=db, current_user=user),
+    "network_graph": lambda db, user: analysis.get_network_graph(identifier=MOBILE, db=db, current_user=user),
+}
+
+
+@pytest.mark.parametrize("endpoint", list(CALLS))
+def test_statement_count_does_not_grow_with_matches(engine, statements, endpoint):
+    counts = {}
+    for cases in (2, 25):
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        with Session(engine) as db:
+            user = _seed(db, cases)
+            counts[cases] = _statement_count(db, statements, lambda: CALLS[endpoint](db, user))
+    assert counts[2] == counts[25], f"{endpoint}: {counts[2]} statements for 2 cases, {counts[25]} for 25"
+
+
+def test_results_cover_every_matching_case(db):
+    user = _seed(db, 5)
+    result = analysis.universal_search(query=MOBILE, search_type="mobile", db=db, current_user=user)
+    assert result["summary"]["telecom_requests"] == 5
+    assert {m["fir_number"] for m in result["matches"] if m["source"] == "Telecom Request"} == \
+        {f"FIR/{i}/2026" for i in range(5)}
@@ -0,0 +1,109 @@
+"""Content-addressed blob store: shared storage, reference counts and garbage collection.
+
+GC deletes evidence files, so it must keep every blob an Evidence row still
+points at and every blob touched within the grace period.
+"""
+import os
+from datetime import datetime
+
+import pytest
+
+from backend import models
+from backend.utils import blob_store, secure_storage
+
+LONG_AGO = datetime(2000, 1, 1)
+
+
+@pytest.fixture(autouse=True)
+def blob_dir(tmp_path, monkeypatch):
+    """Run in the test's temp directory: the store writes under ./secure_uploads."""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.fixture
+def case(db) -> models.Case:
+    user = models.User(username="si", hashed_password="x", role=models.UserRole.SUB_INSPECTOR, is_active=True)
+    db.add(user)
+    db.flush()
+    case = models.Case(fir_number="FIR/1/2026", police_station="PS1", owner_id=user.id, description="d")
+    db.add(case)
+    db.flush()
+    return case
+
+
+def _upload(db, content: bytes) -> models.EvidenceBlob:
+    tmp_path = blob_store.upload_temp_path()
+    sha256 = secure_storage.write_file(tmp_path, [content])
+    blob, _ = blob_store.store(db, tmp_path, sha256, len(content))
+    return blob
+
+
+def _attach(db, case: models.Case, blob: models.EvidenceBlob) -> models.Evidence:
+    evidence = models.Evidence(case_id=case.id, file_type="OTHER", file_path=blob.file_path,
+                               file_hash=blob.sha256, original_filename="statement.pdf")
+    db.add(evidence)
+    db.flush()
+    return evidence
+
+
+def _age(db, blob: models.EvidenceBlob):
+    db.query(models.EvidenceBlob).filter(models.EvidenceBlob.id == blob.id).update(
+        {models.EvidenceBlob.updated_at: LONG_AGO}, synchronize_session=False)
+    db.commit()
+
+
+def test_same_content_is_stored_once(db, case):
+    first = _upload(db, b"bank statement")
+    second = _upload(db, b"bank statement")
+
+    assert second.id == first.id
+    assert second.ref_count == 2
+    assert secure_storage.read_all(first.file_path) == b"bank statement"
+    # The second upload's temp file was discarded, not kept next to the blob
+    assert os.listdir(os.path.dirname(first.file_path)) == [first.sha256]
+
+
+def test_gc_keeps_referenced_and_recent_blobs_and_removes_unreferenced(db, case):
+    referenced = _upload(db, b"attached to a case")
+    _attach(db, case, referenced)
+    recent = _upload(db, b"upload still in progress")
+    unreferenced = _upload(db, b"evidence since deleted")
+    db.commit()
+    paths = {blob.sha256: blob.file_path for blob in (referenced, recent, unreferenced)}
+    kept, removed = {referenced.sha256, recent.sha256}, unreferenced.sha256
+
+    # The first pass recounts references (nothing points at two of the blobs) and
+    # starts their grace period; nothing is removed yet
+    assert blob_store.collect_garbage(db)["removed_blobs"] == 0
+    assert all(os.path.exists(path) for path in paths.values())
+
+    # Only one unreferenced blob has been idle past the grace period
+    _age(db, referenced)
+    _age(db, unreferenced)
+
+    stats = blob_store.collect_garbage(db)
+
+    assert stats["removed_blobs"] == 1
+    assert not os.path.exists(paths[removed])
+    assert all(os.path.exists(paths[sha256]) for sha256 in kept)
+    assert {blob.sha256 for blob in db.query(models.EvidenceBlob)} == kept
+    # ref_count is recounted from the evidence table
+    assert blob_store.lookup(db, referenced.sha256).ref_count == 1
+    assert blob_store.lookup(db, recent.sha256).ref_count == 0
+    assert secure_storage.read_all(referenced.file_path) == b"attached to a case"
+
+
+def test_gc_removes_stale_upload_temp_files_only(db):
+    stale = blob_store.upload_temp_path()
+    fresh = blob_store.upload_temp_path()
+    for path in (stale, fresh):
+        with open(path, "wb") as f:
+            f.write(b"partial upload")
+    old = LONG_AGO.timestamp()
+    os.utime(stale, (old, old))
+
+    stats = blob_store.collect_garbage(db)
+
+    assert stats["removed_orphans"] == 1
+    assert not os.path.exists(stale)
+    assert os.path.exists(fresh)
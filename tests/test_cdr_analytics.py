@@ -0,0 +1,57 @@
+"""Time-of-day reports must not be invented for CDRs that only give call dates.
+
+A date-only CDR parses every call to 00:00; treating that as a time would
+make every call a night call and every busy day a burst.
+"""
+from backend.utils import cdr_cache, cdr_parser
+
+DATE_ONLY = b"""Source,Destination,Duration,Date
+9911223344,8888888888,120,2026-02-01
+9911223344,8888888888,60,2026-02-01
+9911223344,7777777777,30,2026-02-01
+9911223344,7777777777,45,2026-02-01
+9911223344,6666666666,15,2026-02-01
+9911223344,6666666666,90,2026-02-02
+"""
+
+TIMED = b"""Source,Destination,Duration,Date,Time
+9911223344,8888888888,120,2026-02-01,23:10:00
+9911223344,8888888888,60,2026-02-01,23:11:00
+9911223344,7777777777,30,2026-02-01,23:12:00
+9911223344,7777777777,45,2026-02-01,23:13:00
+9911223344,6666666666,15,2026-02-01,23:14:00
+9911223344,6666666666,90,2026-02-02,10:00:00
+"""
+
+
+def test_date_only_cdr_has_no_time_of_day_reports():
+    df = cdr_parser.load_cdr(DATE_ONLY, ".csv")
+    assert df.attrs["has_time"] is False
+
+    stats = cdr_parser.analyze_frame(df)
+    analytics = stats["analytics"]
+    assert stats["hourly_stats"] == {}
+    assert analytics["night_call_ratio"] is None
+    assert analytics["heatmap"] is None
+    assert analytics["call_bursts"] == []
+    for contact in analytics["contacts"]:
+        assert "night_calls" not in contact
+        assert "first_seen" not in contact
+
+
+def test_timed_cdr_keeps_time_of_day_reports():
+    df = cdr_parser.load_cdr(TIMED, ".csv")
+    assert df.attrs["has_time"] is True
+
+    analytics = cdr_parser.analyze_frame(df)["analytics"]
+    assert analytics["night_call_ratio"] == round(5 / 6, 3)
+    assert sum(map(sum, analytics["heatmap"]["counts"])) == 6
+    assert [burst["calls"] for burst in analytics["call_bursts"]] == [5]
+    assert all("first_seen" in contact for contact in analytics["contacts"])
+
+
+def test_date_only_flag_survives_the_frame_cache():
+    df = cdr_parser.load_cdr(DATE_ONLY, ".csv")
+    cached = cdr_cache._deserialize(cdr_cache._serialize(df))
+    assert cached.attrs["has_time"] is False
+    assert cdr_parser.analyze_frame(cached)["analytics"]["night_call_ratio"] is None
@@ -0,0 +1,61 @@
+"""Prefix search with a per-kind substring fallback.
+
+A kind falls back to substring matching only when nothing starts with the
+query; the other kinds keep reporting their prefix matches as such.
+"""
+from backend import models
+from backend.routers import analysis
+from backend.utils import identifier_index
+
+MOBILE = "9876543210"
+
+
+def _entry(kind: str, value: str, source_id: int) -> models.IdentifierIndex:
+    return models.IdentifierIndex(kind=kind, value=value, source_type=identifier_index.SOURCE_EVIDENCE,
+                                  source_id=source_id)
+
+
+def test_match_mode_is_reported_per_kind(db):
+    db.add_all([_entry("name", "rahul", 1), _entry("file", "myrahulfile", 2)])
+    db.commit()
+
+    hits, modes = identifier_index.search_matches(db, "rahul", ["name", "file"])
+
+    assert sorted(hit.value for hit in hits) == ["myrahulfile", "rahul"]
+    assert modes == {"name": identifier_index.MATCH_PREFIX, "file": identifier_index.MATCH_SUBSTRING}
+
+
+def test_substring_fallback_needs_a_minimum_length_and_is_capped(db):
+    db.add_all([_entry("file", f"x{i:04d}rahul", i) for i in range(identifier_index.SUBSTRING_MATCH_LIMIT + 50)])
+    db.commit()
+
+    # Contained in every value, but too short to fall back to substring matching
+    short = "rahul"[1:identifier_index.MIN_SUBSTRING_LENGTH]
+    assert identifier_index.search_matches(db, short, ["file"]) == ([], {"file": identifier_index.MATCH_PREFIX})
+
+    hits, modes = identifier_index.search_matches(db, "rahul", ["file"])
+    assert len(hits) == identifier_index.SUBSTRING_MATCH_LIMIT
+    assert modes == {"file": identifier_index.MATCH_SUBSTRING}
+
+
+def test_universal_search_marks_each_result(db):
+    user = models.User(username="analyst", hashed_password="x", role=models.UserRole.DGP, is_active=True)
+    db.add(user)
+    db.flush()
+    case = models.Case(fir_number="FIR/1/2026", police_station="PS1", owner_id=user.id,
+                       description="d", amount_involved="1000")
+    db.add(case)
+    db.flush()
+    db.add_all([
+        models.TelecomRequest(case_id=case.id, mobile_number=MOBILE, request_type="CDR", reason="r"),
+        models.Evidence(case_id=case.id, file_type="CDR", file_hash="0" * 64,
+                        original_filename=f"cdr_x{MOBILE}.csv", uploaded_by_id=user.id),
+    ])
+    db.commit()
+    identifier_index.rebuild(db)
+
+    result = analysis.universal_search(query=MOBILE, search_type="mobile", db=db, current_user=user)
+
+    modes = {match["source"]: match["match_mode"] for match in result["matches"]}
+    assert modes == {"Telecom Request": "prefix", "Evidence File": "substring"}
+    assert result["match_modes"] == {"mobile": "prefix", "file": "substring"}
@@ -0,0 +1,32 @@
+"""Hot list endpoints must read through their indexes, never scan a whole table.
+
+The queries and the verdict come from backend/check_query_plans.py, which can
+also be pointed at a live database (``--url``).
+"""
+import pytest
+from sqlalchemy.orm import Session
+
+from backend import check_query_plans
+from tests.conftest import create_test_engine, dispose_test_engine
+
+# Enough rows that the planner prefers the indexes, as on real data
+SEED_CASES = 20000
+
+HOT_QUERIES = [label for label, _, _ in check_query_plans.hot_queries(Session())]
+
+
+@pytest.fixture(scope="module")
+def seeded(tmp_path_factory):
+    engine = create_test_engine(tmp_path_factory.mktemp("plans"))
+    with Session(engine) as db:
+        check_query_plans.seed(db, SEED_CASES)
+        yield db
+    dispose_test_engine(engine)
+
+
+@pytest.mark.parametrize("label", HOT_QUERIES)
+def test_hot_query_uses_its_index(seeded, label):
+    query, index = next((q, i) for l, q, i in check_query_plans.hot_queries(seeded) if l == label)
+    plan = check_query_plans.query_plan(seeded, query)
+    reason = check_query_plans.problem(plan, index)
+    assert reason is None, f"{label}: {reason}\n" + "\n".join(plan)
@@ -0,0 +1,165 @@
+"""Segmented AES-GCM evidence container: round trips, Range reads, tampering, legacy files.
+
+Files are written with a tiny segment size so a few dozen bytes already
+span several segments.
+"""
+import hashlib
+
+import pytest
+from cryptography.fernet import Fernet
+
+from backend import config
+from backend.utils import secure_storage
+from backend.utils.secure_storage import EncryptedFile, EvidenceIntegrityError
+
+SEGMENT = 16
+
+
+def _write(path, data: bytes, segment_size: int = SEGMENT, chunk: int = 7) -> str:
+    with open(path, "wb") as f:
+        writer = secure_storage.SegmentWriter(f, segment_size)
+        for start in range(0, len(data), chunk):
+            writer.write(data[start:start + chunk])
+        return writer.close()
+
+
+def _flip(path, offset: int):
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        byte = f.read(1)
+        f.seek(offset)
+        f.write(bytes([byte[0] ^ 0x01]))
+
+
+@pytest.mark.parametrize("size", [0, 1, SEGMENT - 1, SEGMENT, SEGMENT + 1, 3 * SEGMENT, 3 * SEGMENT + 5])
+def test_round_trip_across_segment_boundaries(tmp_path, size):
+    data = bytes(range(256))[:size] if size <= 256 else bytes(size)
+    path = tmp_path / "evidence.bin"
+
+    sha256 = _write(path, data)
+
+    stored = EncryptedFile(str(path))
+    assert not stored.legacy
+    assert stored.size == size
+    assert stored.sha256 == sha256 == hashlib.sha256(data).hexdigest()
+    assert stored.read() == data
+    assert stored.verify() == sha256
+
+
+def test_write_file_round_trip(tmp_path):
+    data = b"x" * (secure_storage.SEGMENT_SIZE + 10)
+    path = tmp_path / "evidence.bin"
+
+    sha256 = secure_storage.write_file(str(path), [data[:100], data[100:]])
+
+    assert sha256 == hashlib.sha256(data).hexdigest()
+    assert secure_storage.read_all(str(path)) == data
+    assert not (tmp_path / "evidence.bin.tmp").exists()
+
+
+@pytest.mark.parametrize("start,end", [
+    (0, 1),                       # first byte
+    (0, SEGMENT),                 # exactly the first segment
+    (SEGMENT - 1, SEGMENT + 1),   # straddles a boundary
+    (SEGMENT, 2 * SEGMENT),       # exactly a middle segment
+    (3 * SEGMENT, 3 * SEGMENT + 5),  # the short final segment
+    (3 * SEGMENT + 4, 3 * SEGMENT + 5),  # last byte
+    (5, 3 * SEGMENT + 5),         # to the end
+    (40, 10_000),                 # end past the file is clipped
+])
+def test_range_reads(tmp_path, start, end):
+    data = bytes(range(3 * SEGMENT + 5))
+    path = tmp_path / "evidence.bin"
+    _write(path, data)
+
+    assert b"".join(EncryptedFile(str(path)).iter_range(start, end)) == data[start:end]
+
+
+def test_empty_ranges(tmp_path):
+    path = tmp_path / "evidence.bin"
+    _write(path, bytes(40))
+    stored = EncryptedFile(str(path))
+
+    assert list(stored.iter_range(10, 10)) == []
+    assert list(stored.iter_range(40, 50)) == []
+
+
+def test_altered_segment_fails_authentication(tmp_path):
+    path = tmp_path / "evidence.bin"
+    _write(path, bytes(3 * SEGMENT))
+    # Second stored segment (segment + tag each)
+    _flip(path, secure_storage.HEADER_SIZE + (SEGMENT + secure_storage.TAG_SIZE) + 3)
+
+    stored = EncryptedFile(str(path))
+    # Segments before the altered one still decrypt
+    assert b"".join(stored.iter_range(0, SEGMENT)) == bytes(SEGMENT)
+    with pytest.raises(EvidenceIntegrityError):
+        stored.read()
+    with pytest.raises(EvidenceIntegrityError):
+        stored.verify()
+
+
+def test_altered_header_or_trailer_is_rejected_on_open(tmp_path):
+    path = tmp_path / "evidence.bin"
+    _write(path, bytes(40))
+    size = path.stat().st_size
+
+    salt = tmp_path / "salt.bin"
+    salt.write_bytes(path.read_bytes())
+    _flip(salt, secure_storage.HEADER_SIZE - 1)
+    with pytest.raises(EvidenceIntegrityError):
+        EncryptedFile(str(salt))
+
+    trailer = tmp_path / "trailer.bin"
+    trailer.write_bytes(path.read_bytes())
+    _flip(trailer, size - 1)
+    with pytest.raises(EvidenceIntegrityError):
+        EncryptedFile(str(trailer))
+
+
+def test_truncated_or_reordered_segments_are_rejected(tmp_path):
+    path = tmp_path / "evidence.bin"
+    _write(path, bytes(range(3 * SEGMENT)))
+    raw = path.read_bytes()
+    stored_segment = SEGMENT + secure_storage.TAG_SIZE
+    header, body = raw[:secure_storage.HEADER_SIZE], raw[secure_storage.HEADER_SIZE:]
+
+    # Final segment dropped: the trailer is no longer where its nonce expects it
+    truncated = tmp_path / "truncated.bin"
+    truncated.write_bytes(header + body[:2 * stored_segment] + body[3 * stored_segment:])
+    with pytest.raises(EvidenceIntegrityError):
+        EncryptedFile(str(truncated)).read()
+
+    reordered = tmp_path / "reordered.bin"
+    reordered.write_bytes(header + body[stored_segment:2 * stored_segment] + body[:stored_segment]
+                          + body[2 * stored_segment:])
+    with pytest.raises(EvidenceIntegrityError):
+        EncryptedFile(str(reordered)).read()
+
+
+def test_legacy_fernet_file_is_read_and_migrated(tmp_path):
+    data = b"legacy evidence " * 10
+    path = tmp_path / "legacy.bin"
+    path.write_bytes(Fernet(config.ENCRYPTION_KEY).encrypt(data))
+
+    stored = EncryptedFile(str(path))
+    assert stored.legacy
+    assert stored.size == len(data)
+    assert b"".join(stored.iter_range(3, 20)) == data[3:20]
+
+    assert secure_storage.migrate(str(path)) is True
+    migrated = EncryptedFile(str(path))
+    assert not migrated.legacy
+    assert migrated.read() == data
+    assert migrated.sha256 == hashlib.sha256(data).hexdigest()
+    assert secure_storage.migrate(str(path)) is False
+
+
+def test_tampered_legacy_file_fails_authentication(tmp_path):
+    path = tmp_path / "legacy.bin"
+    token = bytearray(Fernet(config.ENCRYPTION_KEY).encrypt(b"legacy evidence"))
+    token[-5] ^= 0x01
+    path.write_bytes(bytes(token))
+
+    with pytest.raises(EvidenceIntegrityError):
+        EncryptedFile(str(path))
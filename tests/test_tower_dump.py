@@ -0,0 +1,66 @@
+"""Tower dump extraction must read XLSX numbers as the operator wrote them.
+
+openpyxl hands back numeric cells as int/float; a numeric column with a
+blank cell must not turn 9876543210 into "9876543210.0" (a different
+mobile number once the last 10 digits are taken) or hide account numbers.
+"""
+import io
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import Workbook
+
+from backend.utils import tower_dump
+
+
+def _xlsx(rows) -> io.BytesIO:
+    workbook = Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+HEADER = ["Date", "A Party", "B Party", "Account"]
+
+
+def test_xlsx_with_blank_cells_keeps_numbers_intact():
+    tower_a = _xlsx([
+        HEADER,
+        [datetime(2026, 1, 5, 10, 0), 9876543210, None, 123456789012],
+        [datetime(2026, 1, 5, 10, 5), None, 9123456780.0, None],
+    ])
+    tower_b = _xlsx([
+        HEADER,
+        [datetime(2026, 1, 5, 11, 0), None, 9876543210, None],
+        [datetime(2026, 1, 5, 11, 5), 9123456780, None, 123456789012],
+    ])
+
+    summaries = [
+        tower_dump.summarize_file(tower_a, "tower_a.xlsx"),
+        tower_dump.summarize_file(tower_b, "tower_b.xlsx"),
+    ]
+    assert summaries[0].mobiles.tolist() == [9123456780, 9876543210]
+    assert "123456789012" in summaries[0].accounts
+
+    common = tower_dump.intersect(summaries)
+    assert common["mobiles"] == ["9123456780", "9876543210"]
+    assert "123456789012" in common["accounts"]
+    assert not any(value.endswith(".0") for value in common["accounts"])
+
+
+def test_xlsx_events_with_blank_cells():
+    dump = _xlsx([
+        HEADER,
+        [datetime(2026, 1, 5, 10, 0), 9876543210, None, None],
+        [datetime(2026, 1, 5, 10, 5), None, 9123456780, None],
+    ])
+    window = tower_dump.TimeWindow(pd.Timestamp("2026-01-05 09:00"), pd.Timestamp("2026-01-05 12:00"))
+
+    numbers, times = tower_dump.collect_events(dump, "tower.xlsx", window)
+
+    assert sorted(numbers.tolist()) == [9123456780, 9876543210]
+    assert times.size == 2